@@ -0,0 +1,82 @@
+from datetime import date, datetime, time, timedelta
+from typing import List, Tuple
+
+from dateutil.rrule import rrulestr
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Query, Session, joinedload
+
+from . import cache
+from .models import CalendarEvent, EventParticipant, EventStatus, User, UserRole
+from .recurrence import event_duration
+from .schemas import AgendaItemOut
+from .visibility import leader_club_ids
+
+AGENDA_DAYS = 7
+AGENDA_CACHE_SECONDS = 24 * 60 * 60
+
+agenda_cache = cache.VersionedCache(max_entries=50000, ttl_seconds=AGENDA_CACHE_SECONDS)
+series_cache = cache.VersionedCache(max_entries=20000, ttl_seconds=AGENDA_CACHE_SECONDS)
+
+
+def agenda_events_query(db: Session, user: User) -> Query:
+    participating = CalendarEvent.id.in_(select(EventParticipant.event_id).where(EventParticipant.user_id == user.id))
+    query = db.query(CalendarEvent).filter(CalendarEvent.status == EventStatus.approved)
+    if user.role == UserRole.club_leader:
+        return query.filter(or_(participating, CalendarEvent.club_id.in_(leader_club_ids(db, user.id))))
+    return query.filter(participating)
+
+
+def series_starts(event: CalendarEvent, day: date) -> List[datetime]:
+    tag = f"{event.rrule}|{event.starts_at.isoformat()}"
+    starts = series_cache.get((event.id, day), tag)
+    if starts is None:
+        low = datetime.combine(day, time.min)
+        high = low + timedelta(days=AGENDA_DAYS)
+        rule = rrulestr(event.rrule, dtstart=event.starts_at)
+        starts = [start for start in rule.between(low, high, inc=True) if start < high]
+        series_cache.set((event.id, day), tag, starts)
+    return starts
+
+
+def build_agenda(db: Session, user: User, day: date) -> List[AgendaItemOut]:
+    low = datetime.combine(day, time.min)
+    high = low + timedelta(days=AGENDA_DAYS)
+    events = (
+        agenda_events_query(db, user)
+        .options(joinedload(CalendarEvent.room))
+        .filter(
+            CalendarEvent.starts_at < high,
+            or_(CalendarEvent.rrule.is_not(None), CalendarEvent.starts_at >= low),
+        )
+        .all()
+    )
+
+    occurrences: List[Tuple[datetime, CalendarEvent]] = []
+    for event in events:
+        if event.rrule:
+            occurrences.extend((start, event) for start in series_starts(event, day))
+        else:
+            occurrences.append((event.starts_at, event))
+    occurrences.sort(key=lambda occurrence: (occurrence[0], occurrence[1].id))
+
+    return [
+        AgendaItemOut(
+            event_id=event.id,
+            title=event.title,
+            event_type=event.event_type.value,
+            starts_at=start,
+            ends_at=event.ends_at if not event.rrule and event.ends_at else start + event_duration(event),
+            room_code=event.room.code if event.room else None,
+        )
+        for start, event in occurrences
+    ]
+
+
+def agenda(db: Session, user: User, day: date, days: int) -> List[AgendaItemOut]:
+    tag = f"{cache.version(cache.CALENDAR, cache.CLUBS)}|{user.role.value}"
+    items = agenda_cache.get((user.id, day), tag)
+    if items is None:
+        items = build_agenda(db, user, day)
+        agenda_cache.set((user.id, day), tag, items)
+    until = datetime.combine(day + timedelta(days=days), time.min)
+    return [item for item in items if item.starts_at < until]
@@ -0,0 +1,209 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+from dateutil.rrule import rrulestr
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from .models import CalendarEvent, EventStatus, Room
+from .recurrence import event_duration
+
+OPEN_HOUR = 8
+CLOSE_HOUR = 22
+HOURS_PER_WEEK = 7 * 24
+PEAK_HOURS = 3
+MAX_SPAN = timedelta(days=366)
+ONE_OFF_SLACK = timedelta(days=1)
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+SIMPLE_RULE_PARTS = {"FREQ", "INTERVAL", "BYDAY", "UNTIL", "COUNT", "WKST"}
+
+
+@dataclass
+class RoomUsage:
+    rooms: List[Room]
+    busy_minutes: np.ndarray
+    open_minutes: float
+    hour_of_day_busy: np.ndarray
+    heatmaps: np.ndarray
+    overall_heatmap: np.ndarray
+
+
+def _minutes(value: datetime) -> int:
+    return int(np.datetime64(value, "m").astype(np.int64))
+
+
+def _parse_until(value: str) -> Optional[datetime]:
+    fmt = {15: "%Y%m%dT%H%M%S", 13: "%Y%m%dT%H%M", 8: "%Y%m%d"}.get(len(value))
+    try:
+        return datetime.strptime(value, fmt) if fmt else None
+    except ValueError:
+        return None
+
+
+def simple_rule_starts(rrule: str, dtstart: datetime, low: datetime, high: datetime) -> Optional[np.ndarray]:
+    text = rrule.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+    if "\n" in text or ":" in text:
+        return None
+    try:
+        parts = dict(part.split("=", 1) for part in text.upper().split(";") if part)
+    except ValueError:
+        return None
+    freq = parts.get("FREQ")
+    if not parts.keys() <= SIMPLE_RULE_PARTS or freq not in ("DAILY", "WEEKLY") or parts.get("WKST", "MO") != "MO":
+        return None
+    if dtstart.second or dtstart.microsecond:
+        return None
+
+    interval = int(parts.get("INTERVAL", "1"))
+    count = int(parts["COUNT"]) if "COUNT" in parts else None
+    until = _parse_until(parts["UNTIL"]) if "UNTIL" in parts else None
+    if interval < 1 or ("UNTIL" in parts and until is None):
+        return None
+
+    start = _minutes(dtstart)
+    last = min(_minutes(high), _minutes(until) if until else _minutes(high))
+    if freq == "DAILY":
+        if "BYDAY" in parts:
+            return None
+        period, offsets, base = interval * 1440, np.zeros(1, dtype=np.int64), start
+    else:
+        days = [WEEKDAYS.get(day) for day in parts.get("BYDAY", "").split(",") if day] or [dtstart.weekday()]
+        if None in days:
+            return None
+        period = interval * 7 * 1440
+        offsets = np.asarray(sorted(set(days)), dtype=np.int64) * 1440
+        base = start - dtstart.weekday() * 1440
+
+    if count is None:
+        first = max(0, (_minutes(low) - 1440 * 7 - base) // period)
+    else:
+        first = 0
+    periods = max(0, (last - base) // period + 1 - first)
+    starts = (base + (first + np.arange(periods, dtype=np.int64))[:, None] * period + offsets[None, :]).ravel()
+    starts = starts[starts >= start]
+    if count is not None:
+        starts = starts[:count]
+    return starts[starts <= last]
+
+
+def _occurrences(db: Session, room_index: dict, low: datetime, high: datetime):
+    events = db.query(
+        CalendarEvent.room_id,
+        CalendarEvent.starts_at,
+        CalendarEvent.ends_at,
+        CalendarEvent.rrule,
+        CalendarEvent.duration_minutes,
+    ).filter(
+        CalendarEvent.room_id.in_(list(room_index)),
+        CalendarEvent.status == EventStatus.approved,
+        CalendarEvent.starts_at < high,
+        or_(
+            CalendarEvent.rrule.is_not(None),
+            CalendarEvent.ends_at > low,
+            and_(CalendarEvent.ends_at.is_(None), CalendarEvent.starts_at > low - ONE_OFF_SLACK),
+        ),
+    )
+    room_ids: List[np.ndarray] = []
+    starts: List[np.ndarray] = []
+    durations: List[np.ndarray] = []
+    lowest, highest = _minutes(low), _minutes(high)
+    for event in events:
+        duration = event_duration(event)
+        minutes = int(duration.total_seconds() // 60)
+        if event.rrule:
+            event_starts = simple_rule_starts(event.rrule, event.starts_at, low - duration, high)
+            if event_starts is None:
+                rule = rrulestr(event.rrule, dtstart=event.starts_at)
+                event_starts = np.asarray(rule.between(low - duration, high, inc=True), dtype="datetime64[m]")
+                event_starts = event_starts.astype(np.int64)
+            event_starts = event_starts[(event_starts + minutes > lowest) & (event_starts < highest)]
+        else:
+            if event.ends_at:
+                minutes = int((event.ends_at - event.starts_at).total_seconds() // 60)
+            event_starts = np.asarray([_minutes(event.starts_at)], dtype=np.int64)
+        room_ids.append(np.full(len(event_starts), room_index[event.room_id], dtype=np.int64))
+        starts.append(event_starts)
+        durations.append(np.full(len(event_starts), minutes, dtype=np.int64))
+    if not starts:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    return np.concatenate(room_ids), np.concatenate(starts), np.concatenate(durations)
+
+
+def merge_intervals(room_ids: np.ndarray, begin: np.ndarray, end: np.ndarray, stride: int):
+    if not len(begin):
+        return room_ids, begin, end
+    order = np.lexsort((begin, room_ids))
+    room_ids, begin, end = room_ids[order], begin[order], end[order]
+    offset = room_ids * stride
+    reach = np.maximum.accumulate(end + offset) - offset
+    starts_segment = np.ones(len(begin), dtype=bool)
+    starts_segment[1:] = (room_ids[1:] != room_ids[:-1]) | (begin[1:] > reach[:-1])
+    heads = np.flatnonzero(starts_segment)
+    return room_ids[heads], begin[heads], np.maximum.reduceat(end, heads)
+
+
+def room_usage(db: Session, low: datetime, high: datetime) -> RoomUsage:
+    low = low.replace(minute=0, second=0, microsecond=0)
+    rooms = db.query(Room).filter(Room.is_active.is_(True)).order_by(Room.code.asc()).all()
+    room_index = {room.id: index for index, room in enumerate(rooms)}
+    hours = int(np.ceil((high - low).total_seconds() / 3600))
+
+    hour_of_week = (low.weekday() * 24 + low.hour + np.arange(hours)) % HOURS_PER_WEEK
+    hour_of_day = hour_of_week % 24
+    is_open = (hour_of_day >= OPEN_HOUR) & (hour_of_day < CLOSE_HOUR)
+    slots_per_hour_of_week = np.bincount(hour_of_week, minlength=HOURS_PER_WEEK)
+
+    busy = np.zeros((len(rooms), hours), dtype=np.float64)
+    if rooms:
+        room_ids, starts, durations = _occurrences(db, room_index, low, high)
+        begin = starts - _minutes(low)
+        end = np.minimum(begin + durations, hours * 60)
+        begin = np.maximum(begin, 0)
+        keep = end > begin
+        room_ids, begin, end = merge_intervals(room_ids[keep], begin[keep], end[keep], hours * 60 + 1)
+
+        first = begin // 60
+        spans = (end - 1) // 60 - first + 1
+        group = np.repeat(np.arange(len(first)), spans)
+        offset = np.arange(len(group)) - np.repeat(np.cumsum(spans) - spans, spans)
+        hour = first[group] + offset
+        covered = np.minimum(end[group], (hour + 1) * 60) - np.maximum(begin[group], hour * 60)
+        cells = room_ids[group] * hours + hour
+        busy = np.bincount(cells, weights=covered, minlength=len(rooms) * hours).reshape(len(rooms), hours)
+
+    open_busy = busy * is_open
+    shift = low.weekday() * 24 + low.hour
+    weeks = -(-(shift + hours) // HOURS_PER_WEEK)
+    padded = np.zeros((len(rooms), weeks * HOURS_PER_WEEK))
+    padded[:, shift : shift + hours] = busy
+    by_hour_of_week = padded.reshape(len(rooms), weeks, HOURS_PER_WEEK).sum(axis=1)
+    capacity = slots_per_hour_of_week * 60.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        heatmaps = np.nan_to_num(by_hour_of_week / capacity)
+        overall = np.nan_to_num(by_hour_of_week.sum(axis=0) / (capacity * max(len(rooms), 1)))
+    hour_of_day_busy = by_hour_of_week.reshape(len(rooms), 7, 24).sum(axis=1)
+
+    return RoomUsage(
+        rooms=rooms,
+        busy_minutes=open_busy.sum(axis=1),
+        open_minutes=float(is_open.sum() * 60),
+        hour_of_day_busy=hour_of_day_busy,
+        heatmaps=heatmaps.reshape(len(rooms), 7, 24),
+        overall_heatmap=overall.reshape(7, 24),
+    )
+
+
+def peak_hours(hour_of_day_busy: np.ndarray, limit: int = PEAK_HOURS) -> List[int]:
+    order = np.argsort(-hour_of_day_busy, kind="stable")[:limit]
+    return sorted(int(hour) for hour in order if hour_of_day_busy[hour] > 0)
+
+
+def occupancy(busy_minutes: float, open_minutes: float) -> Optional[float]:
+    if not open_minutes:
+        return None
+    return round(float(busy_minutes) / open_minutes, 4)
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from . import jobs
+from .models import Broadcast, Club, ClubMember, Job, User, UserRole
+from .schemas import BroadcastOut
+from .telegram import TelegramClient, chat_id_for
+from .visibility import leader_club_ids
+
+logger = logging.getLogger("roomly.broadcasts")
+
+PAGE_SIZE = 50
+
+
+def require_broadcaster(db: Session, user: User, club: Club) -> None:
+    if user.role != UserRole.admin and club.id not in leader_club_ids(db, user.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="not a leader for this club")
+
+
+def start_broadcast(db: Session, club: Club, user: User, text: str) -> Broadcast:
+    total = db.scalar(select(func.count()).select_from(ClubMember).where(ClubMember.club_id == club.id))
+    broadcast = Broadcast(club_id=club.id, created_by=user.id, text=text.strip(), total=total)
+    db.add(broadcast)
+    db.flush()
+    broadcast.job_id = jobs.enqueue(db, "broadcast", {"broadcast_id": broadcast.id}, created_by=user.id).id
+    db.commit()
+    return broadcast
+
+
+def broadcast_out(broadcast: Broadcast) -> BroadcastOut:
+    return BroadcastOut(
+        id=broadcast.id,
+        club_id=broadcast.club_id,
+        status=broadcast.job.status.value if broadcast.job else "unknown",
+        total=broadcast.total,
+        sent=broadcast.sent,
+        failed=broadcast.failed,
+        job_id=broadcast.job_id,
+        created_at=broadcast.created_at,
+    )
+
+
+def member_page(db: Session, club_id: int, after: int) -> List[Tuple[int, Optional[str]]]:
+    return db.execute(
+        select(ClubMember.user_id, User.tg_id)
+        .join(User, User.id == ClubMember.user_id)
+        .where(ClubMember.club_id == club_id, ClubMember.user_id > after)
+        .order_by(ClubMember.user_id.asc())
+        .limit(PAGE_SIZE)
+    ).all()
+
+
+async def deliver(db: Session, broadcast: Broadcast, client: TelegramClient) -> None:
+    club_name = db.scalar(select(Club.name).where(Club.id == broadcast.club_id))
+    text = f"{club_name}:\n{broadcast.text}"
+    while True:
+        page = member_page(db, broadcast.club_id, broadcast.last_user_id)
+        if not page:
+            return
+        chats = [chat_id_for(tg_id) for _, tg_id in page]
+        results = await asyncio.gather(*(client.send_message(chat, text) for chat in chats if chat is not None))
+        sent = sum(result.ok for result in results)
+        db.execute(
+            update(Broadcast)
+            .where(Broadcast.id == broadcast.id)
+            .values(
+                sent=Broadcast.sent + sent,
+                failed=Broadcast.failed + len(page) - sent,
+                last_user_id=page[-1][0],
+            )
+        )
+        db.commit()
+        db.refresh(broadcast)
+
+
+@jobs.handler("broadcast", max_attempts=5)
+def _broadcast_job(db: Session, job: Job) -> dict:
+    broadcast = db.get(Broadcast, job.payload["broadcast_id"])
+    if broadcast is None:
+        return {"sent": 0, "failed": 0}
+
+    async def run() -> None:
+        async with TelegramClient() as client:
+            await deliver(db, broadcast, client)
+
+    asyncio.run(run())
+    logger.info("broadcast %s finished: %d sent, %d failed", broadcast.id, broadcast.sent, broadcast.failed)
+    return {"sent": broadcast.sent, "failed": broadcast.failed}
@@ -0,0 +1,55 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+CALENDAR = "calendar"
+CLUBS = "clubs"
+ROOMS = "rooms"
+USERS = "users"
+
+_epoch = secrets.token_hex(4)
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def version(*scopes: str) -> str:
+    return ".".join([_epoch, *(str(_versions.get(scope, 0)) for scope in scopes)])
+
+
+def invalidate(*scopes: str) -> None:
+    with _lock:
+        for scope in scopes:
+            _versions[scope] = _versions.get(scope, 0) + 1
+
+
+class VersionedCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[str, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, tag: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_tag, stored_at, value = entry
+            if entry_tag != tag or time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def set(self, key: Hashable, tag: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (tag, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
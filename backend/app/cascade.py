@@ -0,0 +1,63 @@
+from typing import List, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from . import cache, jobs, live
+from .models import CalendarEvent, Club, Job, User
+
+CASCADE_CHUNK_SIZE = 500
+INLINE_CASCADE_LIMIT = 500
+
+OWNED_EVENTS = {
+    User: lambda ids: CalendarEvent.created_by.in_(ids),
+    Club: lambda ids: CalendarEvent.club_id.in_(ids),
+}
+SCOPES = {
+    User: (cache.CALENDAR, cache.CLUBS, cache.USERS),
+    Club: (cache.CALENDAR, cache.CLUBS),
+}
+
+
+def existing_ids(db: Session, model, ids: Sequence[int]) -> List[int]:
+    return sorted(db.scalars(select(model.id).where(model.id.in_(ids))))
+
+
+def is_large(db: Session, model, ids: Sequence[int]) -> bool:
+    owned = select(CalendarEvent.id).where(OWNED_EVENTS[model](ids)).offset(INLINE_CASCADE_LIMIT).limit(1)
+    return db.scalar(owned) is not None
+
+
+def delete_events(db: Session, event_ids: Sequence[int]) -> None:
+    for start in range(0, len(event_ids), CASCADE_CHUNK_SIZE):
+        chunk = list(event_ids[start : start + CASCADE_CHUNK_SIZE])
+        live.events_removed(db, chunk)
+        db.execute(delete(CalendarEvent).where(CalendarEvent.id.in_(chunk)))
+        db.commit()
+        cache.invalidate(cache.CALENDAR)
+
+
+def _purge_owned_events(db: Session, condition) -> None:
+    while True:
+        chunk = db.scalars(select(CalendarEvent.id).where(condition).limit(CASCADE_CHUNK_SIZE)).all()
+        if not chunk:
+            return
+        delete_events(db, chunk)
+
+
+def purge(db: Session, model, ids: Sequence[int]) -> None:
+    _purge_owned_events(db, OWNED_EVENTS[model](ids))
+    live.scopes_changed(db, SCOPES[model])
+    db.execute(delete(model).where(model.id.in_(ids)))
+    db.commit()
+    cache.invalidate(*SCOPES[model])
+
+
+PURGE_MODELS = {"user": User, "club": Club}
+
+
+@jobs.handler("purge", max_attempts=3)
+def _purge_job(db: Session, job: Job) -> dict:
+    ids = job.payload["ids"]
+    purge(db, PURGE_MODELS[job.payload["model"]], ids)
+    return {"deleted": ids}
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import CalendarEvent
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.roomly.columnar+json"
+
+SERIES_FIELDS = ("id", "title", "event_type", "status", "room_id", "room_code", "club_id", "recurring", "duration")
+
+Series = Tuple[CalendarEvent, Optional[str], Optional[timedelta], Sequence[datetime]]
+
+
+def accepts_columnar(accept: Optional[str]) -> bool:
+    if not accept:
+        return False
+    return any(part.split(";")[0].strip() == COLUMNAR_MEDIA_TYPE for part in accept.split(","))
+
+
+def encode_calendar(series: Iterable[Series], base: datetime) -> dict:
+    base = base.replace(second=0, microsecond=0)
+    columns: Dict[str, list] = {name: [] for name in SERIES_FIELDS}
+    durations: List[Optional[int]] = []
+    occurrence_series: List[int] = []
+    offsets: List[int] = []
+
+    for event, room_code, duration, starts in series:
+        if not starts:
+            continue
+        index = len(durations)
+        columns["id"].append(event.id)
+        columns["title"].append(event.title)
+        columns["event_type"].append(event.event_type.value)
+        columns["status"].append(event.status.value)
+        columns["room_id"].append(event.room_id)
+        columns["room_code"].append(room_code)
+        columns["club_id"].append(event.club_id)
+        columns["recurring"].append(1 if event.rrule else 0)
+        durations.append(int(duration.total_seconds()) if duration is not None else None)
+        for start in starts:
+            occurrence_series.append(index)
+            offsets.append(int((start - base).total_seconds()))
+
+    unit = 1
+    if all(value % 60 == 0 for value in offsets) and all(
+        value % 60 == 0 for value in durations if value is not None
+    ):
+        unit = 60
+        offsets = [value // 60 for value in offsets]
+        durations = [value // 60 if value is not None else None for value in durations]
+
+    columns["duration"] = durations
+    return {
+        "base": base.isoformat(),
+        "unit": unit,
+        "series": columns,
+        "occurrences": {"series": occurrence_series, "start": offsets},
+    }
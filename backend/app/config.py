@@ -15,3 +15,21 @@ JWT_SECRET = os.getenv("JWT_SECRET", "change-me")
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
 JWT_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES_MINUTES", "1440"))
 APP_TZ = os.getenv("APP_TZ", "Asia/Almaty")
+ICS_FEED_SECRET = os.getenv("ICS_FEED_SECRET", JWT_SECRET)
+ICS_CACHE_SECONDS = int(os.getenv("ICS_CACHE_SECONDS", "300"))
+SQL_INSTRUMENT = os.getenv("SQL_INSTRUMENT", "").lower() in ("1", "true", "yes")
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", "100"))
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "5"))
+PROFILE_ROLLING = os.getenv("PROFILE_ROLLING", "").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+PROFILE_REQUEST_INTERVAL_MS = float(os.getenv("PROFILE_REQUEST_INTERVAL_MS", "2"))
+PROFILE_WINDOW_MINUTES = int(os.getenv("PROFILE_WINDOW_MINUTES", "10"))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "20"))
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", "1"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_RATE_PER_SECOND = float(os.getenv("TELEGRAM_RATE_PER_SECOND", "25"))
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "").lower() in ("1", "true", "yes")
+REMINDER_LEAD_MINUTES = int(os.getenv("REMINDER_LEAD_MINUTES", "15"))
+TELEGRAM_CONCURRENCY = int(os.getenv("TELEGRAM_CONCURRENCY", "8"))
@@ -0,0 +1,114 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import islice, takewhile
+from typing import Dict, List, Sequence, Set, Tuple
+
+from dateutil.rrule import rrulestr
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import Session
+
+from .models import CalendarEvent, EventStatus
+from .recurrence import event_duration
+
+CONFLICT_HORIZON = timedelta(days=180)
+MAX_OCCURRENCES = 500
+ONE_OFF_SLACK = timedelta(days=1)
+BOOKING_LOCK_KEY = 72_616_002
+
+Interval = Tuple[datetime, datetime]
+
+
+def occurrence_intervals(event: CalendarEvent) -> List[Interval]:
+    duration = event_duration(event)
+    if not event.rrule:
+        return [(event.starts_at, event.ends_at or event.starts_at + duration)]
+    until = event.starts_at + CONFLICT_HORIZON
+    rule = rrulestr(event.rrule, dtstart=event.starts_at)
+    starts = takewhile(lambda start: start < until, rule.xafter(event.starts_at, inc=True))
+    return [(start, start + duration) for start in islice(starts, MAX_OCCURRENCES)]
+
+
+def lock_bookings(db: Session) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": BOOKING_LOCK_KEY})
+
+
+class RoomBookings:
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.bookings: List[Tuple[datetime, datetime, int]] = []
+        self.longest = timedelta(0)
+
+    def add(self, start: datetime, end: datetime, event_id: int) -> None:
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.bookings.insert(index, (start, end, event_id))
+        self.longest = max(self.longest, end - start)
+
+    def overlapping(self, start: datetime, end: datetime) -> Set[int]:
+        found = set()
+        index = bisect_left(self.starts, end) - 1
+        while index >= 0 and self.starts[index] > start - self.longest:
+            booked_start, booked_end, event_id = self.bookings[index]
+            if booked_end > start and booked_start < end:
+                found.add(event_id)
+            index -= 1
+        return found
+
+
+def _load_bookings(db: Session, room_ids: Set[int], low: datetime, high: datetime) -> Dict[int, RoomBookings]:
+    approved = db.query(CalendarEvent).filter(
+        CalendarEvent.room_id.in_(room_ids),
+        CalendarEvent.status == EventStatus.approved,
+        CalendarEvent.starts_at < high,
+    )
+    one_offs = approved.filter(
+        CalendarEvent.rrule.is_(None),
+        or_(
+            CalendarEvent.ends_at > low,
+            and_(CalendarEvent.ends_at.is_(None), CalendarEvent.starts_at > low - ONE_OFF_SLACK),
+        ),
+    )
+    series = approved.filter(CalendarEvent.rrule.is_not(None))
+
+    rooms: Dict[int, RoomBookings] = defaultdict(RoomBookings)
+    for event in one_offs:
+        for start, end in occurrence_intervals(event):
+            rooms[event.room_id].add(start, end, event.id)
+    for event in series:
+        duration = event_duration(event)
+        rule = rrulestr(event.rrule, dtstart=event.starts_at)
+        for start in rule.between(low - duration, high, inc=True):
+            rooms[event.room_id].add(start, start + duration, event.id)
+    return rooms
+
+
+def room_conflicts(db: Session, events: Sequence[CalendarEvent], book: bool = False) -> Dict[int, List[int]]:
+    candidates = sorted(
+        (event for event in events if event.room_id is not None),
+        key=lambda event: (event.starts_at, event.id),
+    )
+    if not candidates:
+        return {}
+    intervals = {event.id: occurrence_intervals(event) for event in candidates}
+    spans = [interval for event_intervals in intervals.values() for interval in event_intervals]
+    if not spans:
+        return {}
+    low = min(start for start, _ in spans)
+    high = max(end for _, end in spans)
+    rooms = _load_bookings(db, {event.room_id for event in candidates}, low, high)
+
+    conflicts: Dict[int, List[int]] = {}
+    for event in candidates:
+        bookings = rooms[event.room_id]
+        clashes: Set[int] = set()
+        for start, end in intervals[event.id]:
+            clashes |= bookings.overlapping(start, end)
+        clashes.discard(event.id)
+        if clashes:
+            conflicts[event.id] = sorted(clashes)
+        elif book:
+            for start, end in intervals[event.id]:
+                bookings.add(start, end, event.id)
+    return conflicts
@@ -1,9 +1,18 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+from . import instrumentation
 from .config import DATABASE_URL
 
 engine = create_engine(DATABASE_URL, future=True)
+instrumentation.install(engine)
+
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
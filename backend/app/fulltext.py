@@ -0,0 +1,54 @@
+import re
+from typing import List
+
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.orm import Query
+
+from .models import CalendarEvent
+
+FTS_CONFIG = "simple"
+SQLITE_FTS_TABLE = "calendar_events_fts"
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+MAX_TERMS = 8
+
+_TERM = re.compile(r"[^\W_]+")
+
+
+def search_terms(query: str) -> List[str]:
+    return _TERM.findall(query.lower())[:MAX_TERMS]
+
+
+def _postgres_search(query: Query, terms: List[str]) -> Query:
+    tsquery = func.to_tsquery(FTS_CONFIG, " & ".join(f"{term}:*" for term in terms))
+    vector = literal_column("calendar_events.search_vector")
+    rank = func.ts_rank_cd(vector, tsquery).label("rank")
+    return (
+        query.filter(vector.op("@@")(tsquery))
+        .add_columns(rank)
+        .order_by(rank.desc(), CalendarEvent.starts_at.desc(), CalendarEvent.id.desc())
+    )
+
+
+def _sqlite_search(query: Query, terms: List[str]) -> Query:
+    match = " ".join(f'"{term}"*' for term in terms)
+    hits = (
+        select(
+            literal_column("rowid").label("event_id"),
+            literal_column(f"bm25({SQLITE_FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT})").label("score"),
+        )
+        .select_from(text(SQLITE_FTS_TABLE))
+        .where(text(f"{SQLITE_FTS_TABLE} MATCH :fts_match").bindparams(fts_match=match))
+        .subquery()
+    )
+    return (
+        query.join(hits, hits.c.event_id == CalendarEvent.id)
+        .add_columns((-hits.c.score).label("rank"))
+        .order_by(hits.c.score.asc(), CalendarEvent.starts_at.desc(), CalendarEvent.id.desc())
+    )
+
+
+def search_events(query: Query, dialect: str, terms: List[str]) -> Query:
+    if dialect == "postgresql":
+        return _postgres_search(query, terms)
+    return _sqlite_search(query, terms)
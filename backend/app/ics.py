@@ -0,0 +1,256 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .config import APP_TZ
+
+
+class ICSError(Exception):
+    pass
+
+
+@dataclass
+class VEvent:
+    line: int
+    uid: Optional[str] = None
+    summary: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    dtstart: Optional[datetime] = None
+    dtend: Optional[datetime] = None
+    duration: Optional[timedelta] = None
+    rrule: Optional[str] = None
+    exdates: List[datetime] = field(default_factory=list)
+    attendees: List[str] = field(default_factory=list)
+    recurrence_id: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def duration_minutes(self) -> Optional[int]:
+        if self.duration is not None:
+            return int(self.duration.total_seconds() // 60)
+        if self.dtstart and self.dtend:
+            return int((self.dtend - self.dtstart).total_seconds() // 60)
+        return None
+
+    def rrule_text(self) -> Optional[str]:
+        if not self.rrule:
+            return None
+        if not self.exdates:
+            return self.rrule
+        exdates = ",".join(format_local(value) for value in self.exdates)
+        return f"RRULE:{self.rrule}\nEXDATE:{exdates}"
+
+
+_DURATION_RE = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+def _local_zone() -> ZoneInfo:
+    return ZoneInfo(APP_TZ)
+
+
+def format_local(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def unfold_lines(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    buffer: Optional[str] = None
+    start = 0
+    for number, raw in enumerate(lines, start=1):
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and buffer is not None:
+            buffer += line[1:]
+            continue
+        if buffer is not None:
+            yield start, buffer
+        buffer = line
+        start = number
+    if buffer is not None:
+        yield start, buffer
+
+
+def split_content_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        raise ICSError("missing ':' in content line")
+
+    name, *raw_params = head.split(";")
+    params = {}
+    for raw in raw_params:
+        key, _, param_value = raw.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def unescape_text(value: str) -> str:
+    return (
+        value.replace("\\N", "\n")
+        .replace("\\n", "\n")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+    )
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    chunks = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74
+    return "\r\n ".join(chunks) + "\r\n"
+
+
+def format_utc(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def rrule_lines(rrule: str) -> List[str]:
+    lines = [line.strip() for line in rrule.splitlines() if line.strip()]
+    if len(lines) == 1 and ":" not in lines[0]:
+        return [f"RRULE:{lines[0]}"]
+    return [line for line in lines if not line.upper().startswith("DTSTART")]
+
+
+def parse_datetime(value: str, params: Dict[str, str]) -> datetime:
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        raise ICSError("all-day events are not supported")
+
+    try:
+        parsed = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        raise ICSError(f"invalid date-time {value!r}")
+
+    if value.endswith("Z"):
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    elif params.get("TZID"):
+        try:
+            parsed = parsed.replace(tzinfo=ZoneInfo(params["TZID"]))
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ICSError(f"unknown TZID {params['TZID']!r}")
+    else:
+        return parsed
+
+    return parsed.astimezone(_local_zone()).replace(tzinfo=None)
+
+
+def parse_duration(value: str) -> timedelta:
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        raise ICSError(f"invalid duration {value!r}")
+    parts = {key: int(val) for key, val in match.groupdict().items() if val and key != "sign"}
+    duration = timedelta(
+        weeks=parts.get("weeks", 0),
+        days=parts.get("days", 0),
+        hours=parts.get("hours", 0),
+        minutes=parts.get("minutes", 0),
+        seconds=parts.get("seconds", 0),
+    )
+    return -duration if match.group("sign") == "-" else duration
+
+
+def normalize_rrule(value: str) -> str:
+    parts = []
+    for part in value.split(";"):
+        key, _, part_value = part.partition("=")
+        if key.upper() == "UNTIL" and part_value:
+            if len(part_value) == 8:
+                part_value = f"{part_value}T235959"
+            else:
+                part_value = format_local(parse_datetime(part_value, {}))
+        parts.append(f"{key.upper()}={part_value}")
+    return ";".join(parts)
+
+
+def _apply_property(event: VEvent, name: str, params: Dict[str, str], value: str) -> None:
+    if name == "UID":
+        event.uid = value.strip()
+    elif name == "SUMMARY":
+        event.summary = unescape_text(value).strip()
+    elif name == "DESCRIPTION":
+        event.description = unescape_text(value)
+    elif name == "LOCATION":
+        event.location = unescape_text(value).strip()
+    elif name == "DTSTART":
+        event.dtstart = parse_datetime(value, params)
+    elif name == "DTEND":
+        event.dtend = parse_datetime(value, params)
+    elif name == "DURATION":
+        event.duration = parse_duration(value)
+    elif name == "RRULE":
+        event.rrule = normalize_rrule(value)
+    elif name == "EXDATE":
+        event.exdates.extend(parse_datetime(item, params) for item in value.split(",") if item)
+    elif name == "ATTENDEE":
+        if value.lower().startswith("mailto:"):
+            event.attendees.append(value[7:].strip().lower())
+    elif name == "RECURRENCE-ID":
+        event.recurrence_id = value
+
+
+def iter_vevents(lines: Iterable[str]) -> Iterator[VEvent]:
+    event: Optional[VEvent] = None
+    nested = 0
+
+    for number, line in unfold_lines(lines):
+        if not line.strip():
+            continue
+        try:
+            name, params, value = split_content_line(line)
+        except ICSError as exc:
+            if event is not None and not event.error:
+                event.error = f"line {number}: {exc}"
+            continue
+
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and event is None:
+                event = VEvent(line=number)
+            elif event is not None:
+                nested += 1
+            continue
+
+        if name == "END":
+            if event is not None and nested:
+                nested -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                yield event
+                event = None
+            continue
+
+        if event is None or nested or event.error:
+            continue
+
+        try:
+            _apply_property(event, name, params, value)
+        except ICSError as exc:
+            event.error = f"line {number}: {exc}"
+
@@ -1,9 +1,11 @@
+from . import migrations
 from .database import engine
 from .models import Base
 
 
 def main():
     Base.metadata.create_all(engine)
+    migrations.run(engine)
 
 
 if __name__ == "__main__":
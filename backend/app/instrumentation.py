@@ -0,0 +1,128 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import SQL_INSTRUMENT, SQL_REPEAT_THRESHOLD, SQL_SLOW_MS
+
+logger = logging.getLogger("roomly.sql")
+
+
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds", "route", "statements")
+
+    def __init__(self, route: Optional[str] = None):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.route = route
+        self.statements: Optional[Dict[str, int]] = {} if SQL_INSTRUMENT else None
+
+
+class QueryCapture:
+    def __init__(self):
+        self.statements: List[str] = []
+        self.parameters: List[Any] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = 2) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for statement in self.statements:
+            counts[statement] = counts.get(statement, 0) + 1
+        return {statement: count for statement, count in counts.items() if count >= threshold}
+
+    def assert_at_most(self, limit: int) -> None:
+        if self.count > limit:
+            listing = "\n".join(f"  {statement}" for statement in self.statements)
+            raise AssertionError(f"expected at most {limit} queries, got {self.count}:\n{listing}")
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("roomly_request_stats", default=None)
+_captures: ContextVar[Tuple[QueryCapture, ...]] = ContextVar("roomly_query_captures", default=())
+
+
+def activate(stats: RequestStats) -> Token:
+    return _current.set(stats)
+
+
+def deactivate(token: Token) -> None:
+    _current.reset(token)
+
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryCapture]:
+    capture = QueryCapture()
+    token = _captures.set(_captures.get() + (capture,))
+    try:
+        yield capture
+    finally:
+        _captures.reset(token)
+
+
+def parameters_shape(parameters: Any, executemany: bool = False) -> str:
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters_shape(parameters[0]) if parameters else "-"
+        return f"{len(parameters)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def report_repeats(stats: RequestStats) -> None:
+    if not stats.statements:
+        return
+    for statement, count in stats.statements.items():
+        if count >= SQL_REPEAT_THRESHOLD:
+            logger.warning("possible N+1 on %s: %d x %s", stats.route or "-", count, " ".join(statement.split()))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+        if stats.statements is not None:
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    if SQL_INSTRUMENT and elapsed * 1000 >= SQL_SLOW_MS:
+        logger.warning(
+            "slow query %.1fms on %s params=%s: %s",
+            elapsed * 1000,
+            stats.route if stats is not None and stats.route else "-",
+            parameters_shape(parameters, executemany),
+            " ".join(statement.split()),
+        )
+
+    for capture in _captures.get():
+        capture.statements.append(statement)
+        capture.parameters.append(None if executemany else parameters)
+
+
+def _handle_error(context):
+    if context.connection is not None:
+        pending = context.connection.info.get("query_start")
+        if pending:
+            pending.pop()
+
+
+def install(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,237 @@
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import Session
+
+from .config import JOB_POLL_SECONDS, JOB_STALE_SECONDS, JOB_WORKER_THREADS
+from .database import SessionLocal
+from .models import Job, JobStatus
+
+logger = logging.getLogger("roomly.jobs")
+
+HANDLER_MODULES = ("app.broadcasts", "app.cascade", "app.lesson_import", "app.stats")
+HEARTBEAT_SECONDS = 30.0
+RETRY_BACKOFF_SECONDS = 30
+ERROR_LIMIT = 2000
+
+Handler = Callable[[Session, Job], Any]
+
+
+@dataclass
+class JobType:
+    run: Handler
+    max_attempts: int
+
+
+HANDLERS: Dict[str, JobType] = {}
+
+
+def handler(kind: str, max_attempts: int = 1) -> Callable[[Handler], Handler]:
+    def register(func: Handler) -> Handler:
+        HANDLERS[kind] = JobType(func, max_attempts)
+        return func
+
+    return register
+
+
+def load_handlers() -> None:
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    created_by: Optional[int] = None,
+    input: Optional[bytes] = None,
+) -> Job:
+    job_type = HANDLERS[kind]
+    now = datetime.utcnow()
+    job = Job(
+        kind=kind,
+        status=JobStatus.queued,
+        payload=payload or {},
+        input=input,
+        created_by=created_by,
+        max_attempts=job_type.max_attempts,
+        created_at=now,
+        run_after=now,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def next_job(now: datetime) -> Select:
+    return (
+        select(Job.id)
+        .where(Job.status == JobStatus.queued, Job.run_after <= now)
+        .order_by(Job.run_after.asc(), Job.id.asc())
+        .limit(1)
+    )
+
+
+def claim(db: Session, worker: str) -> Optional[int]:
+    now = datetime.utcnow()
+    candidate = next_job(now).with_for_update(skip_locked=True).scalar_subquery()
+    job_id = db.execute(
+        update(Job)
+        .where(Job.id == candidate, Job.status == JobStatus.queued)
+        .values(
+            status=JobStatus.running,
+            attempts=Job.attempts + 1,
+            started_at=now,
+            heartbeat_at=now,
+            worker=worker,
+        )
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    db.commit()
+    return job_id
+
+
+def requeue_stale(db: Session) -> int:
+    now = datetime.utcnow()
+    stale = [Job.status == JobStatus.running, Job.heartbeat_at < now - timedelta(seconds=JOB_STALE_SECONDS)]
+    requeued = db.execute(
+        update(Job)
+        .where(*stale, Job.attempts < Job.max_attempts)
+        .values(status=JobStatus.queued, run_after=now, worker=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.execute(
+        update(Job)
+        .where(*stale, Job.attempts >= Job.max_attempts)
+        .values(status=JobStatus.failed, error="worker stopped responding", finished_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return requeued
+
+
+def _heartbeat(job_id: int, done: threading.Event) -> None:
+    while not done.wait(HEARTBEAT_SECONDS):
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.running)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            db.commit()
+        except Exception:
+            logger.exception("job %s heartbeat failed", job_id)
+        finally:
+            db.close()
+
+
+def _failed(db: Session, job: Job, error: str) -> None:
+    now = datetime.utcnow()
+    values: Dict[str, Any] = {"error": error[-ERROR_LIMIT:]}
+    if job.attempts < job.max_attempts:
+        values.update(status=JobStatus.queued, run_after=now + timedelta(seconds=RETRY_BACKOFF_SECONDS * job.attempts))
+    else:
+        values.update(status=JobStatus.failed, finished_at=now)
+    db.execute(update(Job).where(Job.id == job.id).values(**values))
+    db.commit()
+
+
+def execute(job_id: int, session_factory: Callable[[], Session] = SessionLocal) -> None:
+    db = session_factory()
+    done = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job_id, done), name=f"job-{job_id}-heartbeat", daemon=True)
+    beat.start()
+    try:
+        job = db.get(Job, job_id)
+        if job is None:
+            return
+        job_type = HANDLERS.get(job.kind)
+        try:
+            if job_type is None:
+                raise LookupError(f"unknown job kind {job.kind!r}")
+            result = job_type.run(db, job)
+        except Exception as exc:
+            db.rollback()
+            logger.exception("job %s (%s) failed", job_id, job.kind)
+            _failed(db, job, f"{type(exc).__name__}: {exc}")
+            return
+        db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(status=JobStatus.succeeded, result=result, error=None, finished_at=datetime.utcnow())
+        )
+        db.commit()
+    finally:
+        done.set()
+        db.close()
+
+
+class Worker:
+    def __init__(self, threads: int = JOB_WORKER_THREADS, poll_seconds: float = JOB_POLL_SECONDS):
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.threads = threads
+        self.poll_seconds = poll_seconds
+        self.stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._reaped_at = 0.0
+        self._reap_lock = threading.Lock()
+
+    def start(self) -> "Worker":
+        load_handlers()
+        for index in range(self.threads):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.stopping.set()
+        for thread in self._workers:
+            thread.join(timeout)
+
+    def _maybe_reap(self, db: Session) -> None:
+        with self._reap_lock:
+            if time.monotonic() - self._reaped_at < JOB_STALE_SECONDS / 2:
+                return
+            self._reaped_at = time.monotonic()
+        requeued = requeue_stale(db)
+        if requeued:
+            logger.warning("requeued %d stale jobs", requeued)
+
+    def run_once(self) -> bool:
+        db = SessionLocal()
+        try:
+            self._maybe_reap(db)
+            job_id = claim(db, self.name)
+        finally:
+            db.close()
+        if job_id is None:
+            return False
+        execute(job_id)
+        return True
+
+    def _loop(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                ran = self.run_once()
+            except Exception:
+                logger.exception("job worker iteration failed")
+                ran = False
+            if not ran:
+                self.stopping.wait(self.poll_seconds)
+
+
+def start_workers() -> Optional[Worker]:
+    if JOB_WORKER_THREADS <= 0:
+        return None
+    return Worker().start()
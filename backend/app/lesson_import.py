@@ -0,0 +1,202 @@
+import argparse
+import io
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from . import cache, jobs, live
+from .config import APP_TZ
+from .database import SessionLocal
+from .ics import VEvent, iter_vevents
+from .models import (
+    CalendarEvent,
+    EventParticipant,
+    EventStatus,
+    EventType,
+    Job,
+    Room,
+    User,
+    UserRole,
+    key_equals,
+    normalize_key,
+)
+from .schemas import LessonImportIssue, LessonImportReport
+
+IMPORT_BATCH_SIZE = 500
+
+EventKey = Tuple[str, Optional[int], object]
+
+
+def _load_rooms(db: Session) -> Dict[str, int]:
+    return {code_key: room_id for room_id, code_key in db.execute(select(Room.id, Room.code_key)) if code_key}
+
+
+def _load_lesson_keys(db: Session) -> Set[EventKey]:
+    rows = db.execute(
+        select(CalendarEvent.title, CalendarEvent.room_id, CalendarEvent.starts_at).where(
+            CalendarEvent.event_type == EventType.lesson
+        )
+    )
+    return {(title, room_id, starts_at) for title, room_id, starts_at in rows}
+
+
+def _resolve_emails(db: Session, emails: Iterable[str], known: Dict[str, Optional[int]]) -> None:
+    missing = [email for email in set(emails) if email not in known]
+    if not missing:
+        return
+    for user_id, email in db.execute(
+        select(User.id, User.email_key).where(User.email_key.in_(missing))
+    ):
+        known[email] = user_id
+    for email in missing:
+        known.setdefault(email, None)
+
+
+class LessonImporter:
+    def __init__(self, db: Session, created_by: int, batch_size: int = IMPORT_BATCH_SIZE):
+        self.db = db
+        self.created_by = created_by
+        self.batch_size = batch_size
+        self.report = LessonImportReport()
+        self.rooms = _load_rooms(db)
+        self.seen = _load_lesson_keys(db)
+        self.seen_uids: Set[str] = set()
+        self.user_ids: Dict[str, Optional[int]] = {}
+        self.batch: List[Tuple[dict, List[str]]] = []
+
+    def _issue(self, vevent: VEvent, detail: str) -> LessonImportIssue:
+        return LessonImportIssue(line=vevent.line, uid=vevent.uid, title=vevent.summary, detail=detail)
+
+    def add(self, vevent: VEvent) -> None:
+        self.report.processed += 1
+
+        if vevent.error:
+            self.report.errors.append(self._issue(vevent, vevent.error))
+            return
+        if vevent.recurrence_id:
+            self.report.errors.append(self._issue(vevent, "recurrence overrides are not supported"))
+            return
+        if not vevent.summary or not vevent.dtstart:
+            self.report.errors.append(self._issue(vevent, "SUMMARY and DTSTART are required"))
+            return
+
+        duration_minutes = vevent.duration_minutes
+        if not duration_minutes or duration_minutes <= 0:
+            self.report.errors.append(self._issue(vevent, "DTEND or DURATION is required"))
+            return
+
+        room_id = None
+        if vevent.location:
+            room_id = self.rooms.get(normalize_key(vevent.location))
+            if room_id is None:
+                code = vevent.location
+                self.report.unknown_rooms[code] = self.report.unknown_rooms.get(code, 0) + 1
+                return
+
+        if vevent.uid and vevent.uid in self.seen_uids:
+            self.report.duplicates.append(self._issue(vevent, "duplicate UID in file"))
+            return
+        key = (vevent.summary[:200], room_id, vevent.dtstart)
+        if key in self.seen:
+            self.report.duplicates.append(self._issue(vevent, "lesson already exists"))
+            return
+        self.seen.add(key)
+        if vevent.uid:
+            self.seen_uids.add(vevent.uid)
+
+        row = {
+            "title": vevent.summary[:200],
+            "description": vevent.description,
+            "event_type": EventType.lesson,
+            "status": EventStatus.approved,
+            "room_id": room_id,
+            "club_id": None,
+            "starts_at": vevent.dtstart,
+            "ends_at": vevent.dtend or vevent.dtstart + vevent.duration,
+            "rrule": vevent.rrule_text(),
+            "duration_minutes": duration_minutes,
+            "timezone": APP_TZ,
+            "created_by": self.created_by,
+        }
+        self.batch.append((row, vevent.attendees))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+
+        rows = [row for row, _ in self.batch]
+        event_ids = self.db.scalars(
+            insert(CalendarEvent).returning(CalendarEvent.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+
+        _resolve_emails(self.db, (email for _, emails in self.batch for email in emails), self.user_ids)
+        participants = []
+        for event_id, (_, emails) in zip(event_ids, self.batch):
+            user_ids = {self.user_ids[email] for email in emails if self.user_ids.get(email)}
+            participants.extend({"event_id": event_id, "user_id": user_id} for user_id in user_ids)
+            self.report.unknown_attendees += sum(1 for email in set(emails) if not self.user_ids.get(email))
+        if participants:
+            self.db.execute(insert(EventParticipant), participants)
+            self.report.participants += len(participants)
+
+        self.db.commit()
+        self.report.created += len(rows)
+        self.batch.clear()
+
+
+def import_lessons(
+    db: Session,
+    lines: Iterable[str],
+    created_by: int,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> LessonImportReport:
+    importer = LessonImporter(db, created_by, batch_size)
+    for vevent in iter_vevents(lines):
+        importer.add(vevent)
+    importer.flush()
+    if importer.report.created:
+        live.calendar_reset(db)
+        db.commit()
+    cache.invalidate(cache.CALENDAR)
+    return importer.report
+
+
+@jobs.handler("lesson_import")
+def _import_job(db: Session, job: Job) -> dict:
+    lines = io.TextIOWrapper(io.BytesIO(job.input or b""), encoding="utf-8-sig", errors="replace")
+    return import_lessons(db, lines, job.payload["created_by"]).model_dump()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import lessons from an iCalendar file.")
+    parser.add_argument("path", help="path to the .ics file, or - for stdin")
+    parser.add_argument("--admin-email", required=True, help="admin recorded as the lessons' creator")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(key_equals(User.email_key, args.admin_email)).first()
+        if not admin or admin.role != UserRole.admin:
+            print(f"admin not found: {args.admin_email}", file=sys.stderr)
+            return 1
+
+        if args.path == "-":
+            report = import_lessons(db, sys.stdin, admin.id, args.batch_size)
+        else:
+            with open(args.path, encoding="utf-8-sig", errors="replace") as handle:
+                report = import_lessons(db, handle, admin.id, args.batch_size)
+    finally:
+        db.close()
+
+    print(report.model_dump_json(indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
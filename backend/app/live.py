@@ -0,0 +1,356 @@
+import asyncio
+import logging
+import secrets
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import event as sa_event, select as sql_select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import cache
+from .database import SessionLocal, engine as default_engine
+from .dependencies import get_current_user
+from .models import CalendarEvent, EventParticipant, EventStatus, UserRole
+from .visibility import leader_club_ids
+
+logger = logging.getLogger("roomly.live")
+
+CHANNEL = "roomly_calendar"
+ORIGIN = secrets.token_hex(4)
+NOTIFY_ID_LIMIT = 200
+SUBSCRIBER_QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 25.0
+RECONNECT_SECONDS = 5.0
+LISTEN_POLL_SECONDS = 1.0
+PENDING_KEY = "live_changes"
+
+Change = Dict[str, Any]
+
+
+def _small(ids: Iterable[int]) -> Optional[List[int]]:
+    ids = list(ids)
+    return ids if len(ids) <= NOTIFY_ID_LIMIT else None
+
+
+def publish(db: Session, change: Change) -> None:
+    change = {**change, "origin": ORIGIN}
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": orjson.dumps(change).decode()},
+        )
+    else:
+        db.info.setdefault(PENDING_KEY, []).append(change)
+
+
+def _upsert(event_id: int, club_id: Optional[int], status: EventStatus, users: Iterable[int]) -> Change:
+    return {
+        "op": "upsert",
+        "ids": [event_id],
+        "club_id": club_id,
+        "status": status.value,
+        "users": _small(users),
+        "scopes": [cache.CALENDAR],
+    }
+
+
+def event_changed(db: Session, event: CalendarEvent) -> None:
+    db.flush()
+    users = db.scalars(
+        sql_select(EventParticipant.user_id)
+        .where(EventParticipant.event_id == event.id)
+        .limit(NOTIFY_ID_LIMIT + 1)
+    )
+    publish(db, _upsert(event.id, event.club_id, event.status, users))
+
+
+def events_changed(db: Session, status: EventStatus, events: List[Tuple[int, Optional[int]]]) -> None:
+    if not events:
+        return
+    if len(events) > NOTIFY_ID_LIMIT:
+        calendar_reset(db)
+        return
+    participants: Dict[int, List[int]] = defaultdict(list)
+    rows = db.execute(
+        sql_select(EventParticipant.event_id, EventParticipant.user_id).where(
+            EventParticipant.event_id.in_([event_id for event_id, _ in events])
+        )
+    )
+    for event_id, user_id in rows:
+        participants[event_id].append(user_id)
+    for event_id, club_id in events:
+        publish(db, _upsert(event_id, club_id, status, participants[event_id]))
+
+
+def events_removed(
+    db: Session,
+    event_ids: List[int],
+    club_id: Optional[int] = None,
+    users: Optional[Iterable[int]] = None,
+    scopes: Iterable[str] = (cache.CALENDAR,),
+) -> None:
+    if not event_ids:
+        return
+    if len(event_ids) > NOTIFY_ID_LIMIT:
+        calendar_reset(db, scopes)
+        return
+    publish(
+        db,
+        {
+            "op": "remove",
+            "ids": event_ids,
+            "club_id": club_id,
+            "users": _small(users) if users is not None else None,
+            "scopes": list(scopes),
+        },
+    )
+
+
+def participants_left(db: Session, event_id: int, user_ids: List[int]) -> None:
+    publish(db, {"op": "leave", "ids": [event_id], "users": user_ids, "scopes": [cache.CALENDAR]})
+
+
+def calendar_reset(db: Session, scopes: Iterable[str] = (cache.CALENDAR,)) -> None:
+    publish(db, {"op": "reset", "scopes": list(scopes)})
+
+
+def scopes_changed(db: Session, scopes: Iterable[str]) -> None:
+    publish(db, {"op": "invalidate", "scopes": list(scopes)})
+
+
+@sa_event.listens_for(SessionLocal, "after_commit")
+def _dispatch_pending(session: Session) -> None:
+    for change in session.info.pop(PENDING_KEY, []):
+        broker.dispatch(change)
+
+
+@sa_event.listens_for(SessionLocal, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+@dataclass(eq=False)
+class Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[Change]" = field(default_factory=lambda: asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+    overflowed: bool = False
+
+    def offer(self, change: Change) -> None:
+        try:
+            self.queue.put_nowait(change)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broker:
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def dispatch(self, change: Change) -> None:
+        if change.get("origin") != ORIGIN and change.get("scopes"):
+            cache.invalidate(*change["scopes"])
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, change)
+            except RuntimeError:
+                self.unsubscribe(subscriber)
+
+
+broker = Broker()
+
+
+class Listener:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Listener":
+        if self.thread is None or not self.thread.is_alive():
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="live-listener", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self.stopping.is_set():
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                driver = connection.driver_connection
+                driver.autocommit = True
+                driver.cursor().execute(f"LISTEN {CHANNEL}")
+                cache.invalidate(cache.CALENDAR, cache.CLUBS, cache.ROOMS, cache.USERS)
+                broker.dispatch({"op": "reset", "origin": ORIGIN})
+                self._consume(driver)
+            except Exception:
+                logger.exception("calendar listener failed; reconnecting in %.0fs", RECONNECT_SECONDS)
+            finally:
+                if connection is not None:
+                    connection.invalidate()
+            self.stopping.wait(RECONNECT_SECONDS)
+
+    def _consume(self, driver) -> None:
+        probed_at = time.monotonic()
+        while not self.stopping.is_set():
+            for notify in driver.notifies(timeout=LISTEN_POLL_SECONDS):
+                self._receive(notify.payload)
+            if time.monotonic() - probed_at >= HEARTBEAT_SECONDS:
+                driver.execute("SELECT 1")
+                probed_at = time.monotonic()
+
+    def _receive(self, payload: str) -> None:
+        try:
+            change = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            logger.warning("ignoring malformed calendar notification: %.200s", payload)
+            return
+        broker.dispatch(change)
+
+
+listener = Listener(default_engine)
+
+
+def start_listener() -> None:
+    if default_engine.dialect.name == "postgresql":
+        listener.start()
+
+
+def stop_listener(timeout: Optional[float] = None) -> None:
+    listener.stop(timeout)
+
+
+@dataclass
+class Viewer:
+    user_id: int
+    role: UserRole
+    club_ids: Set[int]
+    clubs_version: str
+
+    def needs_lookup(self, change: Change) -> bool:
+        if self.role == UserRole.club_leader:
+            return cache.version(cache.CLUBS) != self.clubs_version
+        if self.role == UserRole.admin:
+            return False
+        return change.get("op") == "upsert" and change.get("users") is None
+
+    def _refresh_clubs(self) -> None:
+        version = cache.version(cache.CLUBS)
+        if version == self.clubs_version:
+            return
+        db = SessionLocal()
+        try:
+            self.club_ids = set(leader_club_ids(db, self.user_id))
+        finally:
+            db.close()
+        self.clubs_version = version
+
+    def _participates(self, event_id: int) -> bool:
+        db = SessionLocal()
+        try:
+            return (
+                db.query(EventParticipant.event_id)
+                .filter(EventParticipant.user_id == self.user_id, EventParticipant.event_id == event_id)
+                .first()
+                is not None
+            )
+        finally:
+            db.close()
+
+    def message(self, change: Change) -> Optional[Change]:
+        op = change.get("op")
+        if op == "reset":
+            return {"op": "reset"}
+        if op == "invalidate":
+            return None
+
+        ids = change.get("ids") or []
+        users = change.get("users")
+        if op == "leave":
+            if self.role == UserRole.student and users and self.user_id in users:
+                return {"op": "remove", "ids": ids}
+            return None
+
+        if self.role == UserRole.club_leader:
+            self._refresh_clubs()
+            club_id = change.get("club_id")
+            if club_id not in self.club_ids and (op == "upsert" or club_id is not None):
+                return None
+        elif self.role != UserRole.admin:
+            if users is not None and self.user_id not in users:
+                return None
+            if op == "upsert":
+                if users is None and not self._participates(ids[0]):
+                    return None
+                if change.get("status") != EventStatus.approved.value:
+                    return {"op": "remove", "ids": ids}
+
+        if op == "remove":
+            return {"op": "remove", "ids": ids}
+        return {"op": "upsert", "ids": ids, "status": change.get("status")}
+
+
+def load_viewer(authorization: Optional[str]) -> Viewer:
+    db = SessionLocal()
+    try:
+        user = get_current_user(authorization, db)
+        club_ids = set(leader_club_ids(db, user.id)) if user.role == UserRole.club_leader else set()
+        return Viewer(user.id, user.role, club_ids, cache.version(cache.CLUBS))
+    finally:
+        db.close()
+
+
+def format_message(message: Change) -> str:
+    return f"event: change\ndata: {orjson.dumps(message).decode()}\n\n"
+
+
+async def change_stream(viewer: Viewer, subscriber: Subscriber) -> AsyncIterator[str]:
+    try:
+        yield f"retry: {int(RECONNECT_SECONDS * 1000)}\n\n"
+        while True:
+            try:
+                change = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if subscriber.overflowed:
+                subscriber.overflowed = False
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                change = {"op": "reset"}
+            if viewer.needs_lookup(change):
+                message = await run_in_threadpool(viewer.message, change)
+            else:
+                message = viewer.message(change)
+            if message:
+                yield format_message(message)
+    finally:
+        broker.unsubscribe(subscriber)
@@ -1,14 +1,56 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
-from .routers import admin, auth, bot_admin, calendar, clubs, rooms
+from .jobs import start_workers
+from .live import start_listener, stop_listener
+from .metrics import MetricsMiddleware, registry
+from .profiling import ProfilingMiddleware, start_process_sampler, stop_process_sampler
+from .reminders import start_reminders
+from .routers import (
+    admin,
+    analytics,
+    auth,
+    bootstrap,
+    bot_admin,
+    calendar,
+    clubs,
+    feeds,
+    jobs,
+    profiles,
+    rooms,
+    search,
+    stats,
+)
+from .static_assets import StaticBundle
+
+SHUTDOWN_SECONDS = 10.0
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    start_process_sampler()
+    start_listener()
+    workers = start_workers()
+    reminders = start_reminders()
+    try:
+        yield
+    finally:
+        if reminders is not None:
+            reminders.stop(SHUTDOWN_SECONDS)
+        if workers is not None:
+            workers.stop(SHUTDOWN_SECONDS)
+        stop_listener(SHUTDOWN_SECONDS)
+        stop_process_sampler()
+
 
-app = FastAPI(title="Roomly API")
+app = FastAPI(title="Roomly API", lifespan=lifespan)
 BASE_DIR = Path(__file__).resolve().parents[2]
+static_bundle = StaticBundle(BASE_DIR)
 
 app.mount("/assets", StaticFiles(directory=BASE_DIR / "assets"), name="assets")
 
@@ -19,6 +61,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(calendar.router, prefix="/api")
@@ -26,18 +70,38 @@ app.include_router(admin.router, prefix="/api")
 app.include_router(bot_admin.router, prefix="/api")
 app.include_router(clubs.router, prefix="/api")
 app.include_router(rooms.router, prefix="/api")
+app.include_router(feeds.router, prefix="/api")
+app.include_router(bootstrap.router, prefix="/api")
+app.include_router(profiles.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
-def root_index():
-    return FileResponse(BASE_DIR / "index.html")
+def root_index(request: Request):
+    return static_bundle.index_response(request)
+
+
+@app.get("/static/{digest}/{name}")
+def fingerprinted_file(digest: str, name: str, request: Request):
+    response = static_bundle.file_response(name, request, digest)
+    if response is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="not found")
+    return response
 
 
 @app.get("/style.css")
-def root_styles():
-    return FileResponse(BASE_DIR / "style.css")
+def root_styles(request: Request):
+    return static_bundle.file_response("style.css", request)
 
 
 @app.get("/script.js")
-def root_script():
-    return FileResponse(BASE_DIR / "script.js")
+def root_script(request: Request):
+    return static_bundle.file_response("script.js", request)
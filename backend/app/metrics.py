@@ -0,0 +1,146 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Sequence, Tuple
+
+from . import instrumentation
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+OTHER_ROUTE = "other"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class RouteMetrics:
+    __slots__ = ("latency", "queries", "sql_seconds", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_seconds = Histogram(LATENCY_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+
+    def started(self) -> None:
+        with self.lock:
+            self.in_flight += 1
+
+    def finished(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        seconds: float,
+        stats: instrumentation.RequestStats,
+    ) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            metrics = self.routes.get((method, route))
+            if metrics is None:
+                metrics = self.routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(seconds)
+            metrics.queries.observe(stats.queries)
+            metrics.sql_seconds.observe(stats.sql_seconds)
+            metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP roomly_http_requests_in_flight Requests currently being served.",
+            "# TYPE roomly_http_requests_in_flight gauge",
+        ]
+        with self.lock:
+            lines.append(f"roomly_http_requests_in_flight {self.in_flight}")
+            routes = sorted(self.routes.items())
+
+            lines.append("# HELP roomly_http_requests_total Completed requests by route and status.")
+            lines.append("# TYPE roomly_http_requests_total counter")
+            for (method, route), metrics in routes:
+                for status_code, count in sorted(metrics.statuses.items()):
+                    labels = f'{_labels(method, route)},status="{status_code}"'
+                    lines.append(f"roomly_http_requests_total{{{labels}}} {count}")
+
+            for name, attr, help_text in (
+                ("roomly_http_request_duration_seconds", "latency", "Request latency by route."),
+                ("roomly_http_request_sql_queries", "queries", "SQL statements issued per request."),
+                ("roomly_http_request_sql_seconds", "sql_seconds", "Time spent in SQL per request."),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), metrics in routes:
+                    lines.extend(getattr(metrics, attr).lines(name, _labels(method, route)))
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{method}",route="{_escape(route)}"'
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = instrumentation.RequestStats(scope["path"])
+        token = instrumentation.activate(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.started()
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            route_path = route.path if route is not None else OTHER_ROUTE
+            registry.finished(scope["method"], route_path, status_code, perf_counter() - started, stats)
+            instrumentation.deactivate(token)
+            if stats.statements:
+                stats.route = f"{scope['method']} {route_path}"
+                instrumentation.report_repeats(stats)
@@ -0,0 +1,267 @@
+import sys
+from datetime import datetime
+from typing import Callable, List, Sequence, Set, Tuple
+
+from sqlalchemy import ForeignKeyConstraint, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from . import stats
+from .database import engine as default_engine
+from .fulltext import FTS_CONFIG, SQLITE_FTS_TABLE
+from .models import Base
+
+MIGRATION_LOCK_KEY = 72_616_001
+
+Migration = Tuple[str, Callable[[Connection], None]]
+
+
+def create_index(
+    conn: Connection,
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    where: str = "",
+    unique: bool = False,
+    using: str = "",
+) -> None:
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    concurrently = "CONCURRENTLY " if conn.dialect.name == "postgresql" else ""
+    method = f" USING {using}" if using else ""
+    predicate = f" WHERE {where}" if where else ""
+    conn.execute(
+        text(
+            f"CREATE {kind} {concurrently}IF NOT EXISTS {name} ON {table}{method} "
+            f"({', '.join(columns)}){predicate}"
+        )
+    )
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    existing = {info["name"] for info in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _hot_filter_indexes(conn: Connection) -> None:
+    create_index(conn, "ix_calendar_events_club_id", "calendar_events", ["club_id"])
+    create_index(conn, "ix_calendar_events_room_starts", "calendar_events", ["room_id", "starts_at"])
+    create_index(conn, "ix_calendar_events_status_starts", "calendar_events", ["status", "starts_at"])
+    create_index(conn, "ix_calendar_events_created_by", "calendar_events", ["created_by"])
+    create_index(conn, "ix_calendar_events_approved_by", "calendar_events", ["approved_by"])
+    create_index(conn, "ix_event_participants_user_event", "event_participants", ["user_id", "event_id"])
+    create_index(conn, "ix_club_members_user_role", "club_members", ["user_id", "role"])
+
+
+def _lookup_keys(conn: Connection) -> None:
+    for table, source, column, length in (
+        ("users", "email", "email_key", 255),
+        ("clubs", "name", "name_key", 128),
+        ("rooms", "code", "code_key", 64),
+    ):
+        add_column(conn, table, column, f"VARCHAR({length})")
+        conn.execute(
+            text(f"UPDATE {table} SET {column} = lower(trim({source})) WHERE {source} IS NOT NULL AND trim({source}) <> ''")
+        )
+        duplicates = conn.execute(
+            text(f"SELECT {column}, count(*) FROM {table} WHERE {column} IS NOT NULL GROUP BY {column} HAVING count(*) > 1")
+        ).all()
+        if duplicates:
+            listed = ", ".join(f"{key!r} x{count}" for key, count in duplicates[:20])
+            raise RuntimeError(f"{table}.{source} has case-insensitive duplicates to resolve first: {listed}")
+        create_index(conn, f"ix_{table}_{column}", table, [column], unique=True)
+
+
+def _event_fulltext(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(
+            text(
+                "ALTER TABLE calendar_events ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS (setweight(to_tsvector('{FTS_CONFIG}', coalesce(title, '')), 'A') || "
+                f"setweight(to_tsvector('{FTS_CONFIG}', coalesce(description, '')), 'B')) STORED"
+            )
+        )
+        create_index(conn, "ix_calendar_events_search_vector", "calendar_events", ["search_vector"], using="GIN")
+        return
+
+    conn.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+            "title, description, content='calendar_events', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON calendar_events BEGIN "
+            f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON calendar_events BEGIN "
+            f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF title, description "
+            f"ON calendar_events BEGIN "
+            f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+    )
+    conn.execute(text(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def _pending_queue(conn: Connection) -> None:
+    create_index(
+        conn, "ix_calendar_events_pending_starts", "calendar_events", ["starts_at", "id"], where="status = 'pending'"
+    )
+
+
+def _stale_foreign_keys(conn: Connection, table: Table) -> List[Tuple[ForeignKeyConstraint, str]]:
+    existing = {
+        tuple(info["constrained_columns"]): (info.get("name"), (info.get("options") or {}).get("ondelete"))
+        for info in inspect(conn).get_foreign_keys(table.name)
+    }
+    stale = []
+    for constraint in table.foreign_key_constraints:
+        name, ondelete = existing.get(tuple(constraint.column_keys), (None, None))
+        if (ondelete or "").upper() != (constraint.ondelete or "").upper():
+            stale.append((constraint, name))
+    return stale
+
+
+def _postgres_replace_foreign_key(conn: Connection, table: Table, constraint: ForeignKeyConstraint, name: str) -> None:
+    name = name or f"{table.name}_{'_'.join(constraint.column_keys)}_fkey"
+    columns = ", ".join(constraint.column_keys)
+    target = constraint.elements[0].column.table.name
+    referenced = ", ".join(element.column.name for element in constraint.elements)
+    conn.execute(
+        text(
+            f"ALTER TABLE {table.name} DROP CONSTRAINT IF EXISTS {name}, "
+            f"ADD CONSTRAINT {name} FOREIGN KEY ({columns}) REFERENCES {target} ({referenced}) "
+            f"ON DELETE {constraint.ondelete} NOT VALID"
+        )
+    )
+    conn.execute(text(f"ALTER TABLE {table.name} VALIDATE CONSTRAINT {name}"))
+
+
+def _sqlite_rebuild_table(conn: Connection, table: Table) -> None:
+    temporary = f"{table.name}_rebuild"
+    dependents = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE tbl_name = :table AND type IN ('index', 'trigger') AND sql IS NOT NULL"),
+        {"table": table.name},
+    ).scalars().all()
+    existing = {info["name"] for info in inspect(conn).get_columns(table.name)}
+    columns = ", ".join(column.name for column in table.columns if column.name in existing)
+    ddl = str(CreateTable(table).compile(conn)).replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {temporary} ", 1)
+    conn.execute(text("BEGIN"))
+    try:
+        conn.execute(text(f"DROP TABLE IF EXISTS {temporary}"))
+        conn.execute(text(ddl))
+        conn.execute(text(f"INSERT INTO {temporary} ({columns}) SELECT {columns} FROM {table.name}"))
+        conn.execute(text(f"DROP TABLE {table.name}"))
+        conn.execute(text(f"ALTER TABLE {temporary} RENAME TO {table.name}"))
+        for sql in dependents:
+            conn.execute(text(sql))
+    except Exception:
+        conn.execute(text("ROLLBACK"))
+        raise
+    conn.execute(text("COMMIT"))
+
+
+def _cascading_foreign_keys(conn: Connection) -> None:
+    create_index(conn, "ix_clubs_owner_user_id", "clubs", ["owner_user_id"])
+    if conn.dialect.name == "postgresql":
+        for table in Base.metadata.sorted_tables:
+            for constraint, name in _stale_foreign_keys(conn, table):
+                _postgres_replace_foreign_key(conn, table, constraint, name)
+        return
+
+    violations = conn.execute(text("PRAGMA foreign_key_check")).all()
+    if violations:
+        listed = ", ".join(f"{row[0]}.rowid={row[1]}" for row in violations[:20])
+        raise RuntimeError(f"foreign key violations to resolve first: {listed}")
+    conn.execute(text("PRAGMA foreign_keys=OFF"))
+    try:
+        for table in Base.metadata.sorted_tables:
+            if _stale_foreign_keys(conn, table):
+                _sqlite_rebuild_table(conn, table)
+    finally:
+        conn.execute(text("PRAGMA foreign_keys=ON"))
+
+
+def _stat_counters(conn: Connection) -> None:
+    stats.install_triggers(conn)
+    stats.recount(conn)
+
+
+def _broadcast_job_index(conn: Connection) -> None:
+    create_index(conn, "ix_broadcasts_job_id", "broadcasts", ["job_id"])
+
+
+MIGRATIONS: List[Migration] = [
+    ("0001_hot_filter_indexes", _hot_filter_indexes),
+    ("0002_lookup_keys", _lookup_keys),
+    ("0003_event_fulltext", _event_fulltext),
+    ("0004_pending_queue", _pending_queue),
+    ("0005_cascading_foreign_keys", _cascading_foreign_keys),
+    ("0006_stat_counters", _stat_counters),
+    ("0007_broadcast_job_index", _broadcast_job_index),
+]
+
+
+def _ensure_table(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(64) PRIMARY KEY, applied_at TIMESTAMP NOT NULL)"
+        )
+    )
+
+
+def applied_versions(conn: Connection) -> Set[str]:
+    _ensure_table(conn)
+    return set(conn.scalars(text("SELECT version FROM schema_migrations")))
+
+
+def run(engine: Engine) -> List[str]:
+    applied = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        postgres = conn.dialect.name == "postgresql"
+        if postgres:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            done = applied_versions(conn)
+            for version, step in MIGRATIONS:
+                if version in done:
+                    continue
+                step(conn)
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, applied_at) VALUES (:version, :applied_at)"),
+                    {"version": version, "applied_at": datetime.utcnow()},
+                )
+                applied.append(version)
+        finally:
+            if postgres:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    return applied
+
+
+def main() -> int:
+    applied = run(default_engine)
+    for version in applied:
+        print(f"applied {version}")
+    if not applied:
+        print("schema is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
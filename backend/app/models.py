@@ -1,24 +1,40 @@
 import enum
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
 from sqlalchemy import (
     Boolean,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
+    false,
+    text,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, validates
 
 
 class Base(DeclarativeBase):
     pass
 
 
+def normalize_key(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.strip().lower() or None
+
+
+def key_equals(column, value: Optional[str]):
+    key = normalize_key(value)
+    return column == key if key is not None else false()
+
+
 class UserRole(enum.Enum):
     student = "student"
     club_leader = "club_leader"
@@ -42,19 +58,32 @@ class EventStatus(enum.Enum):
     cancelled = "cancelled"
 
 
+class JobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
 class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     tg_id: Mapped[str] = mapped_column(String(64), unique=True, index=True)
     email: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True)
+    email_key: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True)
     username: Mapped[Optional[str]] = mapped_column(String(64))
     full_name: Mapped[Optional[str]] = mapped_column(String(128))
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), default=UserRole.student)
     bot_intro_seen: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    club_memberships = relationship("ClubMember", back_populates="user")
+    club_memberships = relationship("ClubMember", back_populates="user", passive_deletes=True)
+
+    @validates("email")
+    def _sync_email_key(self, key, value):
+        self.email_key = normalize_key(value)
+        return value
 
 
 class Club(Base):
@@ -62,19 +91,28 @@ class Club(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(128), unique=True, index=True)
-    owner_user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"))
+    name_key: Mapped[Optional[str]] = mapped_column(String(128), unique=True, index=True)
+    owner_user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    members = relationship("ClubMember", back_populates="club")
-    events = relationship("CalendarEvent", back_populates="club")
+    members = relationship("ClubMember", back_populates="club", passive_deletes=True)
+    events = relationship("CalendarEvent", back_populates="club", passive_deletes=True)
+
+    @validates("name")
+    def _sync_name_key(self, key, value):
+        self.name_key = normalize_key(value)
+        return value
 
 
 class ClubMember(Base):
     __tablename__ = "club_members"
-    __table_args__ = (UniqueConstraint("club_id", "user_id", name="uq_club_member"),)
+    __table_args__ = (
+        UniqueConstraint("club_id", "user_id", name="uq_club_member"),
+        Index("ix_club_members_user_role", "user_id", "role"),
+    )
 
-    club_id: Mapped[int] = mapped_column(ForeignKey("clubs.id"), primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    club_id: Mapped[int] = mapped_column(ForeignKey("clubs.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     role: Mapped[ClubMemberRole] = mapped_column(Enum(ClubMemberRole), default=ClubMemberRole.member)
 
     club = relationship("Club", back_populates="members")
@@ -86,17 +124,34 @@ class Room(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     code: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    code_key: Mapped[Optional[str]] = mapped_column(String(64), unique=True, index=True)
     building: Mapped[Optional[str]] = mapped_column(String(64))
     floor: Mapped[Optional[str]] = mapped_column(String(32))
     room_type: Mapped[Optional[str]] = mapped_column(String(64))
     capacity: Mapped[Optional[int]] = mapped_column(Integer)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
-    events = relationship("CalendarEvent", back_populates="room")
+    events = relationship("CalendarEvent", back_populates="room", passive_deletes=True)
+
+    @validates("code")
+    def _sync_code_key(self, key, value):
+        self.code_key = normalize_key(value)
+        return value
 
 
 class CalendarEvent(Base):
     __tablename__ = "calendar_events"
+    __table_args__ = (
+        Index("ix_calendar_events_room_starts", "room_id", "starts_at"),
+        Index("ix_calendar_events_status_starts", "status", "starts_at"),
+        Index(
+            "ix_calendar_events_pending_starts",
+            "starts_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(200))
@@ -104,8 +159,8 @@ class CalendarEvent(Base):
     event_type: Mapped[EventType] = mapped_column(Enum(EventType))
     status: Mapped[EventStatus] = mapped_column(Enum(EventStatus), default=EventStatus.pending)
 
-    room_id: Mapped[Optional[int]] = mapped_column(ForeignKey("rooms.id"))
-    club_id: Mapped[Optional[int]] = mapped_column(ForeignKey("clubs.id"))
+    room_id: Mapped[Optional[int]] = mapped_column(ForeignKey("rooms.id", ondelete="SET NULL"))
+    club_id: Mapped[Optional[int]] = mapped_column(ForeignKey("clubs.id", ondelete="CASCADE"), index=True)
 
     starts_at: Mapped[datetime] = mapped_column(DateTime)
     ends_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
@@ -113,14 +168,14 @@ class CalendarEvent(Base):
     duration_minutes: Mapped[Optional[int]] = mapped_column(Integer)
     timezone: Mapped[Optional[str]] = mapped_column(String(64))
 
-    created_by: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    created_by: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    approved_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"))
+    approved_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), index=True)
     approved_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
     room = relationship("Room", back_populates="events")
     club = relationship("Club", back_populates="events")
-    participants = relationship("EventParticipant", back_populates="event")
+    participants = relationship("EventParticipant", back_populates="event", passive_deletes=True)
 
     created_by_user = relationship("User", foreign_keys=[created_by])
     approved_by_user = relationship("User", foreign_keys=[approved_by])
@@ -128,10 +183,69 @@ class CalendarEvent(Base):
 
 class EventParticipant(Base):
     __tablename__ = "event_participants"
-    __table_args__ = (UniqueConstraint("event_id", "user_id", name="uq_event_participant"),)
+    __table_args__ = (
+        UniqueConstraint("event_id", "user_id", name="uq_event_participant"),
+        Index("ix_event_participants_user_event", "user_id", "event_id"),
+    )
 
-    event_id: Mapped[int] = mapped_column(ForeignKey("calendar_events.id"), primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    event_id: Mapped[int] = mapped_column(ForeignKey("calendar_events.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
 
     event = relationship("CalendarEvent", back_populates="participants")
     user = relationship("User")
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index(
+            "ix_jobs_queued_run_after",
+            "run_after",
+            "id",
+            postgresql_where=text("status = 'queued'"),
+            sqlite_where=text("status = 'queued'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64))
+    status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), default=JobStatus.queued)
+    payload: Mapped[Any] = mapped_column(JSON, default=dict)
+    input: Mapped[Optional[bytes]] = mapped_column(LargeBinary, deferred=True)
+    result: Mapped[Optional[Any]] = mapped_column(JSON)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=1)
+    created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    worker: Mapped[Optional[str]] = mapped_column(String(64))
+
+
+class Broadcast(Base):
+    __tablename__ = "broadcasts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    club_id: Mapped[int] = mapped_column(ForeignKey("clubs.id", ondelete="CASCADE"), index=True)
+    created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    job_id: Mapped[Optional[int]] = mapped_column(ForeignKey("jobs.id", ondelete="SET NULL"), index=True)
+    text: Mapped[str] = mapped_column(Text)
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    sent: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    last_user_id: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    club = relationship("Club")
+    job = relationship("Job")
+
+
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+
+    scope: Mapped[str] = mapped_column(String(32), primary_key=True)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, default=0)
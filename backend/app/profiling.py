@@ -0,0 +1,269 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Set
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from .config import (
+    PROFILE_INTERVAL_MS,
+    PROFILE_REQUEST_INTERVAL_MS,
+    PROFILE_ROLLING,
+    PROFILE_STORE_SIZE,
+    PROFILE_WINDOW_MINUTES,
+)
+from .database import SessionLocal
+from .dependencies import get_current_user, require_admin
+
+PROFILE_HEADER = b"x-roomly-profile"
+PROFILE_ID_HEADER = b"x-roomly-profile-id"
+
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+
+def _frame_name(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+def collapse_stack(frame) -> Optional[str]:
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+        return None
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+def render_collapsed(samples: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class StackSampler:
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, stack: str) -> None:
+        self.samples[stack] += 1
+
+    def wants(self, ident: int, frame) -> bool:
+        return True
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or not self.wants(ident, frame):
+                    continue
+                stack = collapse_stack(frame)
+                if stack:
+                    self.record(stack)
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="roomly-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+
+class RequestSampler(StackSampler):
+    def __init__(self, interval_ms: float, owner):
+        super().__init__(interval_ms)
+        self.owner = owner
+        self.loop_thread = threading.get_ident()
+        self.threads: Set[int] = set()
+
+    def wants(self, ident: int, frame) -> bool:
+        if ident in self.threads:
+            return True
+        if ident != self.loop_thread:
+            return False
+        while frame is not None:
+            if frame is self.owner:
+                return True
+            frame = frame.f_back
+        return False
+
+
+_active_request: ContextVar[Optional[RequestSampler]] = ContextVar("roomly_profiled_request", default=None)
+
+
+def profiled_thread() -> None:
+    sampler = _active_request.get()
+    if sampler is not None:
+        sampler.threads.add(threading.get_ident())
+
+
+def _registers_thread(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    def run(*args, **kwargs):
+        profiled_thread()
+        return endpoint(*args, **kwargs)
+
+    run.registers_thread = True
+    return run
+
+
+class ProfiledRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if not asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "registers_thread", False):
+            endpoint = _registers_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class RollingSampler(StackSampler):
+    def __init__(self, interval_ms: float, window_minutes: int):
+        super().__init__(interval_ms)
+        self.lock = threading.Lock()
+        self.buckets: deque = deque(maxlen=max(window_minutes, 1))
+        self.bucket_started = 0.0
+
+    def record(self, stack: str) -> None:
+        now = time.monotonic()
+        with self.lock:
+            if not self.buckets or now - self.bucket_started >= 60:
+                self.buckets.append(Counter())
+                self.bucket_started = now
+            self.buckets[-1][stack] += 1
+
+    def snapshot(self) -> Counter:
+        merged: Counter = Counter()
+        with self.lock:
+            for bucket in self.buckets:
+                merged.update(bucket)
+        return merged
+
+
+@dataclass
+class StoredProfile:
+    id: str
+    created_at: datetime
+    method: str
+    path: str
+    duration_ms: float
+    samples: Counter
+
+
+class ProfileStore:
+    def __init__(self, size: int):
+        self.size = size
+        self.lock = threading.Lock()
+        self.profiles: "OrderedDict[str, StoredProfile]" = OrderedDict()
+
+    def add(self, profile: StoredProfile) -> None:
+        with self.lock:
+            self.profiles[profile.id] = profile
+            while len(self.profiles) > self.size:
+                self.profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[StoredProfile]:
+        with self.lock:
+            return self.profiles.get(profile_id)
+
+    def list(self) -> List[StoredProfile]:
+        with self.lock:
+            return list(reversed(self.profiles.values()))
+
+
+store = ProfileStore(PROFILE_STORE_SIZE)
+process_sampler: Optional[RollingSampler] = None
+
+
+def start_process_sampler() -> None:
+    global process_sampler
+    if PROFILE_ROLLING and process_sampler is None:
+        process_sampler = RollingSampler(PROFILE_INTERVAL_MS, PROFILE_WINDOW_MINUTES)
+        process_sampler.start()
+
+
+def stop_process_sampler() -> None:
+    global process_sampler
+    if process_sampler is not None:
+        process_sampler.stop()
+        process_sampler = None
+
+
+def _profile_requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value not in (b"", b"0")
+    query = scope.get("query_string", b"")
+    return b"profile" in query and b"profile=1" in query.split(b"&")
+
+
+def _is_admin(authorization: Optional[str]) -> bool:
+    db = SessionLocal()
+    try:
+        require_admin(get_current_user(authorization, db))
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+        if not await run_in_threadpool(_is_admin, authorization or None):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        sampler = RequestSampler(PROFILE_REQUEST_INTERVAL_MS, sys._getframe())
+        token = _active_request.set(sampler)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            samples = sampler.stop()
+            _active_request.reset(token)
+            store.add(
+                StoredProfile(
+                    id=profile_id,
+                    created_at=datetime.utcnow(),
+                    method=scope["method"],
+                    path=scope["path"],
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                    samples=samples,
+                )
+            )
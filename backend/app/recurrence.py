@@ -0,0 +1,69 @@
+import heapq
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+from zoneinfo import ZoneInfo
+
+from dateutil.rrule import rrulestr
+from sqlalchemy.orm import Session, joinedload
+
+from .config import APP_TZ
+from .models import CalendarEvent, User
+from .visibility import visible_events_query
+
+Occurrence = Tuple[datetime, datetime, CalendarEvent]
+
+
+def local_now() -> datetime:
+    return datetime.now(ZoneInfo(APP_TZ)).replace(tzinfo=None)
+
+
+def to_local_naive(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(ZoneInfo(APP_TZ)).replace(tzinfo=None)
+
+
+def event_duration(event: CalendarEvent) -> timedelta:
+    duration_minutes = event.duration_minutes
+    if not duration_minutes and event.ends_at:
+        duration_minutes = int((event.ends_at - event.starts_at).total_seconds() / 60)
+    if not duration_minutes:
+        duration_minutes = 60
+    return timedelta(minutes=duration_minutes)
+
+
+def iter_series_after(event: CalendarEvent, after: datetime) -> Iterator[Occurrence]:
+    rule = rrulestr(event.rrule, dtstart=event.starts_at)
+    duration = event_duration(event)
+    for occ_start in rule.xafter(after, inc=True):
+        yield occ_start, occ_start + duration, event
+
+
+def iter_one_offs(events: Iterable[CalendarEvent]) -> Iterator[Occurrence]:
+    for event in events:
+        yield event.starts_at, event.ends_at or event.starts_at + event_duration(event), event
+
+
+def merge_occurrences(iterators: Iterable[Iterator[Occurrence]], limit: int) -> List[Occurrence]:
+    merged = heapq.merge(*iterators, key=lambda occurrence: occurrence[0])
+    return list(islice(merged, limit))
+
+
+def upcoming_occurrences(db: Session, user: User, limit: int, after: datetime) -> List[Occurrence]:
+    query = visible_events_query(db, user)
+    if query is None:
+        return []
+    query = query.options(joinedload(CalendarEvent.room))
+
+    series = query.filter(CalendarEvent.rrule.is_not(None)).all()
+    one_offs = (
+        query.filter(CalendarEvent.rrule.is_(None), CalendarEvent.starts_at >= after)
+        .order_by(CalendarEvent.starts_at.asc())
+        .limit(limit)
+        .all()
+    )
+
+    iterators = [iter_series_after(event, after) for event in series]
+    iterators.append(iter_one_offs(one_offs))
+    return merge_occurrences(iterators, limit)
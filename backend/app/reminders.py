@@ -0,0 +1,269 @@
+import asyncio
+import fcntl
+import heapq
+import logging
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from dateutil.rrule import rrulestr
+from sqlalchemy import exists, or_, select, text
+from sqlalchemy.orm import Session, joinedload
+
+from . import cache
+from .config import REMINDER_LEAD_MINUTES, REMINDERS_ENABLED
+from .database import SessionLocal, engine as default_engine
+from .live import start_listener
+from .models import CalendarEvent, EventParticipant, EventStatus, User
+from .recurrence import event_duration, local_now
+from .telegram import SendResult, TelegramClient, chat_id_for
+
+logger = logging.getLogger("roomly.reminders")
+
+REMINDER_LOCK_KEY = 72_616_003
+TICK_SECONDS = 30.0
+LOCK_RETRY_SECONDS = 60.0
+HORIZON = timedelta(hours=6)
+
+Entry = Tuple[datetime, datetime, int]
+Occurrence = Tuple[int, datetime]
+
+
+def load_entries(db: Session, low: datetime, high: datetime, lead: timedelta) -> List[Entry]:
+    has_participants = exists().where(EventParticipant.event_id == CalendarEvent.id)
+    events = db.scalars(
+        select(CalendarEvent).where(
+            CalendarEvent.status == EventStatus.approved,
+            has_participants,
+            or_(
+                CalendarEvent.rrule.is_not(None) & (CalendarEvent.starts_at < high),
+                CalendarEvent.rrule.is_(None) & (CalendarEvent.starts_at >= low) & (CalendarEvent.starts_at < high),
+            ),
+        )
+    )
+    entries = []
+    for event in events:
+        if not event.rrule:
+            entries.append((event.starts_at - lead, event.starts_at, event.id))
+            continue
+        rule = rrulestr(event.rrule, dtstart=event.starts_at)
+        for start in rule.between(low, high, inc=True):
+            if start < high:
+                entries.append((start - lead, start, event.id))
+    return entries
+
+
+class ReminderQueue:
+    def __init__(self, lead: timedelta, horizon: timedelta = HORIZON):
+        self.lead = lead
+        self.horizon = horizon
+        self.heap: List[Entry] = []
+        self.loaded_until: Optional[datetime] = None
+        self.version: Optional[str] = None
+        self.sent: Set[Occurrence] = set()
+
+    def refill(self, db: Session, now: datetime) -> None:
+        version = cache.version(cache.CALENDAR)
+        target = now + self.lead + self.horizon
+        if version != self.version or self.loaded_until is None:
+            entries = load_entries(db, now, target, self.lead)
+            if self.loaded_until is None:
+                overdue = now - timedelta(seconds=TICK_SECONDS)
+                entries = [entry for entry in entries if entry[0] >= overdue]
+            self.version = version
+            self.heap = entries
+            heapq.heapify(self.heap)
+            self.loaded_until = target
+        elif self.loaded_until < now + self.lead + self.horizon / 2:
+            for entry in load_entries(db, self.loaded_until, target, self.lead):
+                heapq.heappush(self.heap, entry)
+            self.loaded_until = target
+
+    def due(self, now: datetime) -> List[Occurrence]:
+        found = []
+        while self.heap and self.heap[0][0] <= now:
+            _, starts_at, event_id = heapq.heappop(self.heap)
+            occurrence = (event_id, starts_at)
+            if starts_at <= now or occurrence in self.sent:
+                continue
+            self.sent.add(occurrence)
+            found.append(occurrence)
+        self.sent = {occurrence for occurrence in self.sent if occurrence[1] > now}
+        return found
+
+
+def _describe(event: CalendarEvent, starts_at: datetime) -> str:
+    ends_at = starts_at + event_duration(event)
+    line = f"{starts_at:%H:%M}–{ends_at:%H:%M} {event.title}"
+    if event.room is not None:
+        line += f" ({event.room.code})"
+    return line
+
+
+def digests(db: Session, occurrences: List[Occurrence]) -> Dict[str, str]:
+    if not occurrences:
+        return {}
+    event_ids = {event_id for event_id, _ in occurrences}
+    events = {
+        event.id: event
+        for event in db.scalars(
+            select(CalendarEvent).options(joinedload(CalendarEvent.room)).where(CalendarEvent.id.in_(event_ids))
+        )
+    }
+    rows = db.execute(
+        select(EventParticipant.event_id, User.tg_id)
+        .join(User, User.id == EventParticipant.user_id)
+        .where(EventParticipant.event_id.in_(event_ids))
+    )
+    chats: Dict[int, List[str]] = defaultdict(list)
+    for event_id, tg_id in rows:
+        chat_id = chat_id_for(tg_id)
+        if chat_id is not None:
+            chats[event_id].append(chat_id)
+
+    lines: Dict[str, List[Tuple[datetime, str]]] = defaultdict(list)
+    for event_id, starts_at in occurrences:
+        event = events.get(event_id)
+        if event is None or event.status != EventStatus.approved:
+            continue
+        for chat_id in chats[event_id]:
+            lines[chat_id].append((starts_at, _describe(event, starts_at)))
+    return {
+        chat_id: "\n".join(["Starting soon:", *(f"• {line}" for _, line in sorted(items))])
+        for chat_id, items in lines.items()
+    }
+
+
+class ReminderService:
+    def __init__(
+        self,
+        lead_minutes: int = REMINDER_LEAD_MINUTES,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.queue = ReminderQueue(timedelta(minutes=lead_minutes))
+        self.session_factory = session_factory
+
+    async def tick(self, client: TelegramClient, now: Optional[datetime] = None) -> List[SendResult]:
+        now = now or local_now()
+        db = self.session_factory()
+        try:
+            self.queue.refill(db, now)
+            messages = digests(db, self.queue.due(now))
+        finally:
+            db.close()
+        results = await asyncio.gather(*(client.send_message(chat_id, text) for chat_id, text in messages.items()))
+        failed = [result for result in results if not result.ok]
+        if failed:
+            logger.warning("%d of %d reminders failed: %s", len(failed), len(results), failed[0].error)
+        return list(results)
+
+
+class AdvisoryLock:
+    def __init__(self, key: int, engine=default_engine):
+        self.key = key
+        self.engine = engine
+        self.connection = None
+        self.lease = None
+
+    def lease_path(self) -> Path:
+        database = self.engine.url.database
+        if self.engine.dialect.name == "sqlite" and database and database != ":memory:":
+            return Path(f"{database}.lock-{self.key}")
+        return Path(tempfile.gettempdir()) / f"roomly-lock-{self.key}"
+
+    def acquire(self) -> bool:
+        if self.engine.dialect.name != "postgresql":
+            return self._acquire_lease()
+        connection = self.engine.connect()
+        if connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar():
+            connection.commit()
+            self.connection = connection
+            return True
+        connection.close()
+        return False
+
+    def _acquire_lease(self) -> bool:
+        lease = open(self.lease_path(), "a")
+        try:
+            fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lease.close()
+            return False
+        self.lease = lease
+        return True
+
+    def held(self) -> bool:
+        if self.engine.dialect.name != "postgresql":
+            return self.lease is not None
+        if self.connection is None:
+            return False
+        try:
+            self.connection.execute(text("SELECT 1"))
+            self.connection.commit()
+            return True
+        except Exception:
+            self.release()
+            return False
+
+    def release(self) -> None:
+        if self.lease is not None:
+            self.lease.close()
+            self.lease = None
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self.connection.commit()
+        except Exception:
+            pass
+        finally:
+            self.connection.invalidate()
+            self.connection = None
+
+
+class ReminderRunner:
+    def __init__(self, service: Optional[ReminderService] = None, client_factory=TelegramClient):
+        self.service = service or ReminderService()
+        self.client_factory = client_factory
+        self.lock = AdvisoryLock(REMINDER_LOCK_KEY)
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ReminderRunner":
+        if self.thread is None:
+            self.thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="reminders", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    async def _wait(self, seconds: float) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.stopping.wait, seconds)
+
+    async def _run(self) -> None:
+        async with self.client_factory() as client:
+            while not self.stopping.is_set():
+                try:
+                    if not self.lock.held():
+                        if not self.lock.acquire():
+                            await self._wait(LOCK_RETRY_SECONDS)
+                            continue
+                        logger.info("reminder scheduler acquired the scheduler lock")
+                    await self.service.tick(client)
+                except Exception:
+                    logger.exception("reminder tick failed")
+                await self._wait(TICK_SECONDS)
+        self.lock.release()
+
+
+def start_reminders() -> Optional[ReminderRunner]:
+    if not REMINDERS_ENABLED:
+        return None
+    start_listener()
+    return ReminderRunner().start()
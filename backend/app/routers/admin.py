@@ -1,10 +1,19 @@
+import io
+import tempfile
 from datetime import datetime
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
+from .. import cache, cascade, jobs, live
+from ..conflicts import lock_bookings, room_conflicts
 from ..database import get_db
 from ..dependencies import require_admin
+from ..lesson_import import import_lessons
 from ..models import (
     CalendarEvent,
     Club,
@@ -15,6 +24,18 @@ from ..models import (
     Room,
     User,
     UserRole,
+    key_equals,
+    normalize_key,
+)
+from ..profiling import ProfiledRoute
+from ..rows import (
+    ROOM_ROW_COLUMNS,
+    AdminClubMemberRow,
+    AdminClubRow,
+    AdminEventParticipantRow,
+    AdminEventRow,
+    AdminUserRow,
+    RoomRow,
 )
 from ..schemas import (
     AdminClubMemberOut,
@@ -24,15 +45,27 @@ from ..schemas import (
     AdminEventParticipantOut,
     AdminRoleAssign,
     AdminUserOut,
+    BulkDelete,
+    BulkDeleteOut,
     ClubCreate,
     ClubLeaderAssign,
+    EventBatchDecision,
+    EventBatchOut,
+    EventConflictOut,
+    LessonImportReport,
+    PendingEventOut,
+    PendingQueueOut,
     RoleAssign,
     RoomCreate,
     RoomOut,
     RoomUpdate,
 )
 
-router = APIRouter(tags=["admin"])
+router = APIRouter(tags=["admin"], route_class=ProfiledRoute)
+
+IMPORT_SPOOL_BYTES = 4 * 1024 * 1024
+IMPORT_INLINE_BYTES = 256 * 1024
+BATCH_ACTIONS = {"approve": EventStatus.approved, "reject": EventStatus.rejected}
 
 
 @router.post("/admin/users/{user_id}/role")
@@ -52,7 +85,9 @@ def assign_role(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="user not found")
 
     user.role = role
+    live.calendar_reset(db)
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     db.refresh(user)
     return {"id": user.id, "role": user.role.value}
 
@@ -68,12 +103,14 @@ def assign_role_by_email(
     except ValueError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid role")
 
-    user = db.query(User).filter(User.email == payload.email).first()
+    user = db.query(User).filter(key_equals(User.email_key, payload.email)).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="user not found")
 
     user.role = role
+    live.calendar_reset(db)
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     db.refresh(user)
     return {"id": user.id, "role": user.role.value}
 
@@ -83,16 +120,34 @@ def list_users(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    users = db.query(User).order_by(User.id.asc()).all()
-    return [
-        AdminUserOut(
-            id=user.id,
-            email=user.email,
-            full_name=user.full_name,
-            role=user.role.value,
-        )
-        for user in users
-    ]
+    rows = db.query(User.id, User.email, User.full_name, User.role).order_by(User.id.asc())
+    return ORJSONResponse(
+        [AdminUserRow(user_id, email, full_name, role.value) for user_id, email, full_name, role in rows]
+    )
+
+
+def _delete_with_cascade(db: Session, admin: User, kind: str, ids: List[int]) -> Tuple[List[int], Optional[int]]:
+    model = cascade.PURGE_MODELS[kind]
+    found = cascade.existing_ids(db, model, ids)
+    if not found:
+        return found, None
+    if cascade.is_large(db, model, found):
+        job = jobs.enqueue(db, "purge", {"model": kind, "ids": found}, created_by=admin.id)
+        db.commit()
+        return found, job.id
+    cascade.purge(db, model, found)
+    return found, None
+
+
+def _scheduled(body: dict, job_id: int) -> ORJSONResponse:
+    return ORJSONResponse({**body, "status": "scheduled", "job_id": job_id}, status_code=status.HTTP_202_ACCEPTED)
+
+
+def _bulk_delete_response(ids: List[int], found: List[int], job_id: Optional[int]) -> ORJSONResponse:
+    result = BulkDeleteOut(deleted=found, missing=sorted(set(ids) - set(found)), status="deleted")
+    if job_id is not None:
+        return _scheduled(result.model_dump(), job_id)
+    return ORJSONResponse(result.model_dump())
 
 
 @router.delete("/admin/users/{user_id}")
@@ -101,32 +156,22 @@ def delete_user(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    user = db.get(User, user_id)
-    if not user:
+    found, job_id = _delete_with_cascade(db, admin, "user", [user_id])
+    if not found:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="user not found")
+    if job_id is not None:
+        return _scheduled({"id": user_id}, job_id)
+    return {"id": user_id, "status": "deleted"}
 
-    db.query(CalendarEvent).filter(CalendarEvent.approved_by == user.id).update(
-        {CalendarEvent.approved_by: None}
-    )
-
-    event_ids = [eid for (eid,) in db.query(CalendarEvent.id).filter(CalendarEvent.created_by == user.id).all()]
-    if event_ids:
-        db.query(EventParticipant).filter(EventParticipant.event_id.in_(event_ids)).delete(
-            synchronize_session=False
-        )
-        db.query(CalendarEvent).filter(CalendarEvent.id.in_(event_ids)).delete(
-            synchronize_session=False
-        )
-
-    db.query(EventParticipant).filter(EventParticipant.user_id == user.id).delete(
-        synchronize_session=False
-    )
-    db.query(ClubMember).filter(ClubMember.user_id == user.id).delete(synchronize_session=False)
-    db.query(Club).filter(Club.owner_user_id == user.id).update({Club.owner_user_id: None})
 
-    db.delete(user)
-    db.commit()
-    return {"id": user_id, "status": "deleted"}
+@router.post("/admin/users/bulk-delete", response_model=BulkDeleteOut)
+def bulk_delete_users(
+    payload: BulkDelete,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    found, job_id = _delete_with_cascade(db, admin, "user", payload.ids)
+    return _bulk_delete_response(payload.ids, found, job_id)
 
 
 @router.post("/admin/clubs")
@@ -135,16 +180,23 @@ def create_club(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
+    if normalize_key(payload.name) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="club name is required")
     owner_id = payload.owner_user_id
     if payload.owner_email:
-        owner = db.query(User).filter(User.email.ilike(payload.owner_email)).first()
+        owner = db.query(User).filter(key_equals(User.email_key, payload.owner_email)).first()
         if not owner:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="owner not found")
         owner_id = owner.id
 
+    if db.query(Club.id).filter(key_equals(Club.name_key, payload.name)).first():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="club name exists")
+
     club = Club(name=payload.name, owner_user_id=owner_id)
     db.add(club)
+    live.scopes_changed(db, (cache.CLUBS,))
     db.commit()
+    cache.invalidate(cache.CLUBS)
     db.refresh(club)
     return {"id": club.id, "name": club.name}
 
@@ -154,11 +206,8 @@ def list_clubs(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    clubs = db.query(Club).order_by(Club.name.asc()).all()
-    return [
-        AdminClubOut(id=club.id, name=club.name, owner_user_id=club.owner_user_id)
-        for club in clubs
-    ]
+    rows = db.query(Club.id, Club.name, Club.owner_user_id).order_by(Club.name.asc())
+    return ORJSONResponse([AdminClubRow(*row) for row in rows])
 
 
 @router.delete("/admin/clubs/{club_id}")
@@ -167,24 +216,22 @@ def delete_club(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    club = db.get(Club, club_id)
-    if not club:
+    found, job_id = _delete_with_cascade(db, admin, "club", [club_id])
+    if not found:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="club not found")
+    if job_id is not None:
+        return _scheduled({"id": club_id}, job_id)
+    return {"id": club_id, "status": "deleted"}
 
-    event_ids = [eid for (eid,) in db.query(CalendarEvent.id).filter(CalendarEvent.club_id == club.id).all()]
-    if event_ids:
-        db.query(EventParticipant).filter(EventParticipant.event_id.in_(event_ids)).delete(
-            synchronize_session=False
-        )
-        db.query(CalendarEvent).filter(CalendarEvent.id.in_(event_ids)).delete(
-            synchronize_session=False
-        )
-
-    db.query(ClubMember).filter(ClubMember.club_id == club.id).delete(synchronize_session=False)
 
-    db.delete(club)
-    db.commit()
-    return {"id": club_id, "status": "deleted"}
+@router.post("/admin/clubs/bulk-delete", response_model=BulkDeleteOut)
+def bulk_delete_clubs(
+    payload: BulkDelete,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    found, job_id = _delete_with_cascade(db, admin, "club", payload.ids)
+    return _bulk_delete_response(payload.ids, found, job_id)
 
 
 @router.post("/admin/clubs/{club_id}/leaders")
@@ -216,7 +263,9 @@ def assign_club_leader(
     if user.role != UserRole.admin:
         user.role = UserRole.club_leader
 
+    live.calendar_reset(db, (cache.CALENDAR, cache.CLUBS))
     db.commit()
+    cache.invalidate(cache.CALENDAR, cache.CLUBS)
     return {"club_id": club_id, "user_id": user.id, "role": membership.role.value}
 
 
@@ -226,22 +275,17 @@ def list_club_members_admin(
     db: Session = Depends(get_db),
 ):
     rows = (
-        db.query(ClubMember, Club, User)
+        db.query(Club.id, Club.name, ClubMember.user_id, User.email, ClubMember.role)
         .join(Club, Club.id == ClubMember.club_id)
         .join(User, User.id == ClubMember.user_id)
         .order_by(Club.name.asc(), User.email.asc())
-        .all()
     )
-    return [
-        AdminClubMemberOut(
-            club_id=club.id,
-            club_name=club.name,
-            user_id=member.user_id,
-            user_email=user.email,
-            role=member.role.value,
-        )
-        for member, club, user in rows
-    ]
+    return ORJSONResponse(
+        [
+            AdminClubMemberRow(club_id, club_name, user_id, user_email, role.value)
+            for club_id, club_name, user_id, user_email, role in rows
+        ]
+    )
 
 
 @router.delete("/admin/club-members")
@@ -260,7 +304,9 @@ def delete_club_member(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="membership not found")
 
     db.delete(membership)
+    live.calendar_reset(db, (cache.CALENDAR, cache.CLUBS))
     db.commit()
+    cache.invalidate(cache.CALENDAR, cache.CLUBS)
     return {"club_id": club_id, "user_id": user_id, "status": "deleted"}
 
 
@@ -270,11 +316,11 @@ def assign_club_leader_by_name(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    club = db.query(Club).filter(Club.name.ilike(payload.club_name)).first()
+    club = db.query(Club).filter(key_equals(Club.name_key, payload.club_name)).first()
     if not club:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="club not found")
 
-    user = db.query(User).filter(User.email.ilike(payload.user_email)).first()
+    user = db.query(User).filter(key_equals(User.email_key, payload.user_email)).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="user not found")
 
@@ -292,10 +338,102 @@ def assign_club_leader_by_name(
     if user.role != UserRole.admin:
         user.role = UserRole.club_leader
 
+    live.calendar_reset(db, (cache.CALENDAR, cache.CLUBS))
     db.commit()
+    cache.invalidate(cache.CALENDAR, cache.CLUBS)
     return {"club_id": club.id, "user_id": user.id, "role": membership.role.value}
 
 
+@router.get("/admin/events/pending", response_model=PendingQueueOut)
+def list_pending_events(
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    total = db.scalar(
+        select(func.count()).select_from(CalendarEvent).where(CalendarEvent.status == EventStatus.pending)
+    )
+    events = (
+        db.query(CalendarEvent)
+        .options(
+            joinedload(CalendarEvent.club),
+            joinedload(CalendarEvent.room),
+            joinedload(CalendarEvent.created_by_user),
+        )
+        .filter(CalendarEvent.status == EventStatus.pending)
+        .order_by(CalendarEvent.starts_at.asc(), CalendarEvent.id.asc())
+        .offset(offset)
+        .limit(limit + 1)
+        .all()
+    )
+    page = events[:limit]
+    conflicts = room_conflicts(db, page)
+    items = [
+        PendingEventOut(
+            id=event.id,
+            title=event.title,
+            event_type=event.event_type.value,
+            start=event.starts_at,
+            end=event.ends_at,
+            rrule=event.rrule,
+            club_id=event.club_id,
+            club_name=event.club.name if event.club else None,
+            room_code=event.room.code if event.room else None,
+            created_by_email=event.created_by_user.email if event.created_by_user else None,
+            conflicts=conflicts.get(event.id, []),
+        )
+        for event in page
+    ]
+    return PendingQueueOut(items=items, total=total, offset=offset, limit=limit, has_more=len(events) > limit)
+
+
+@router.post("/admin/events/batch", response_model=EventBatchOut)
+def decide_events(
+    payload: EventBatchDecision,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    new_status = BATCH_ACTIONS.get(payload.action)
+    if new_status is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid action")
+
+    ids = list(dict.fromkeys(payload.ids))
+    conflicts = {}
+    targets = ids
+    if new_status == EventStatus.approved and not payload.force:
+        lock_bookings(db)
+        pending = (
+            db.query(CalendarEvent)
+            .filter(CalendarEvent.id.in_(ids), CalendarEvent.status == EventStatus.pending)
+            .all()
+        )
+        conflicts = room_conflicts(db, pending, book=True)
+        targets = [event_id for event_id in ids if event_id not in conflicts]
+
+    rows = []
+    if targets:
+        rows = db.execute(
+            update(CalendarEvent)
+            .where(CalendarEvent.id.in_(targets), CalendarEvent.status == EventStatus.pending)
+            .values(status=new_status, approved_by=admin.id, approved_at=datetime.utcnow())
+            .returning(CalendarEvent.id, CalendarEvent.club_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+    live.events_changed(db, new_status, [(event_id, club_id) for event_id, club_id in rows])
+    db.commit()
+    if rows:
+        cache.invalidate(cache.CALENDAR)
+
+    updated = sorted(event_id for event_id, _ in rows)
+    return EventBatchOut(
+        action=payload.action,
+        updated=updated,
+        conflicts=[EventConflictOut(id=event_id, conflicts_with=clashes) for event_id, clashes in conflicts.items()],
+        skipped=sorted(set(ids) - set(updated) - set(conflicts)),
+    )
+
+
 @router.post("/admin/events/{event_id}/approve")
 def approve_event(
     event_id: int,
@@ -309,7 +447,9 @@ def approve_event(
     event.status = EventStatus.approved
     event.approved_by = admin.id
     event.approved_at = datetime.utcnow()
+    live.event_changed(db, event)
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     return {"id": event.id, "status": event.status.value}
 
 
@@ -319,22 +459,23 @@ def list_events_admin(
     db: Session = Depends(get_db),
 ):
     rows = (
-        db.query(CalendarEvent, Room.code)
+        db.query(
+            CalendarEvent.id,
+            CalendarEvent.title,
+            CalendarEvent.status,
+            CalendarEvent.event_type,
+            CalendarEvent.club_id,
+            Room.code,
+        )
         .outerjoin(Room, Room.id == CalendarEvent.room_id)
         .order_by(CalendarEvent.starts_at.desc())
-        .all()
     )
-    return [
-        AdminEventOut(
-            id=event.id,
-            title=event.title,
-            status=event.status.value,
-            event_type=event.event_type.value,
-            club_id=event.club_id,
-            room_code=room_code,
-        )
-        for event, room_code in rows
-    ]
+    return ORJSONResponse(
+        [
+            AdminEventRow(event_id, title, event_status.value, event_type.value, club_id, room_code)
+            for event_id, title, event_status, event_type, club_id, room_code in rows
+        ]
+    )
 
 
 @router.delete("/admin/events/{event_id}")
@@ -347,21 +488,58 @@ def delete_event(
     if not event:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="event not found")
 
-    db.query(EventParticipant).filter(EventParticipant.event_id == event_id).delete(
-        synchronize_session=False
-    )
-    db.delete(event)
+    participant_ids = [
+        uid for (uid,) in db.query(EventParticipant.user_id).filter(EventParticipant.event_id == event_id).all()
+    ]
+    live.events_removed(db, [event_id], club_id=event.club_id, users=participant_ids)
+    db.execute(delete(CalendarEvent).where(CalendarEvent.id == event_id))
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     return {"id": event_id, "status": "deleted"}
 
 
+@router.post("/admin/events/bulk-delete", response_model=BulkDeleteOut)
+def bulk_delete_events(
+    payload: BulkDelete,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    found = cascade.existing_ids(db, CalendarEvent, payload.ids)
+    cascade.delete_events(db, found)
+    return _bulk_delete_response(payload.ids, found, None)
+
+
+@router.post("/admin/lessons/import", response_model=LessonImportReport)
+async def import_lessons_ics(
+    request: Request,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        size = spool.tell()
+        spool.seek(0)
+        if size > IMPORT_INLINE_BYTES:
+            job_id = await run_in_threadpool(_enqueue_import, db, admin.id, spool.read())
+            return _scheduled({"bytes": size}, job_id)
+        lines = io.TextIOWrapper(spool, encoding="utf-8-sig", errors="replace")
+        return await run_in_threadpool(import_lessons, db, lines, admin.id)
+
+
+def _enqueue_import(db: Session, admin_id: int, data: bytes) -> int:
+    job = jobs.enqueue(db, "lesson_import", {"created_by": admin_id}, created_by=admin_id, input=data)
+    db.commit()
+    return job.id
+
+
 @router.get("/admin/rooms", response_model=list[RoomOut])
 def list_rooms(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    rooms = db.query(Room).order_by(Room.code.asc()).all()
-    return [RoomOut.model_validate(room) for room in rooms]
+    rows = db.query(*ROOM_ROW_COLUMNS).order_by(Room.code.asc())
+    return ORJSONResponse([RoomRow(*row) for row in rows])
 
 
 @router.post("/admin/rooms", response_model=RoomOut)
@@ -370,7 +548,9 @@ def create_room(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    existing = db.query(Room).filter(Room.code == payload.code).first()
+    if normalize_key(payload.code) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="room code is required")
+    existing = db.query(Room).filter(key_equals(Room.code_key, payload.code)).first()
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="room code exists")
 
@@ -383,7 +563,9 @@ def create_room(
         is_active=payload.is_active if payload.is_active is not None else True,
     )
     db.add(room)
+    live.scopes_changed(db, (cache.ROOMS,))
     db.commit()
+    cache.invalidate(cache.ROOMS)
     db.refresh(room)
     return RoomOut.model_validate(room)
 
@@ -395,7 +577,7 @@ def update_room(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    room = db.query(Room).filter(Room.code == room_code).first()
+    room = db.query(Room).filter(key_equals(Room.code_key, room_code)).first()
     if not room:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="room not found")
 
@@ -410,7 +592,9 @@ def update_room(
     if payload.is_active is not None:
         room.is_active = payload.is_active
 
+    live.scopes_changed(db, (cache.ROOMS,))
     db.commit()
+    cache.invalidate(cache.ROOMS)
     db.refresh(room)
     return RoomOut.model_validate(room)
 
@@ -421,15 +605,18 @@ def delete_room(
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
-    room = db.query(Room).filter(Room.code == room_code).first()
+    room = db.query(Room).filter(key_equals(Room.code_key, room_code)).first()
     if not room:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="room not found")
 
-    db.query(CalendarEvent).filter(CalendarEvent.room_id == room.id).update(
+    moved = db.query(CalendarEvent).filter(CalendarEvent.room_id == room.id).update(
         {CalendarEvent.room_id: None}
     )
+    if moved:
+        live.calendar_reset(db, (cache.CALENDAR, cache.ROOMS))
     db.delete(room)
     db.commit()
+    cache.invalidate(cache.CALENDAR, cache.ROOMS)
     return {"code": room_code, "status": "deleted"}
 
 
@@ -446,7 +633,9 @@ def reject_event(
     event.status = EventStatus.rejected
     event.approved_by = admin.id
     event.approved_at = datetime.utcnow()
+    live.event_changed(db, event)
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     return {"id": event.id, "status": event.status.value}
 
 
@@ -456,19 +645,11 @@ def list_event_participants_admin(
     db: Session = Depends(get_db),
 ):
     rows = (
-        db.query(EventParticipant, User)
+        db.query(EventParticipant.event_id, EventParticipant.user_id, User.email)
         .join(User, User.id == EventParticipant.user_id)
         .order_by(EventParticipant.event_id.asc(), User.email.asc())
-        .all()
     )
-    return [
-        AdminEventParticipantOut(
-            event_id=participant.event_id,
-            user_id=participant.user_id,
-            user_email=user.email,
-        )
-        for participant, user in rows
-    ]
+    return ORJSONResponse([AdminEventParticipantRow(*row) for row in rows])
 
 
 @router.delete("/admin/event-participants")
@@ -487,5 +668,7 @@ def delete_event_participant(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="participant not found")
 
     db.delete(participant)
+    live.participants_left(db, event_id, [user_id])
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     return {"event_id": event_id, "user_id": user_id, "status": "deleted"}
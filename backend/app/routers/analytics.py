@@ -0,0 +1,62 @@
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ..analytics import CLOSE_HOUR, MAX_SPAN, OPEN_HOUR, occupancy, peak_hours, room_usage
+from ..database import get_db
+from ..dependencies import require_admin
+from ..models import User
+from ..profiling import ProfiledRoute
+from ..recurrence import local_now, to_local_naive
+from ..schemas import RoomAnalyticsOut, RoomUsageOut
+
+router = APIRouter(tags=["analytics"], route_class=ProfiledRoute)
+
+DEFAULT_SPAN = timedelta(days=28)
+
+
+@router.get("/admin/analytics/rooms", response_model=RoomAnalyticsOut)
+def room_analytics(
+    start: Optional[datetime] = Query(default=None, alias="from"),
+    end: Optional[datetime] = Query(default=None, alias="to"),
+    heatmaps: bool = Query(default=False),
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    start = to_local_naive(start) if start else None
+    end = to_local_naive(end) if end else None
+    if end is None:
+        end = start + DEFAULT_SPAN if start else datetime.combine(local_now().date() + timedelta(days=1), time.min)
+    if start is None:
+        start = end - DEFAULT_SPAN
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+    if end - start > MAX_SPAN:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="range is limited to 366 days")
+
+    usage = room_usage(db, start, end)
+    rooms = [
+        RoomUsageOut(
+            room_id=room.id,
+            room_code=room.code,
+            building=room.building,
+            capacity=room.capacity,
+            busy_hours=round(float(usage.busy_minutes[index]) / 60, 2),
+            occupancy=occupancy(usage.busy_minutes[index], usage.open_minutes),
+            peak_hours=peak_hours(usage.hour_of_day_busy[index]),
+            heatmap=usage.heatmaps[index].round(4).tolist() if heatmaps else None,
+        )
+        for index, room in enumerate(usage.rooms)
+    ]
+    rooms.sort(key=lambda room: (room.occupancy or 0.0, room.room_code))
+    return RoomAnalyticsOut(
+        start=start,
+        end=end,
+        open_hour=OPEN_HOUR,
+        close_hour=CLOSE_HOUR,
+        open_hours=usage.open_minutes / 60,
+        rooms=rooms,
+        heatmap=usage.overall_heatmap.round(4).tolist(),
+    )
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from .. import cache, live
 from ..database import get_db
 from ..models import User, UserRole
+from ..profiling import ProfiledRoute
 from ..schemas import AuthRequest, AuthResponse, UserOut
 from ..security import AuthError, create_access_token, verify_telegram_init_data
 
-router = APIRouter(tags=["auth"])
+router = APIRouter(tags=["auth"], route_class=ProfiledRoute)
 
 
 @router.post("/auth/telegram", response_model=AuthResponse)
@@ -27,12 +29,16 @@ def auth_telegram(payload: AuthRequest, db: Session = Depends(get_db)):
     if not user:
         user = User(tg_id=tg_id, username=username, full_name=full_name, role=UserRole.student)
         db.add(user)
+        live.scopes_changed(db, (cache.USERS,))
         db.commit()
+        cache.invalidate(cache.USERS)
         db.refresh(user)
-    else:
+    elif (user.username, user.full_name) != (username, full_name):
         user.username = username
         user.full_name = full_name
+        live.scopes_changed(db, (cache.USERS,))
         db.commit()
+        cache.invalidate(cache.USERS)
         db.refresh(user)
 
     if not user.email:
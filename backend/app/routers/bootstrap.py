@@ -0,0 +1,78 @@
+import hashlib
+
+from fastapi import APIRouter, Depends, Header, Response, status
+from sqlalchemy.orm import Session
+
+from .. import cache
+from ..database import get_db
+from ..dependencies import get_current_user
+from ..models import Club, ClubMember, ClubMemberRole, Room, User, UserRole
+from ..profiling import ProfiledRoute
+from ..recurrence import local_now, upcoming_occurrences
+from ..schemas import BootstrapOut, ClubMembershipOut, ClubOut, RoomOut, UserOut
+from .calendar import occurrences_out
+
+router = APIRouter(tags=["bootstrap"], route_class=ProfiledRoute)
+
+BOOTSTRAP_UPCOMING_LIMIT = 8
+BOOTSTRAP_CACHE_SECONDS = 60
+
+bootstrap_cache = cache.VersionedCache(max_entries=10000, ttl_seconds=BOOTSTRAP_CACHE_SECONDS)
+
+
+def _build_bootstrap(db: Session, user: User) -> BootstrapOut:
+    memberships = (
+        db.query(Club, ClubMember.role)
+        .join(ClubMember, ClubMember.club_id == Club.id)
+        .filter(ClubMember.user_id == user.id)
+        .order_by(Club.name.asc())
+        .all()
+    )
+
+    if user.role == UserRole.admin:
+        clubs = [ClubOut.model_validate(club) for club in db.query(Club).order_by(Club.name.asc())]
+    elif user.role == UserRole.club_leader:
+        clubs = [ClubOut.model_validate(club) for club, role in memberships if role == ClubMemberRole.leader]
+    else:
+        clubs = []
+
+    rooms = db.query(Room).filter(Room.is_active.is_(True)).order_by(Room.code.asc()).all()
+    upcoming = upcoming_occurrences(db, user, BOOTSTRAP_UPCOMING_LIMIT, local_now())
+
+    return BootstrapOut(
+        user=UserOut.model_validate(user),
+        clubs=clubs,
+        memberships=[
+            ClubMembershipOut(id=club.id, name=club.name, role=role.value) for club, role in memberships
+        ],
+        rooms=[RoomOut.model_validate(room) for room in rooms],
+        upcoming=occurrences_out(upcoming),
+    )
+
+
+@router.get("/bootstrap", response_model=BootstrapOut)
+def bootstrap(
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+):
+    tag = "|".join(
+        [
+            cache.version(cache.CALENDAR, cache.CLUBS, cache.ROOMS),
+            user.role.value,
+            user.email or "",
+            user.username or "",
+            user.full_name or "",
+        ]
+    )
+    cached = bootstrap_cache.get(user.id, tag)
+    if cached is None:
+        body = _build_bootstrap(db, user).model_dump_json().encode("utf-8")
+        cached = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+        bootstrap_cache.set(user.id, tag, cached)
+
+    etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -3,12 +3,28 @@ import hmac
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
+from .. import cache, live
+from ..agenda import agenda
+from ..broadcasts import broadcast_out, require_broadcaster, start_broadcast
 from ..config import BOT_ADMIN_TOKEN
 from ..database import get_db
-from ..models import Club, ClubMember, ClubMemberRole, User, UserRole
-from ..schemas import BotClubCreate, BotClubLeaderAssign, BotEmailAssign, BotRoleAssign, BotUserUpsert
-
-router = APIRouter(tags=["bot"])
+from ..models import Broadcast, Club, ClubMember, ClubMemberRole, User, UserRole, key_equals, normalize_key
+from ..profiling import ProfiledRoute
+from ..recurrence import local_now
+from ..schemas import (
+    AgendaOut,
+    BotAgendaRequest,
+    BotBroadcastCreate,
+    BotBroadcastStatus,
+    BotClubCreate,
+    BotClubLeaderAssign,
+    BotEmailAssign,
+    BotRoleAssign,
+    BotUserUpsert,
+    BroadcastOut,
+)
+
+router = APIRouter(tags=["bot"], route_class=ProfiledRoute)
 
 
 def require_bot_token(
@@ -23,12 +39,20 @@ def require_bot_token(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid admin token")
 
 
-def resolve_user(payload: BotRoleAssign | BotClubLeaderAssign | BotEmailAssign, db: Session) -> User:
+def resolve_user(
+    payload: BotRoleAssign
+    | BotClubLeaderAssign
+    | BotEmailAssign
+    | BotBroadcastCreate
+    | BotBroadcastStatus
+    | BotAgendaRequest,
+    db: Session,
+) -> User:
     user = None
     if getattr(payload, "user_id", None):
         user = db.get(User, payload.user_id)
     elif getattr(payload, "email", None):
-        user = db.query(User).filter(User.email == payload.email).first()
+        user = db.query(User).filter(key_equals(User.email_key, payload.email)).first()
     elif getattr(payload, "tg_id", None):
         user = db.query(User).filter(User.tg_id == payload.tg_id).first()
 
@@ -57,7 +81,9 @@ def bot_assign_role(
 
     user = resolve_user(payload, db)
     user.role = role
+    live.calendar_reset(db)
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     return {"id": user.id, "role": user.role.value}
 
 
@@ -78,7 +104,7 @@ def bot_assign_club_leader(
         club = db.get(Club, payload.club_id)
     elif payload.club_name:
         club_name = payload.club_name.strip()
-        club = db.query(Club).filter(Club.name.ilike(club_name)).first()
+        club = db.query(Club).filter(key_equals(Club.name_key, club_name)).first()
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -106,7 +132,9 @@ def bot_assign_club_leader(
     if user.role != UserRole.admin:
         user.role = UserRole.club_leader
 
+    live.calendar_reset(db, (cache.CALENDAR, cache.CLUBS))
     db.commit()
+    cache.invalidate(cache.CALENDAR, cache.CLUBS)
     return {"club_id": club.id, "user_id": user.id, "role": membership.role.value}
 
 
@@ -116,9 +144,16 @@ def bot_create_club(
     _: None = Depends(require_bot_token),
     db: Session = Depends(get_db),
 ):
+    if normalize_key(payload.name) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="club name is required")
+    if db.query(Club.id).filter(key_equals(Club.name_key, payload.name)).first():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="club name exists")
+
     club = Club(name=payload.name, owner_user_id=payload.owner_user_id)
     db.add(club)
+    live.scopes_changed(db, (cache.CLUBS,))
     db.commit()
+    cache.invalidate(cache.CLUBS)
     db.refresh(club)
     return {"id": club.id, "name": club.name}
 
@@ -130,6 +165,7 @@ def bot_upsert_user(
     db: Session = Depends(get_db),
 ):
     user = db.query(User).filter(User.tg_id == payload.tg_id).first()
+    changed = user is None or (user.username, user.full_name) != (payload.username, payload.full_name)
     if not user:
         user = User(
             tg_id=payload.tg_id,
@@ -145,7 +181,11 @@ def bot_upsert_user(
     if payload.mark_intro is not None:
         user.bot_intro_seen = payload.mark_intro
 
+    if changed:
+        live.scopes_changed(db, (cache.USERS,))
     db.commit()
+    if changed:
+        cache.invalidate(cache.USERS)
     db.refresh(user)
     return {
         "id": user.id,
@@ -163,6 +203,8 @@ def bot_set_email(
 ):
     if not payload.user_id and not payload.tg_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="user_id or tg_id required")
+    if normalize_key(payload.email) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="email is required")
 
     user = None
     if payload.user_id:
@@ -177,10 +219,51 @@ def bot_set_email(
     elif not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="user not found")
 
-    email_exists = db.query(User).filter(User.email == payload.email).first()
+    email_exists = db.query(User).filter(key_equals(User.email_key, payload.email)).first()
     if email_exists and email_exists.id != user.id:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="email already in use")
     user.email = payload.email
+    live.scopes_changed(db, (cache.USERS,))
     db.commit()
+    cache.invalidate(cache.USERS)
     db.refresh(user)
     return {"id": user.id, "email": user.email}
+
+
+@router.post("/bot/broadcast", response_model=BroadcastOut, status_code=status.HTTP_202_ACCEPTED)
+def bot_broadcast(
+    payload: BotBroadcastCreate,
+    _: None = Depends(require_bot_token),
+    db: Session = Depends(get_db),
+):
+    user = resolve_user(payload, db)
+    club = db.query(Club).filter(key_equals(Club.name_key, payload.club_name)).first()
+    if not club:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="club not found")
+    require_broadcaster(db, user, club)
+    return broadcast_out(start_broadcast(db, club, user, payload.text))
+
+
+@router.post("/bot/broadcast-status", response_model=BroadcastOut)
+def bot_broadcast_status(
+    payload: BotBroadcastStatus,
+    _: None = Depends(require_bot_token),
+    db: Session = Depends(get_db),
+):
+    user = resolve_user(payload, db)
+    broadcast = db.get(Broadcast, payload.broadcast_id)
+    if not broadcast:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="broadcast not found")
+    require_broadcaster(db, user, broadcast.club)
+    return broadcast_out(broadcast)
+
+
+@router.post("/bot/agenda", response_model=AgendaOut)
+def bot_agenda(
+    payload: BotAgendaRequest,
+    _: None = Depends(require_bot_token),
+    db: Session = Depends(get_db),
+):
+    user = resolve_user(payload, db)
+    day = local_now().date()
+    return AgendaOut(day=day, days=payload.days, items=agenda(db, user, day, payload.days))
@@ -1,11 +1,15 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dateutil.rrule import rrulestr
 from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from .. import cache, fulltext, live
+from ..columnar import COLUMNAR_MEDIA_TYPE, Series, accepts_columnar, encode_calendar
 from ..config import APP_TZ
 from ..database import get_db
 from ..dependencies import get_current_user
@@ -19,10 +23,15 @@ from ..models import (
     Room,
     User,
     UserRole,
+    key_equals,
 )
-from ..schemas import EventCreate, EventOut
+from ..profiling import ProfiledRoute
+from ..recurrence import Occurrence, event_duration, local_now, to_local_naive, upcoming_occurrences
+from ..rows import EventRow
+from ..schemas import EventCreate, EventOut, EventSearchHitOut, EventSearchOut
+from ..visibility import visible_events_query
 
-router = APIRouter(tags=["calendar"])
+router = APIRouter(tags=["calendar"], route_class=ProfiledRoute)
 
 
 def _duration_from_minutes(minutes: Optional[int]) -> Optional[str]:
@@ -50,75 +59,105 @@ def _to_event_out(event: CalendarEvent) -> EventOut:
     )
 
 
-def _expand_recurring_event(
+def _occurrence_out(event: CalendarEvent, occ_start: datetime, occ_end: datetime) -> EventOut:
+    return EventOut(
+        id=f"{event.id}:{occ_start.isoformat()}",
+        title=event.title,
+        start=occ_start,
+        end=occ_end,
+        rrule=None,
+        duration=None,
+        event_type=event.event_type.value,
+        status=event.status.value,
+        room_id=event.room_id,
+        room_code=event.room.code if event.room else None,
+        club_id=event.club_id,
+    )
+
+
+def occurrences_out(occurrences: List[Occurrence]) -> List[EventOut]:
+    return [
+        _occurrence_out(event, occ_start, occ_end) if event.rrule else _to_event_out(event)
+        for occ_start, occ_end, event in occurrences
+    ]
+
+
+def _event_row(event: CalendarEvent, room_code: Optional[str]) -> EventRow:
+    return EventRow(
+        str(event.id),
+        event.title,
+        event.starts_at,
+        event.ends_at,
+        event.rrule,
+        _duration_from_minutes(event.duration_minutes),
+        event.event_type.value,
+        event.status.value,
+        event.room_id,
+        room_code,
+        event.club_id,
+    )
+
+
+def _expand_recurring_rows(
     event: CalendarEvent,
+    room_code: Optional[str],
     start: datetime,
     end: datetime,
-) -> List[EventOut]:
-    if not event.rrule:
-        return [_to_event_out(event)]
-
-    duration_minutes = event.duration_minutes
-    if not duration_minutes and event.ends_at:
-        duration_minutes = int((event.ends_at - event.starts_at).total_seconds() / 60)
-    if not duration_minutes:
-        duration_minutes = 60
-
+) -> Iterator[EventRow]:
     rule = rrulestr(event.rrule, dtstart=event.starts_at)
-    duration = timedelta(minutes=duration_minutes)
-    occurrences = []
+    duration = event_duration(event)
+    event_type = event.event_type.value
+    event_status = event.status.value
 
     for occ_start in rule.between(start, end, inc=True):
-        occ_end = occ_start + duration
-        occurrences.append(
-            EventOut(
-                id=f"{event.id}:{occ_start.isoformat()}",
-                title=event.title,
-                start=occ_start,
-                end=occ_end,
-                rrule=None,
-                duration=None,
-                event_type=event.event_type.value,
-                status=event.status.value,
-                room_id=event.room_id,
-                room_code=event.room.code if event.room else None,
-                club_id=event.club_id,
-            )
+        yield EventRow(
+            f"{event.id}:{occ_start.isoformat()}",
+            event.title,
+            occ_start,
+            occ_start + duration,
+            None,
+            None,
+            event_type,
+            event_status,
+            event.room_id,
+            room_code,
+            event.club_id,
         )
 
-    return occurrences
+
+def _columnar_series(rows, start: datetime, end: datetime) -> Iterator[Series]:
+    for event, room_code in rows:
+        if event.rrule:
+            rule = rrulestr(event.rrule, dtstart=event.starts_at)
+            yield event, room_code, event_duration(event), rule.between(start, end, inc=True)
+        else:
+            duration = event.ends_at - event.starts_at if event.ends_at else None
+            yield event, room_code, duration, [event.starts_at]
 
 
 @router.get("/calendar/events", response_model=List[EventOut])
 def list_events(
+    request: Request,
     start: Optional[datetime] = Query(default=None),
     end: Optional[datetime] = Query(default=None),
+    event_id: Optional[int] = Query(default=None),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    query = db.query(CalendarEvent)
+    headers = {"Vary": "Accept"}
+    compact = bool(start and end) and accepts_columnar(request.headers.get("accept"))
+    if start and end:
+        start = to_local_naive(start)
+        end = to_local_naive(end)
 
-    if user.role == UserRole.admin:
-        pass
-    elif user.role == UserRole.club_leader:
-        club_ids = (
-            db.query(ClubMember.club_id)
-            .filter(
-                ClubMember.user_id == user.id,
-                ClubMember.role == ClubMemberRole.leader,
-            )
-            .all()
-        )
-        club_ids = [cid for (cid,) in club_ids]
-        if not club_ids:
-            return []
-        query = query.filter(CalendarEvent.club_id.in_(club_ids))
-    else:
-        query = (
-            query.join(EventParticipant)
-            .filter(EventParticipant.user_id == user.id)
-            .filter(CalendarEvent.status == EventStatus.approved)
-        )
+    query = visible_events_query(db, user)
+    if query is None:
+        if compact:
+            return ORJSONResponse(encode_calendar([], start), media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+        return ORJSONResponse([], headers=headers)
+
+    if event_id is not None:
+        query = query.filter(CalendarEvent.id == event_id)
 
     if start and end:
         non_recurring = and_(
@@ -127,16 +166,87 @@ def list_events(
         )
         query = query.filter(or_(CalendarEvent.rrule.is_not(None), non_recurring))
 
-    events = query.order_by(CalendarEvent.starts_at.desc()).all()
-    results: List[EventOut] = []
+    rows = (
+        query.outerjoin(Room, Room.id == CalendarEvent.room_id)
+        .add_columns(Room.code)
+        .order_by(CalendarEvent.starts_at.desc())
+        .all()
+    )
+
+    if compact:
+        payload = encode_calendar(_columnar_series(rows, start, end), start)
+        return ORJSONResponse(payload, media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
 
-    for event in events:
+    results: List[EventRow] = []
+
+    for event, room_code in rows:
         if event.rrule and start and end:
-            results.extend(_expand_recurring_event(event, start, end))
+            results.extend(_expand_recurring_rows(event, room_code, start, end))
         else:
-            results.append(_to_event_out(event))
+            results.append(_event_row(event, room_code))
+
+    return ORJSONResponse(results, headers=headers)
+
+
+@router.get("/calendar/stream")
+async def stream_changes(authorization: Optional[str] = Header(default=None, alias="Authorization")):
+    viewer = await run_in_threadpool(live.load_viewer, authorization)
+    return StreamingResponse(
+        live.change_stream(viewer, live.broker.subscribe()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    return results
+
+@router.get("/calendar/search", response_model=EventSearchOut)
+def search_events(
+    q: str = Query(..., min_length=1, max_length=200),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=50),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    terms = fulltext.search_terms(q)
+    query = visible_events_query(db, user)
+    if not terms or query is None:
+        return EventSearchOut(items=[], offset=offset, limit=limit, has_more=False)
+
+    rows = (
+        fulltext.search_events(query, db.get_bind().dialect.name, terms)
+        .outerjoin(Room, Room.id == CalendarEvent.room_id)
+        .add_columns(Room.code)
+        .offset(offset)
+        .limit(limit + 1)
+        .all()
+    )
+    items = [
+        EventSearchHitOut(
+            id=str(event.id),
+            title=event.title,
+            description=event.description,
+            start=event.starts_at,
+            end=event.ends_at,
+            rrule=event.rrule,
+            duration=_duration_from_minutes(event.duration_minutes),
+            event_type=event.event_type.value,
+            status=event.status.value,
+            room_id=event.room_id,
+            room_code=room_code,
+            club_id=event.club_id,
+            rank=round(rank or 0.0, 4),
+        )
+        for event, rank, room_code in rows[:limit]
+    ]
+    return EventSearchOut(items=items, offset=offset, limit=limit, has_more=len(rows) > limit)
+
+
+@router.get("/calendar/upcoming", response_model=List[EventOut])
+def list_upcoming(
+    limit: int = Query(default=8, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return occurrences_out(upcoming_occurrences(db, user, limit, local_now()))
 
 
 @router.post("/calendar/events", response_model=EventOut)
@@ -184,7 +294,7 @@ def create_event(
 
     room_id = payload.room_id
     if payload.room_code:
-        room = db.query(Room).filter(Room.code.ilike(payload.room_code.strip())).first()
+        room = db.query(Room).filter(key_equals(Room.code_key, payload.room_code)).first()
         if not room:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="room not found")
         room_id = room.id
@@ -211,7 +321,9 @@ def create_event(
         for participant_id in payload.participant_ids:
             db.add(EventParticipant(event_id=event.id, user_id=participant_id))
 
+    live.event_changed(db, event)
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     db.refresh(event)
     return _to_event_out(event)
 
@@ -230,6 +342,8 @@ def cancel_event(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
     event.status = EventStatus.cancelled
+    live.event_changed(db, event)
     db.commit()
+    cache.invalidate(cache.CALENDAR)
     db.refresh(event)
     return _to_event_out(event)
@@ -3,12 +3,15 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from .. import cache, live
+from ..broadcasts import broadcast_out, require_broadcaster, start_broadcast
 from ..database import get_db
 from ..dependencies import get_current_user
-from ..models import Club, ClubMember, ClubMemberRole, User, UserRole
-from ..schemas import ClubMemberAdd, ClubMemberUserOut, ClubMembershipOut, ClubOut
+from ..models import Broadcast, Club, ClubMember, ClubMemberRole, User, UserRole, key_equals
+from ..profiling import ProfiledRoute
+from ..schemas import BroadcastCreate, BroadcastOut, ClubMemberAdd, ClubMemberUserOut, ClubMembershipOut, ClubOut
 
-router = APIRouter(tags=["clubs"])
+router = APIRouter(tags=["clubs"], route_class=ProfiledRoute)
 
 
 @router.get("/clubs/my", response_model=List[ClubOut])
@@ -61,11 +64,11 @@ def add_member(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    club = db.query(Club).filter(Club.name.ilike(payload.club_name.strip())).first()
+    club = db.query(Club).filter(key_equals(Club.name_key, payload.club_name)).first()
     if not club:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="club not found")
 
-    target = db.query(User).filter(User.email.ilike(payload.user_email.strip())).first()
+    target = db.query(User).filter(key_equals(User.email_key, payload.user_email)).first()
     if not target:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="user not found")
 
@@ -98,7 +101,9 @@ def add_member(
         )
         db.add(membership)
 
+    live.scopes_changed(db, (cache.CLUBS,))
     db.commit()
+    cache.invalidate(cache.CLUBS)
     return ClubMembershipOut(id=club.id, name=club.name, role=membership.role.value)
 
 
@@ -108,7 +113,7 @@ def leave_club(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    club = db.query(Club).filter(Club.name.ilike(club_name.strip())).first()
+    club = db.query(Club).filter(key_equals(Club.name_key, club_name)).first()
     if not club:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="club not found")
 
@@ -124,7 +129,9 @@ def leave_club(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="leader cannot leave club")
 
     db.delete(membership)
+    live.scopes_changed(db, (cache.CLUBS,))
     db.commit()
+    cache.invalidate(cache.CLUBS)
     return {"club_name": club.name, "status": "left"}
 
 
@@ -134,7 +141,7 @@ def list_club_members(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    club = db.query(Club).filter(Club.name.ilike(club_name.strip())).first()
+    club = db.query(Club).filter(key_equals(Club.name_key, club_name)).first()
     if not club:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="club not found")
 
@@ -167,3 +174,31 @@ def list_club_members(
         )
         for member, role in members
     ]
+
+
+@router.post("/clubs/{club_id}/broadcasts", response_model=BroadcastOut, status_code=status.HTTP_202_ACCEPTED)
+def create_broadcast(
+    club_id: int,
+    payload: BroadcastCreate,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    club = db.get(Club, club_id)
+    if not club:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="club not found")
+    require_broadcaster(db, user, club)
+    return broadcast_out(start_broadcast(db, club, user, payload.text))
+
+
+@router.get("/clubs/{club_id}/broadcasts/{broadcast_id}", response_model=BroadcastOut)
+def get_broadcast(
+    club_id: int,
+    broadcast_id: int,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    broadcast = db.get(Broadcast, broadcast_id)
+    if not broadcast or broadcast.club_id != club_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="broadcast not found")
+    require_broadcaster(db, user, broadcast.club)
+    return broadcast_out(broadcast)
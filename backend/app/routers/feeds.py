@@ -0,0 +1,197 @@
+import hashlib
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from .. import cache
+from ..config import APP_TZ, ICS_CACHE_SECONDS
+from ..database import SessionLocal, get_db
+from ..dependencies import get_current_user
+from ..ics import escape_text, fold_line, format_local, format_utc, rrule_lines
+from ..models import CalendarEvent, Club, ClubMember, EventStatus, Room, User, key_equals
+from ..profiling import ProfiledRoute
+from ..schemas import IcsLinkOut, IcsLinksOut
+from ..security import create_feed_token, verify_feed_token
+from ..static_assets import etag_matches
+from ..visibility import visible_events_query
+
+router = APIRouter(tags=["ics"], route_class=ProfiledRoute)
+
+FEED_KINDS = ("user", "room", "club")
+FEED_MEDIA_TYPE = "text/calendar; charset=utf-8"
+FEED_YIELD_PER = 500
+
+feed_cache = cache.VersionedCache(max_entries=5000, ttl_seconds=ICS_CACHE_SECONDS)
+
+
+def _feed_url(request: Request, kind: str, object_id: int) -> str:
+    return str(request.url_for("ics_feed", kind=kind, token=create_feed_token(kind, object_id)))
+
+
+@router.get("/ics/links", response_model=IcsLinksOut)
+def ics_links(
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    clubs = (
+        db.query(Club)
+        .join(ClubMember, ClubMember.club_id == Club.id)
+        .filter(ClubMember.user_id == user.id)
+        .order_by(Club.name.asc())
+        .all()
+    )
+    return IcsLinksOut(
+        user=_feed_url(request, "user", user.id),
+        clubs=[
+            IcsLinkOut(id=club.id, name=club.name, url=_feed_url(request, "club", club.id))
+            for club in clubs
+        ],
+    )
+
+
+@router.get("/ics/links/rooms/{room_code}", response_model=IcsLinkOut)
+def ics_room_link(
+    room_code: str,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    room = db.query(Room).filter(key_equals(Room.code_key, room_code)).first()
+    if not room:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="room not found")
+    return IcsLinkOut(id=room.id, name=room.code, url=_feed_url(request, "room", room.id))
+
+
+def _feed_name(db: Session, kind: str, object_id: int) -> Optional[str]:
+    if kind == "user":
+        user = db.get(User, object_id)
+        return f"Roomly: {user.full_name or user.email or 'my calendar'}" if user else None
+    if kind == "room":
+        room = db.get(Room, object_id)
+        return f"Roomly: room {room.code}" if room else None
+    club = db.get(Club, object_id)
+    return f"Roomly: {club.name}" if club else None
+
+
+def _feed_query(db: Session, kind: str, object_id: int):
+    if kind == "user":
+        query = visible_events_query(db, db.get(User, object_id))
+        if query is None:
+            return None
+    else:
+        query = db.query(CalendarEvent).filter(CalendarEvent.status == EventStatus.approved)
+        if kind == "room":
+            query = query.filter(CalendarEvent.room_id == object_id)
+        else:
+            query = query.filter(CalendarEvent.club_id == object_id)
+
+    return (
+        query.filter(CalendarEvent.status.notin_([EventStatus.rejected, EventStatus.cancelled]))
+        .outerjoin(Room, Room.id == CalendarEvent.room_id)
+        .add_columns(Room.code)
+        .order_by(CalendarEvent.id.asc())
+        .yield_per(FEED_YIELD_PER)
+    )
+
+
+def _render_event(event: CalendarEvent, room_code: Optional[str]) -> str:
+    tzid = event.timezone or APP_TZ
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{event.id}@roomly",
+        f"DTSTAMP:{format_utc(event.approved_at or event.created_at)}",
+        f"DTSTART;TZID={tzid}:{format_local(event.starts_at)}",
+    ]
+    if event.rrule:
+        minutes = event.duration_minutes
+        if not minutes and event.ends_at:
+            minutes = int((event.ends_at - event.starts_at).total_seconds() // 60)
+        lines.append(f"DURATION:PT{minutes or 60}M")
+        lines.extend(rrule_lines(event.rrule))
+    elif event.ends_at:
+        lines.append(f"DTEND;TZID={tzid}:{format_local(event.ends_at)}")
+    lines.append(f"SUMMARY:{escape_text(event.title)}")
+    if event.description:
+        lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+    if room_code:
+        lines.append(f"LOCATION:{escape_text(room_code)}")
+    lines.append(f"CATEGORIES:{event.event_type.value.upper()}")
+    lines.append("STATUS:TENTATIVE" if event.status == EventStatus.pending else "STATUS:CONFIRMED")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def _feed_etag(kind: str, object_id: int, name: str, tag: str) -> str:
+    return f'"{hashlib.sha1(f"{kind}|{object_id}|{name}|{APP_TZ}|{tag}".encode("utf-8")).hexdigest()}"'
+
+
+def _stream_feed(kind: str, object_id: int, name: str, tag: str, etag: str) -> Iterator[str]:
+    chunks = [
+        "".join(
+            fold_line(line)
+            for line in (
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                "PRODID:-//Roomly//Calendar//EN",
+                "CALSCALE:GREGORIAN",
+                f"X-WR-CALNAME:{escape_text(name)}",
+                f"X-WR-TIMEZONE:{APP_TZ}",
+            )
+        )
+    ]
+    yield chunks[0]
+
+    db = SessionLocal()
+    try:
+        query = _feed_query(db, kind, object_id)
+        if query is not None:
+            for event, room_code in query:
+                chunk = _render_event(event, room_code)
+                chunks.append(chunk)
+                yield chunk
+    finally:
+        db.close()
+
+    chunks.append(fold_line("END:VCALENDAR"))
+    yield chunks[-1]
+
+    feed_cache.set((kind, object_id), tag, (etag, "".join(chunks).encode("utf-8")))
+
+
+@router.get("/ics/{kind}/{token}.ics", name="ics_feed")
+def ics_feed(
+    kind: str,
+    token: str,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+):
+    object_id = verify_feed_token(kind, token) if kind in FEED_KINDS else None
+    if object_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="feed not found")
+
+    headers = {"Cache-Control": "private, no-cache"}
+    tag = cache.version(cache.CALENDAR)
+    cached = feed_cache.get((kind, object_id), tag)
+    if cached is not None:
+        etag, body = cached
+        headers["ETag"] = etag
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type=FEED_MEDIA_TYPE, headers=headers)
+
+    with SessionLocal() as db:
+        name = _feed_name(db, kind, object_id)
+    if name is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="feed not found")
+
+    etag = _feed_etag(kind, object_id, name, tag)
+    headers["ETag"] = etag
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return StreamingResponse(
+        _stream_feed(kind, object_id, name, tag, etag),
+        media_type=FEED_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -0,0 +1,60 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..dependencies import require_admin
+from ..models import Job, JobStatus, User
+from ..profiling import ProfiledRoute
+from ..schemas import JobOut
+
+router = APIRouter(tags=["jobs"], route_class=ProfiledRoute)
+
+
+def _job_out(job: Job) -> JobOut:
+    return JobOut(
+        id=job.id,
+        kind=job.kind,
+        status=job.status.value,
+        payload=job.payload or {},
+        result=job.result,
+        error=job.error,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        created_by=job.created_by,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.get("/admin/jobs", response_model=List[JobOut])
+def list_jobs(
+    job_status: Optional[str] = Query(default=None, alias="status"),
+    kind: Optional[str] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    query = db.query(Job)
+    if job_status is not None:
+        try:
+            query = query.filter(Job.status == JobStatus(job_status))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid status")
+    if kind is not None:
+        query = query.filter(Job.kind == kind)
+    return [_job_out(job) for job in query.order_by(Job.id.desc()).limit(limit)]
+
+
+@router.get("/admin/jobs/{job_id}", response_model=JobOut)
+def get_job(
+    job_id: int,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job not found")
+    return _job_out(job)
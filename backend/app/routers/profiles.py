@@ -0,0 +1,42 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from .. import profiling
+from ..dependencies import require_admin
+from ..models import User
+from ..profiling import ProfiledRoute
+from ..schemas import ProfileOut
+
+router = APIRouter(tags=["profiling"], route_class=ProfiledRoute)
+
+
+@router.get("/admin/profiles", response_model=List[ProfileOut])
+def list_profiles(admin: User = Depends(require_admin)):
+    return [
+        ProfileOut(
+            id=profile.id,
+            created_at=profile.created_at,
+            method=profile.method,
+            path=profile.path,
+            duration_ms=round(profile.duration_ms, 1),
+            samples=sum(profile.samples.values()),
+        )
+        for profile in profiling.store.list()
+    ]
+
+
+@router.get("/admin/profiles/process", response_class=PlainTextResponse)
+def process_profile(admin: User = Depends(require_admin)):
+    if profiling.process_sampler is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="process profiling disabled")
+    return PlainTextResponse(profiling.render_collapsed(profiling.process_sampler.snapshot()))
+
+
+@router.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str, admin: User = Depends(require_admin)):
+    profile = profiling.store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="profile not found")
+    return PlainTextResponse(profiling.render_collapsed(profile.samples))
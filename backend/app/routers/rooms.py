@@ -1,14 +1,17 @@
 from typing import List
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..dependencies import get_current_user
 from ..models import Room, User
+from ..profiling import ProfiledRoute
+from ..rows import ROOM_ROW_COLUMNS, RoomRow
 from ..schemas import RoomOut
 
-router = APIRouter(tags=["rooms"])
+router = APIRouter(tags=["rooms"], route_class=ProfiledRoute)
 
 
 @router.get("/rooms/available", response_model=List[RoomOut])
@@ -16,5 +19,5 @@ def list_available_rooms(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    rooms = db.query(Room).filter(Room.is_active.is_(True)).order_by(Room.code.asc()).all()
-    return [RoomOut.model_validate(room) for room in rooms]
+    rows = db.query(*ROOM_ROW_COLUMNS).filter(Room.is_active.is_(True)).order_by(Room.code.asc())
+    return ORJSONResponse([RoomRow(*row) for row in rows])
@@ -0,0 +1,33 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+
+from ..dependencies import get_current_user
+from ..models import User, UserRole
+from ..profiling import ProfiledRoute
+from ..schemas import SearchHitOut
+from ..search import KINDS, search_index
+
+router = APIRouter(tags=["search"], route_class=ProfiledRoute)
+
+USER_SEARCH_ROLES = (UserRole.admin, UserRole.club_leader)
+
+
+@router.get("/search", response_model=List[SearchHitOut])
+def search(
+    q: str = Query(..., min_length=1, max_length=128),
+    kind: Optional[str] = Query(default=None),
+    limit: int = Query(default=10, ge=1, le=50),
+    user: User = Depends(get_current_user),
+):
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid kind")
+
+    kinds = [kind] if kind else list(KINDS)
+    if user.role not in USER_SEARCH_ROLES:
+        if kind == "user":
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="club leader required")
+        kinds = [value for value in kinds if value != "user"]
+
+    return ORJSONResponse(search_index.search(q, kinds, limit))
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy import Integer, and_, cast, select
+from sqlalchemy.orm import Session
+
+from .. import jobs
+from ..database import get_db
+from ..dependencies import require_admin
+from ..models import Club, EventStatus, StatCounter, User
+from ..profiling import ProfiledRoute
+from ..schemas import AdminStatsOut, ClubStatsOut
+from ..stats import EVENTS_BY_CLUB, EVENTS_BY_STATUS, MEMBERS_BY_CLUB, USERS_BY_ROLE
+
+router = APIRouter(tags=["stats"], route_class=ProfiledRoute)
+
+CLUB_SCOPES = (EVENTS_BY_CLUB, MEMBERS_BY_CLUB)
+
+
+@router.get("/admin/stats", response_model=AdminStatsOut)
+def admin_stats(
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    club_key = and_(StatCounter.scope.in_(CLUB_SCOPES), Club.id == cast(StatCounter.key, Integer))
+    rows = db.execute(
+        select(StatCounter.scope, StatCounter.key, StatCounter.value, Club.name)
+        .outerjoin(Club, club_key)
+        .where(StatCounter.value != 0)
+    )
+    by_scope = {EVENTS_BY_STATUS: {}, USERS_BY_ROLE: {}}
+    clubs = {}
+    for scope, key, value, club_name in rows:
+        if scope in by_scope:
+            by_scope[scope][key] = value
+        elif club_name is not None:
+            club = clubs.setdefault(key, ClubStatsOut(club_id=int(key), name=club_name, events=0, members=0))
+            if scope == EVENTS_BY_CLUB:
+                club.events = value
+            else:
+                club.members = value
+    return AdminStatsOut(
+        pending_events=by_scope[EVENTS_BY_STATUS].get(EventStatus.pending.value, 0),
+        events_by_status=by_scope[EVENTS_BY_STATUS],
+        users_by_role=by_scope[USERS_BY_ROLE],
+        clubs=sorted(clubs.values(), key=lambda club: (-club.events, club.name)),
+    )
+
+
+@router.post("/admin/stats/rebuild", status_code=status.HTTP_202_ACCEPTED)
+def rebuild_stats(
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    job = jobs.enqueue(db, "stats_rebuild", created_by=admin.id)
+    db.commit()
+    return {"status": "scheduled", "job_id": job.id}
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .models import Room
+
+
+@dataclass(slots=True)
+class EventRow:
+    id: str
+    title: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    rrule: Optional[str]
+    duration: Optional[str]
+    event_type: str
+    status: str
+    room_id: Optional[int]
+    room_code: Optional[str]
+    club_id: Optional[int]
+
+
+@dataclass(slots=True)
+class RoomRow:
+    id: int
+    code: str
+    building: Optional[str]
+    floor: Optional[str]
+    room_type: Optional[str]
+    capacity: Optional[int]
+    is_active: bool
+
+
+@dataclass(slots=True)
+class SearchHit:
+    kind: str
+    id: int
+    title: str
+    subtitle: Optional[str]
+    rank: int
+
+
+ROOM_ROW_COLUMNS = (
+    Room.id,
+    Room.code,
+    Room.building,
+    Room.floor,
+    Room.room_type,
+    Room.capacity,
+    Room.is_active,
+)
+
+
+@dataclass(slots=True)
+class AdminUserRow:
+    id: int
+    email: Optional[str]
+    full_name: Optional[str]
+    role: str
+
+
+@dataclass(slots=True)
+class AdminClubRow:
+    id: int
+    name: str
+    owner_user_id: Optional[int]
+
+
+@dataclass(slots=True)
+class AdminClubMemberRow:
+    club_id: int
+    club_name: str
+    user_id: int
+    user_email: Optional[str]
+    role: str
+
+
+@dataclass(slots=True)
+class AdminEventRow:
+    id: int
+    title: str
+    status: str
+    event_type: str
+    club_id: Optional[int]
+    room_code: Optional[str]
+
+
+@dataclass(slots=True)
+class AdminEventParticipantRow:
+    event_id: int
+    user_id: int
+    user_email: Optional[str]
@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -56,6 +56,18 @@ class EventOut(BaseModel):
     club_id: Optional[int] = None
 
 
+class EventSearchHitOut(EventOut):
+    description: Optional[str] = None
+    rank: float
+
+
+class EventSearchOut(BaseModel):
+    items: List[EventSearchHitOut]
+    offset: int
+    limit: int
+    has_more: bool
+
+
 class RoleAssign(BaseModel):
     role: str
 
@@ -116,6 +128,14 @@ class AdminUserOut(BaseModel):
     role: str
 
 
+class SearchHitOut(BaseModel):
+    kind: str
+    id: int
+    title: str
+    subtitle: Optional[str]
+    rank: int
+
+
 class AdminClubOut(BaseModel):
     id: int
     name: str
@@ -139,6 +159,123 @@ class AdminEventOut(BaseModel):
     room_code: Optional[str]
 
 
+class BulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkDeleteOut(BaseModel):
+    deleted: List[int]
+    missing: List[int]
+    status: str
+
+
+class JobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    kind: str
+    status: str
+    payload: Dict[str, Any]
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    created_by: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class RoomUsageOut(BaseModel):
+    room_id: int
+    room_code: str
+    building: Optional[str] = None
+    capacity: Optional[int] = None
+    busy_hours: float
+    occupancy: Optional[float] = None
+    peak_hours: List[int]
+    heatmap: Optional[List[List[float]]] = None
+
+
+class RoomAnalyticsOut(BaseModel):
+    start: datetime
+    end: datetime
+    open_hour: int
+    close_hour: int
+    open_hours: float
+    rooms: List[RoomUsageOut]
+    heatmap: List[List[float]]
+
+
+class ClubStatsOut(BaseModel):
+    club_id: int
+    name: str
+    events: int
+    members: int
+
+
+class AdminStatsOut(BaseModel):
+    pending_events: int
+    events_by_status: Dict[str, int]
+    users_by_role: Dict[str, int]
+    clubs: List[ClubStatsOut]
+
+
+class BroadcastCreate(BaseModel):
+    text: str = Field(..., min_length=1, max_length=3500)
+
+
+class BroadcastOut(BaseModel):
+    id: int
+    club_id: int
+    status: str
+    total: int
+    sent: int
+    failed: int
+    job_id: Optional[int] = None
+    created_at: datetime
+
+
+class PendingEventOut(BaseModel):
+    id: int
+    title: str
+    event_type: str
+    start: datetime
+    end: Optional[datetime] = None
+    rrule: Optional[str] = None
+    club_id: Optional[int] = None
+    club_name: Optional[str] = None
+    room_code: Optional[str] = None
+    created_by_email: Optional[str] = None
+    conflicts: List[int]
+
+
+class PendingQueueOut(BaseModel):
+    items: List[PendingEventOut]
+    total: int
+    offset: int
+    limit: int
+    has_more: bool
+
+
+class EventBatchDecision(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+    action: str
+    force: bool = False
+
+
+class EventConflictOut(BaseModel):
+    id: int
+    conflicts_with: List[int]
+
+
+class EventBatchOut(BaseModel):
+    action: str
+    updated: List[int]
+    conflicts: List[EventConflictOut]
+    skipped: List[int]
+
+
 class AdminEventParticipantOut(BaseModel):
     event_id: int
     user_id: int
@@ -200,3 +337,79 @@ class BotEmailAssign(BaseModel):
     user_id: Optional[int] = None
     tg_id: Optional[str] = None
     email: str
+
+
+class BotBroadcastCreate(BaseModel):
+    tg_id: str
+    club_name: str
+    text: str = Field(..., min_length=1, max_length=3500)
+
+
+class BotBroadcastStatus(BaseModel):
+    tg_id: str
+    broadcast_id: int
+
+
+class BotAgendaRequest(BaseModel):
+    tg_id: str
+    days: int = Field(default=1, ge=1, le=7)
+
+
+class AgendaItemOut(BaseModel):
+    event_id: int
+    title: str
+    event_type: str
+    starts_at: datetime
+    ends_at: datetime
+    room_code: Optional[str] = None
+
+
+class AgendaOut(BaseModel):
+    day: date
+    days: int
+    items: List[AgendaItemOut]
+
+
+class LessonImportIssue(BaseModel):
+    line: int
+    uid: Optional[str] = None
+    title: Optional[str] = None
+    detail: str
+
+
+class LessonImportReport(BaseModel):
+    processed: int = 0
+    created: int = 0
+    participants: int = 0
+    unknown_attendees: int = 0
+    duplicates: List[LessonImportIssue] = []
+    unknown_rooms: Dict[str, int] = {}
+    errors: List[LessonImportIssue] = []
+
+
+class IcsLinkOut(BaseModel):
+    id: int
+    name: str
+    url: str
+
+
+class IcsLinksOut(BaseModel):
+    user: str
+    clubs: List[IcsLinkOut]
+
+
+class BootstrapOut(BaseModel):
+    user: UserOut
+    clubs: List[ClubOut]
+    memberships: List[ClubMembershipOut]
+    rooms: List[RoomOut]
+    upcoming: List[EventOut]
+
+
+class ProfileOut(BaseModel):
+    id: str
+    created_at: datetime
+    method: str
+    path: str
+    duration_ms: float
+    samples: int
@@ -0,0 +1,182 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import cache
+from .database import SessionLocal
+from .models import Club, Room, User
+from .rows import SearchHit
+
+KINDS = ("user", "club", "room")
+SYNC_REBUILD_SECONDS = 0.1
+
+EXACT, FIELD_PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+FIELD_SEPARATOR = "\x1e"
+
+
+@dataclass(slots=True)
+class Document:
+    kind: str
+    id: int
+    title: str
+    subtitle: Optional[str]
+    fields: Tuple[str, ...]
+
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or "").replace(FIELD_SEPARATOR, " ").strip().lower()
+
+
+def _document(
+    kind: str, id: int, title: str, subtitle: Optional[str], values: Iterable[Optional[str]]
+) -> Document:
+    fields = tuple(dict.fromkeys(value for value in map(_normalize, values) if value))
+    return Document(kind, id, title, subtitle, fields)
+
+
+class KindIndex:
+    def __init__(self, documents: List[Document]):
+        self.documents = sorted(documents, key=lambda document: (len(document.title), document.title.lower()))
+        self.offsets = array("I")
+        self.exact: Dict[str, List[int]] = {}
+        parts = []
+        offset = 0
+        for position, document in enumerate(self.documents):
+            chunk = "".join(FIELD_SEPARATOR + field for field in document.fields) + FIELD_SEPARATOR
+            self.offsets.append(offset)
+            parts.append(chunk)
+            offset += len(chunk)
+            for field in document.fields:
+                self.exact.setdefault(field, []).append(position)
+        self.haystack = "".join(parts)
+
+    def _position(self, found: int) -> int:
+        return bisect_right(self.offsets, found) - 1
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, Document]]:
+        haystack = self.haystack
+        matches = {position: EXACT for position in self.exact.get(query, ())}
+        prefixes = len(matches)
+        needle = FIELD_SEPARATOR + query
+        found = haystack.find(needle)
+        while found != -1 and prefixes < limit:
+            position = self._position(found)
+            if position not in matches:
+                matches[position] = FIELD_PREFIX
+                prefixes += 1
+            found = haystack.find(needle, found + 1)
+
+        words = prefixes
+        substrings = 0
+        found = haystack.find(query) if words < limit else -1
+        while found != -1 and words < limit:
+            if not haystack[found - 1].isalnum():
+                position = self._position(found)
+                if matches.get(position, SUBSTRING) > WORD_PREFIX:
+                    substrings -= matches.get(position) == SUBSTRING
+                    matches[position] = WORD_PREFIX
+                    words += 1
+            elif substrings < limit:
+                position = self._position(found)
+                if position not in matches:
+                    matches[position] = SUBSTRING
+                    substrings += 1
+            found = haystack.find(query, found + 1)
+
+        best = heapq.nsmallest(limit, matches.items(), key=lambda item: (item[1], item[0]))
+        return [(rank, self.documents[position]) for position, rank in best]
+
+
+def _load_users(db: Session) -> List[Document]:
+    rows = db.execute(select(User.id, User.email, User.full_name, User.username, User.tg_id))
+    documents = []
+    for user_id, email, full_name, username, tg_id in rows:
+        title = email or full_name or username or tg_id
+        subtitle = next((value for value in (full_name, username) if value and value != title), None)
+        documents.append(_document("user", user_id, title, subtitle, (email, full_name, username)))
+    return documents
+
+
+def _load_clubs(db: Session) -> List[Document]:
+    rows = db.execute(select(Club.id, Club.name))
+    return [_document("club", club_id, name, None, (name,)) for club_id, name in rows]
+
+
+def _load_rooms(db: Session) -> List[Document]:
+    rows = db.execute(select(Room.id, Room.code, Room.building))
+    return [_document("room", room_id, code, building, (code,)) for room_id, code, building in rows]
+
+
+LOADERS: Dict[str, Tuple[str, Callable[[Session], List[Document]]]] = {
+    "user": (cache.USERS, _load_users),
+    "club": (cache.CLUBS, _load_clubs),
+    "room": (cache.ROOMS, _load_rooms),
+}
+
+
+class SearchIndex:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self._indexes: Dict[str, Tuple[str, KindIndex]] = {}
+        self._build_seconds: Dict[str, float] = {}
+        self._building: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _build(self, kind: str, tag: str) -> KindIndex:
+        _, load = LOADERS[kind]
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            index = KindIndex(load(db))
+        finally:
+            db.close()
+        with self._lock:
+            self._indexes[kind] = (tag, index)
+            self._build_seconds[kind] = time.perf_counter() - started
+            self._building.discard(kind)
+        return index
+
+    def _rebuild_in_background(self, kind: str, tag: str) -> None:
+        with self._lock:
+            if kind in self._building:
+                return
+            self._building.add(kind)
+        threading.Thread(target=self._build, args=(kind, tag), name=f"search-{kind}", daemon=True).start()
+
+    def index(self, kind: str) -> KindIndex:
+        tag = cache.version(LOADERS[kind][0])
+        current = self._indexes.get(kind)
+        if current is None:
+            return self._build(kind, tag)
+        current_tag, index = current
+        if current_tag == tag:
+            return index
+        if self._build_seconds.get(kind, 0.0) <= SYNC_REBUILD_SECONDS:
+            return self._build(kind, tag)
+        self._rebuild_in_background(kind, tag)
+        return index
+
+    def search(self, query: str, kinds: Iterable[str], limit: int) -> List[SearchHit]:
+        query = _normalize(query)
+        if not query:
+            return []
+        scored = []
+        for kind_order, kind in enumerate(kinds):
+            for rank, document in self.index(kind).search(query, limit):
+                scored.append(((rank, kind_order, len(document.title), document.title.lower()), document))
+        scored.sort(key=lambda item: item[0])
+        return [
+            SearchHit(document.kind, document.id, document.title, document.subtitle, key[0])
+            for key, document in scored[:limit]
+        ]
+
+
+search_index = SearchIndex()
@@ -7,7 +7,7 @@ from urllib.parse import parse_qsl
 
 import jwt
 
-from .config import BOT_TOKEN, JWT_ALG, JWT_EXPIRES_MINUTES, JWT_SECRET
+from .config import BOT_TOKEN, ICS_FEED_SECRET, JWT_ALG, JWT_EXPIRES_MINUTES, JWT_SECRET
 
 
 class AuthError(Exception):
@@ -32,6 +32,24 @@ def decode_token(token: str) -> Dict[str, Any]:
         raise AuthError("invalid token") from exc
 
 
+def _feed_signature(kind: str, object_id: int) -> str:
+    message = f"ics:{kind}:{object_id}".encode()
+    return hmac.new(ICS_FEED_SECRET.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def create_feed_token(kind: str, object_id: int) -> str:
+    return f"{object_id}-{_feed_signature(kind, object_id)}"
+
+
+def verify_feed_token(kind: str, token: str) -> Optional[int]:
+    object_id, _, signature = token.partition("-")
+    if not object_id.isdigit() or not signature:
+        return None
+    if not hmac.compare_digest(signature, _feed_signature(kind, int(object_id))):
+        return None
+    return int(object_id)
+
+
 def _build_data_check_string(data: Dict[str, str]) -> str:
     pairs = [f"{k}={v}" for k, v in sorted(data.items()) if k != "hash"]
     return "\n".join(pairs)
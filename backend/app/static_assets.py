@@ -0,0 +1,152 @@
+import argparse
+import gzip
+import hashlib
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FINGERPRINTED_FILES = ("script.js", "style.css")
+STATIC_PREFIX = "/static"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+MIN_COMPRESS_BYTES = 512
+
+MEDIA_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+}
+
+
+@dataclass
+class StaticAsset:
+    name: str
+    media_type: str
+    digest: str
+    body: bytes
+    encodings: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def url(self) -> str:
+        return f"{STATIC_PREFIX}/{self.digest}/{self.name}"
+
+
+def _compress(body: bytes) -> Dict[str, bytes]:
+    if len(body) < MIN_COMPRESS_BYTES:
+        return {}
+    encodings = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(body, quality=11)
+    return encodings
+
+
+def _build(name: str, body: bytes) -> StaticAsset:
+    return StaticAsset(
+        name=name,
+        media_type=MEDIA_TYPES.get(Path(name).suffix, "application/octet-stream"),
+        digest=hashlib.sha256(body).hexdigest()[:16],
+        body=body,
+        encodings=_compress(body),
+    )
+
+
+def _accepted_encodings(header: Optional[str]) -> List[str]:
+    accepted = []
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding:
+            accepted.append(coding.strip().lower())
+    return accepted
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class StaticBundle:
+    def __init__(self, root: Path):
+        self.root = root
+        self.assets: Dict[str, StaticAsset] = {}
+        for name in FINGERPRINTED_FILES:
+            self.assets[name] = _build(name, (root / name).read_bytes())
+        self.index = _build("index.html", self._render_index((root / "index.html").read_text("utf-8")))
+
+    def _render_index(self, html: str) -> bytes:
+        names = "|".join(re.escape(name) for name in self.assets)
+        pattern = re.compile(rf'(src|href)="/?({names})(\?[^"]*)?"')
+        return pattern.sub(lambda m: f'{m.group(1)}="{self.assets[m.group(2)].url}"', html).encode("utf-8")
+
+    def respond(self, asset: StaticAsset, request: Request, cache_control: str) -> Response:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding"))
+        encoding = next((coding for coding in ("br", "gzip") if coding in asset.encodings and coding in accepted), None)
+        etag = f'"{asset.digest}-{encoding}"' if encoding else f'"{asset.digest}"'
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(asset.encodings[encoding], media_type=asset.media_type, headers=headers)
+        return Response(asset.body, media_type=asset.media_type, headers=headers)
+
+    def index_response(self, request: Request) -> Response:
+        return self.respond(self.index, request, REVALIDATE_CACHE)
+
+    def file_response(self, name: str, request: Request, digest: Optional[str] = None) -> Optional[Response]:
+        asset = self.assets.get(name)
+        if asset is None:
+            return None
+        cache_control = IMMUTABLE_CACHE if digest == asset.digest else REVALIDATE_CACHE
+        return self.respond(asset, request, cache_control)
+
+    def write(self, output: Path) -> List[Path]:
+        written = []
+        for asset in self.assets.values():
+            written.extend(_write_asset(output / asset.digest, asset))
+        written.extend(_write_asset(output, self.index))
+        return written
+
+
+def _write_asset(directory: Path, asset: StaticAsset) -> List[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / asset.name
+    target.write_bytes(asset.body)
+    written = [target]
+    suffixes = {"gzip": ".gz", "br": ".br"}
+    for encoding, body in asset.encodings.items():
+        compressed = directory / f"{asset.name}{suffixes[encoding]}"
+        compressed.write_bytes(body)
+        written.append(compressed)
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = Path(__file__).resolve().parents[2]
+    parser = argparse.ArgumentParser(description="Write fingerprinted, precompressed static files for Nginx.")
+    parser.add_argument("--output", default=str(root / "static"), help="target directory (default: <repo>/static)")
+    args = parser.parse_args(argv)
+
+    bundle = StaticBundle(root)
+    for path in bundle.write(Path(args.output)):
+        print(path)
+    if brotli is None:
+        print("brotli is not installed; only gzip variants were written", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from . import jobs
+from .models import Job
+
+EVENTS_BY_STATUS = "events_by_status"
+EVENTS_BY_CLUB = "events_by_club"
+MEMBERS_BY_CLUB = "members_by_club"
+USERS_BY_ROLE = "users_by_role"
+
+
+@dataclass(frozen=True)
+class Counter:
+    scope: str
+    table: str
+    key: str
+    where: str = "1 = 1"
+    columns: Tuple[str, ...] = ()
+
+    def select(self, rows: str, delta: int, source: str = "") -> str:
+        source = f" FROM {source}" if source else ""
+        return (
+            f"SELECT '{self.scope}' AS scope, CAST({rows}.{self.key} AS TEXT) AS key, {delta} AS delta{source} "
+            f"WHERE {self.where.format(row=rows)}"
+        )
+
+
+COUNTERS: Tuple[Counter, ...] = (
+    Counter(EVENTS_BY_STATUS, "calendar_events", "status", columns=("status",)),
+    Counter(
+        EVENTS_BY_CLUB,
+        "calendar_events",
+        "club_id",
+        "{row}.club_id IS NOT NULL AND CAST({row}.status AS TEXT) IN ('pending', 'approved')",
+        ("club_id", "status"),
+    ),
+    Counter(MEMBERS_BY_CLUB, "club_members", "club_id", columns=("club_id",)),
+    Counter(USERS_BY_ROLE, "users", "role", columns=("role",)),
+)
+TABLES = tuple(dict.fromkeys(counter.table for counter in COUNTERS))
+
+UPSERT = "ON CONFLICT (scope, key) DO UPDATE SET value = stat_counters.value + excluded.value"
+
+
+def _counters(table: str) -> List[Counter]:
+    return [counter for counter in COUNTERS if counter.table == table]
+
+
+def _postgres_apply(table: str, *transitions: Tuple[str, int]) -> str:
+    changes = " UNION ALL ".join(
+        counter.select(rows, delta, rows) for rows, delta in transitions for counter in _counters(table)
+    )
+    return (
+        "INSERT INTO stat_counters (scope, key, value) "
+        f"SELECT scope, key, sum(delta) FROM ({changes}) changes "
+        f"GROUP BY scope, key HAVING sum(delta) <> 0 ORDER BY scope, key {UPSERT};"
+    )
+
+
+def _postgres_triggers(conn: Connection, table: str) -> None:
+    conn.execute(
+        text(
+            f"CREATE OR REPLACE FUNCTION stat_counters_{table}() RETURNS trigger AS $$ BEGIN "
+            f"IF TG_OP = 'INSERT' THEN {_postgres_apply(table, ('new_rows', 1))} "
+            f"ELSIF TG_OP = 'DELETE' THEN {_postgres_apply(table, ('old_rows', -1))} "
+            f"ELSE {_postgres_apply(table, ('new_rows', 1), ('old_rows', -1))} "
+            "END IF; RETURN NULL; END $$ LANGUAGE plpgsql"
+        )
+    )
+    for operation, referencing in (
+        ("INSERT", "NEW TABLE AS new_rows"),
+        ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+        ("DELETE", "OLD TABLE AS old_rows"),
+    ):
+        name = f"stat_counters_{table}_{operation.lower()}"
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {name} AFTER {operation} ON {table} REFERENCING {referencing} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_{table}()"
+            )
+        )
+
+
+def _sqlite_apply(table: str, *transitions: Tuple[str, int]) -> str:
+    return " ".join(
+        f"INSERT INTO stat_counters (scope, key, value) {counter.select(rows, delta)} {UPSERT};"
+        for rows, delta in transitions
+        for counter in _counters(table)
+    )
+
+
+def _sqlite_triggers(conn: Connection, table: str) -> None:
+    columns = ", ".join(dict.fromkeys(column for counter in _counters(table) for column in counter.columns))
+    for suffix, event, body in (
+        ("ai", "INSERT", _sqlite_apply(table, ("new", 1))),
+        ("ad", "DELETE", _sqlite_apply(table, ("old", -1))),
+        ("au", f"UPDATE OF {columns}", _sqlite_apply(table, ("old", -1), ("new", 1))),
+    ):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS stat_counters_{table}_{suffix}"))
+        conn.execute(text(f"CREATE TRIGGER stat_counters_{table}_{suffix} AFTER {event} ON {table} BEGIN {body} END"))
+
+
+def install_triggers(conn: Connection) -> None:
+    for table in TABLES:
+        if conn.dialect.name == "postgresql":
+            _postgres_triggers(conn, table)
+        else:
+            _sqlite_triggers(conn, table)
+
+
+def _recount_sql() -> str:
+    return " UNION ALL ".join(
+        f"SELECT scope, key, sum(delta) FROM ({counter.select(counter.table, 1, counter.table)}) {counter.scope} "
+        "GROUP BY scope, key"
+        for counter in COUNTERS
+    )
+
+
+def recount(db) -> None:
+    db.execute(text("DELETE FROM stat_counters"))
+    db.execute(text(f"INSERT INTO stat_counters (scope, key, value) {_recount_sql()}"))
+
+
+def read_counters(db) -> Dict[Tuple[str, str], int]:
+    rows = db.execute(text("SELECT scope, key, value FROM stat_counters"))
+    return {(scope, key): value for scope, key, value in rows}
+
+
+def rebuild(db) -> Dict[str, int]:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE stat_counters IN SHARE ROW EXCLUSIVE MODE"))
+    before = read_counters(db)
+    recount(db)
+    after = read_counters(db)
+    return {
+        f"{scope}:{key}": after.get((scope, key), 0) - before.get((scope, key), 0)
+        for scope, key in sorted(set(before) | set(after))
+        if after.get((scope, key), 0) != before.get((scope, key), 0)
+    }
+
+
+@jobs.handler("stats_rebuild", max_attempts=3)
+def _rebuild_job(db: Session, job: Job) -> dict:
+    drift = rebuild(db)
+    db.commit()
+    return {"corrected": drift}
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from .config import BOT_TOKEN, TELEGRAM_API_URL, TELEGRAM_CONCURRENCY, TELEGRAM_RATE_PER_SECOND
+
+logger = logging.getLogger("roomly.telegram")
+
+CHAT_INTERVAL_SECONDS = 1.0
+REQUEST_TIMEOUT_SECONDS = 10.0
+MAX_ATTEMPTS = 4
+MAX_BACKOFF_SECONDS = 30.0
+CHAT_SLOTS_LIMIT = 10_000
+
+
+@dataclass(slots=True)
+class SendResult:
+    chat_id: str
+    ok: bool
+    error: Optional[str] = None
+    permanent: bool = False
+
+
+class RateLimiter:
+    def __init__(self, rate: float, chat_interval: float = CHAT_INTERVAL_SECONDS):
+        self.interval = 1.0 / rate
+        self.chat_interval = chat_interval
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._chat_slots: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _prune(self, now: float) -> None:
+        if len(self._chat_slots) > CHAT_SLOTS_LIMIT:
+            self._chat_slots = {chat: slot for chat, slot in self._chat_slots.items() if slot > now}
+
+    async def acquire(self, chat_id: str) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._paused_until, self._chat_slots.get(chat_id, 0.0))
+            self._next_slot = slot + self.interval
+            self._chat_slots[chat_id] = slot + self.chat_interval
+            self._prune(now)
+        delay = slot - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class TelegramClient:
+    def __init__(
+        self,
+        token: str = BOT_TOKEN,
+        base_url: str = TELEGRAM_API_URL,
+        rate: float = TELEGRAM_RATE_PER_SECOND,
+        concurrency: int = TELEGRAM_CONCURRENCY,
+    ):
+        self.url = f"{base_url.rstrip('/')}/bot{token}"
+        self.limiter = RateLimiter(rate)
+        self.slots = asyncio.Semaphore(concurrency)
+        self.http = httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SECONDS)
+
+    async def __aenter__(self) -> "TelegramClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def send_message(self, chat_id: str, text: str) -> SendResult:
+        error = None
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            await self.limiter.acquire(chat_id)
+            try:
+                async with self.slots:
+                    response = await self.http.post(
+                        f"{self.url}/sendMessage",
+                        json={"chat_id": chat_id, "text": text, "disable_web_page_preview": True},
+                    )
+                data = response.json()
+            except (httpx.HTTPError, ValueError) as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                await asyncio.sleep(min(2**attempt, MAX_BACKOFF_SECONDS))
+                continue
+
+            if data.get("ok"):
+                return SendResult(chat_id, True)
+            error = data.get("description") or f"HTTP {response.status_code}"
+            if response.status_code == 429:
+                retry_after = (data.get("parameters") or {}).get("retry_after", 1)
+                logger.warning("telegram flood limit, pausing %ss", retry_after)
+                self.limiter.pause(float(retry_after))
+                continue
+            if response.status_code in (400, 403):
+                return SendResult(chat_id, False, error, permanent=True)
+            await asyncio.sleep(min(2**attempt, MAX_BACKOFF_SECONDS))
+        return SendResult(chat_id, False, error)
+
+
+def chat_id_for(tg_id: Optional[str]) -> Optional[str]:
+    if tg_id and tg_id.lstrip("-").isdigit():
+        return tg_id
+    return None
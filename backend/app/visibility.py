@@ -0,0 +1,36 @@
+from typing import List, Optional
+
+from sqlalchemy.orm import Query, Session
+
+from .models import CalendarEvent, ClubMember, ClubMemberRole, EventParticipant, EventStatus, User, UserRole
+
+
+def leader_club_ids(db: Session, user_id: int) -> List[int]:
+    club_ids = (
+        db.query(ClubMember.club_id)
+        .filter(
+            ClubMember.user_id == user_id,
+            ClubMember.role == ClubMemberRole.leader,
+        )
+        .all()
+    )
+    return [cid for (cid,) in club_ids]
+
+
+def visible_events_query(db: Session, user: User) -> Optional[Query]:
+    query = db.query(CalendarEvent)
+
+    if user.role == UserRole.admin:
+        return query
+
+    if user.role == UserRole.club_leader:
+        club_ids = leader_club_ids(db, user.id)
+        if not club_ids:
+            return None
+        return query.filter(CalendarEvent.club_id.in_(club_ids))
+
+    return (
+        query.join(EventParticipant)
+        .filter(EventParticipant.user_id == user.id)
+        .filter(CalendarEvent.status == EventStatus.approved)
+    )
@@ -0,0 +1,32 @@
+import argparse
+import logging
+import signal
+import sys
+from typing import List, Optional
+
+from .config import JOB_POLL_SECONDS
+from .jobs import Worker
+from .reminders import start_reminders
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run background jobs from the jobs table.")
+    parser.add_argument("--threads", type=int, default=2, help="jobs processed concurrently")
+    parser.add_argument("--poll", type=float, default=JOB_POLL_SECONDS, help="seconds between polls when idle")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    worker = Worker(threads=args.threads, poll_seconds=args.poll).start()
+    reminders = start_reminders()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: worker.stopping.set())
+    logging.getLogger("roomly.jobs").info("worker %s started with %d threads", worker.name, args.threads)
+    worker.stopping.wait()
+    worker.stop()
+    if reminders is not None:
+        reminders.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
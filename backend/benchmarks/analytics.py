@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmarks/roomly-bench.db")
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app import init_db  # noqa: E402
+from app.analytics import occupancy, room_usage  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.models import CalendarEvent  # noqa: E402
+
+from .dataset import generate, scaled_sizes  # noqa: E402
+from .stats import summarize, write_results  # noqa: E402
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time the room utilization analytics over a semester.")
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat, default=datetime(2026, 9, 1))
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat, default=datetime(2026, 12, 26))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--scale", type=float, default=0.2, help="dataset scale used when the database is empty")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/analytics-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    init_db.main()
+    db = SessionLocal()
+    latencies = []
+    try:
+        if not db.scalar(select(func.count()).select_from(CalendarEvent)):
+            print(f"seeding dataset (scale {args.scale})")
+            generate(db, scaled_sizes(args.scale))
+        started = time.perf_counter()
+        for _ in range(args.runs):
+            began = time.perf_counter()
+            usage = room_usage(db, args.start, args.end)
+            latencies.append(time.perf_counter() - began)
+        stats = summarize(latencies, time.perf_counter() - started)
+    finally:
+        db.close()
+
+    ratios = sorted(occupancy(busy, usage.open_minutes) or 0.0 for busy in usage.busy_minutes)
+    print(f"{len(usage.rooms)} rooms, {args.start:%Y-%m-%d} to {args.end:%Y-%m-%d}")
+    print(f"p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms over {args.runs} runs")
+    if ratios:
+        print(f"occupancy: min {ratios[0]:.1%}, median {ratios[len(ratios) // 2]:.1%}, max {ratios[-1]:.1%}")
+
+    results = {
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": engine.dialect.name,
+        "rooms": len(usage.rooms),
+        "scenarios": {"room_usage": stats},
+    }
+    print(f"\nresults written to {write_results(results, args.output, 'analytics')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .stats import compare, summarize, write_results
+
+BOT_DIR = Path(__file__).resolve().parents[1] / "bot"
+ADMIN_TG_ID = 900000001
+FIRST_USER_TG_ID = 100000000
+
+
+class StubBackend:
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.calls: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.intro_seen: Dict[str, bool] = {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def respond(self, path: str, payload: dict) -> Tuple[int, dict]:
+        with self.lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+            if path == "/api/bot/upsert-user":
+                tg_id = payload.get("tg_id", "")
+                if payload.get("mark_intro"):
+                    self.intro_seen[tg_id] = True
+                seen = self.intro_seen.get(tg_id, False)
+                return 200, {"id": int(tg_id or 0), "tg_id": tg_id, "bot_intro_seen": seen}
+        if path == "/api/bot/create-club":
+            return 200, {"id": 1, "name": payload.get("name")}
+        if path in ("/api/bot/set-email", "/api/bot/assign-role", "/api/bot/assign-club-leader"):
+            return 200, {"ok": True}
+        return 404, {"detail": "not found"}
+
+    def _handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if backend.latency:
+                    time.sleep(backend.latency)
+                status, body = backend.respond(self.path, payload)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubBackend":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _load_bot(backend_url: str):
+    os.environ["API_BASE_URL"] = backend_url
+    os.environ["BOT_ADMIN_TOKEN"] = "benchmark"
+    os.environ["BOT_ADMIN_IDS"] = str(ADMIN_TG_ID)
+    os.environ["API_VERIFY_SSL"] = "true"
+    sys.path.insert(0, str(BOT_DIR))
+    import bot
+
+    return bot
+
+
+def _fake_request_class():
+    from telegram.request import BaseRequest
+
+    class FakeTelegramRequest(BaseRequest):
+        def __init__(self, latency_ms: float):
+            self.latency = latency_ms / 1000
+            self.calls: Dict[str, int] = {}
+            self.message_id = 0
+
+        async def initialize(self) -> None:
+            pass
+
+        async def shutdown(self) -> None:
+            pass
+
+        async def do_request(self, url, method, request_data=None, **kwargs) -> Tuple[int, bytes]:
+            endpoint = url.rsplit("/", 1)[-1]
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            params = request_data.parameters if request_data else {}
+
+            if endpoint == "getMe":
+                result = {"id": 1, "is_bot": True, "first_name": "Roomly", "username": "roomly_bot"}
+            elif endpoint == "sendMessage":
+                self.message_id += 1
+                result = {
+                    "message_id": self.message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": params.get("chat_id"), "type": "private"},
+                    "text": params.get("text", ""),
+                }
+            else:
+                result = True
+            return 200, json.dumps({"ok": True, "result": result}).encode()
+
+    return FakeTelegramRequest
+
+
+def command_update(update_id: int, tg_id: int, text: str) -> dict:
+    command = text.split()[0]
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": tg_id, "type": "private"},
+            "from": {"id": tg_id, "is_bot": False, "first_name": "User", "username": f"user{tg_id}"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+        },
+    }
+
+
+def scenario_commands(name: str, count: int) -> List[Tuple[int, str]]:
+    commands = []
+    for index in range(count):
+        tg_id = FIRST_USER_TG_ID + index
+        if name == "start":
+            commands.append((tg_id, "/start"))
+        elif name == "email":
+            commands.append((tg_id, f"/email user{index}@roomly.edu"))
+        elif name == "onboarding":
+            commands.append((tg_id, "/start") if index % 2 == 0 else (tg_id - 1, f"/email user{index}@roomly.edu"))
+        elif name == "setrole":
+            commands.append((ADMIN_TG_ID, f"/setrole user{index}@roomly.edu club_leader"))
+        elif name == "setroletg":
+            commands.append((ADMIN_TG_ID, f"/setroletg {tg_id} student"))
+        elif name == "setleader":
+            commands.append((ADMIN_TG_ID, f"/setleader Chess Club | user{index}@roomly.edu"))
+        elif name == "createclub":
+            commands.append((ADMIN_TG_ID, f"/createclub Club {index}"))
+    return commands
+
+
+SCENARIOS = ("start", "email", "onboarding", "setrole", "setroletg", "setleader", "createclub")
+
+
+async def run_scenario(bot_module, request, name: str, count: int, concurrency: int) -> dict:
+    from telegram import Update
+    from telegram.ext import ApplicationBuilder
+
+    app = ApplicationBuilder().token("1:benchmark").request(request).get_updates_request(request).build()
+    bot_module.register_handlers(app)
+    await app.initialize()
+
+    updates = [
+        Update.de_json(command_update(index + 1, tg_id, text), app.bot)
+        for index, (tg_id, text) in enumerate(scenario_commands(name, count))
+    ]
+    latencies: List[float] = []
+    queue = iter(updates)
+
+    async def worker():
+        for update in queue:
+            started = time.perf_counter()
+            await app.process_update(update)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await app.shutdown()
+    return summarize(latencies, elapsed)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure bot handler throughput with simulated Telegram updates.")
+    parser.add_argument("--updates", type=int, default=200, help="updates per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="updates processed at once")
+    parser.add_argument("--backend-latency-ms", type=float, default=20.0)
+    parser.add_argument("--telegram-latency-ms", type=float, default=50.0)
+    parser.add_argument("--only", action="append", choices=SCENARIOS)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/bot-<timestamp>.json)")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 regression before failing")
+    args = parser.parse_args(argv)
+
+    backend = StubBackend(args.backend_latency_ms).start()
+    try:
+        bot_module = _load_bot(backend.url)
+        request_class = _fake_request_class()
+        results = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()),
+            "updates": args.updates,
+            "concurrency": args.concurrency,
+            "backend_latency_ms": args.backend_latency_ms,
+            "telegram_latency_ms": args.telegram_latency_ms,
+            "scenarios": {},
+        }
+
+        print(f"{'scenario':<14}{'updates/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'api calls':>11}{'sent':>7}")
+        for name in args.only or SCENARIOS:
+            before = sum(backend.calls.values())
+            request = request_class(args.telegram_latency_ms)
+            stats = asyncio.run(run_scenario(bot_module, request, name, args.updates, args.concurrency))
+            stats["backend_calls"] = sum(backend.calls.values()) - before
+            stats["messages_sent"] = request.calls.get("sendMessage", 0)
+            results["scenarios"][name] = stats
+            print(
+                f"{name:<14}{stats['throughput_rps']:>11}{stats['p50_ms']:>9}{stats['p95_ms']:>9}"
+                f"{stats['p99_ms']:>9}{stats['backend_calls']:>11}{stats['messages_sent']:>7}"
+            )
+    finally:
+        backend.stop()
+
+    print(f"\nresults written to {write_results(results, args.output, 'bot')}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"p95 regressed more than {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
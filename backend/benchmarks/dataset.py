@@ -0,0 +1,278 @@
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmarks/roomly-bench.db")
+
+from sqlalchemy import func, insert, select, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import init_db  # noqa: E402
+from app.config import APP_TZ  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.models import (  # noqa: E402
+    Base,
+    CalendarEvent,
+    Club,
+    ClubMember,
+    ClubMemberRole,
+    EventParticipant,
+    EventStatus,
+    EventType,
+    Room,
+    User,
+    UserRole,
+    normalize_key,
+)
+
+SEMESTER_START = datetime(2026, 9, 1)
+SEMESTER_UNTIL = "20261225T235959"
+LESSON_SLOTS = [(8, 0), (9, 40), (11, 20), (13, 30), (15, 10), (16, 50), (18, 30)]
+WEEKDAY_PAIRS = ["MO,WE", "TU,TH", "WE,FR", "MO,TH", "TU,FR", "MO", "TU", "WE", "TH", "FR"]
+BUILDINGS = ["A", "B", "C", "D", "E", "F", "G", "H"]
+ROOM_TYPES = ["lecture", "seminar", "lab", "studio"]
+SUBJECTS = [
+    "Calculus",
+    "Linear Algebra",
+    "Physics",
+    "Chemistry",
+    "Programming",
+    "Databases",
+    "Economics",
+    "History",
+    "Philosophy",
+    "Statistics",
+    "Networks",
+    "Biology",
+]
+CHUNK_SIZE = 5000
+
+DEFAULT_SIZES = {
+    "admins": 5,
+    "students": 20000,
+    "rooms": 500,
+    "clubs": 300,
+    "series": 3000,
+    "participants_per_series": 60,
+    "club_events": 4,
+}
+
+
+def _chunks(rows: List[dict], size: int = CHUNK_SIZE) -> Iterable[List[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _bulk_insert(db: Session, model, rows: List[dict]) -> None:
+    for chunk in _chunks(rows):
+        db.execute(insert(model), chunk)
+
+
+def sync_sequences(db: Session) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+    for table in ("users", "clubs", "rooms", "calendar_events"):
+        db.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))")
+        )
+
+
+def bench_email(kind: str, index: int) -> str:
+    return f"{kind}{index}@bench.roomly.edu"
+
+
+def bench_tg_id(kind: str, index: int) -> str:
+    return f"bench-{kind}-{index}"
+
+
+def generate(db: Session, sizes: Dict[str, int], seed: int = 42) -> Dict[str, int]:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    users = []
+    for index in range(sizes["admins"]):
+        users.append(("admin", index, UserRole.admin))
+    for index in range(sizes["clubs"]):
+        users.append(("leader", index, UserRole.club_leader))
+    for index in range(sizes["students"]):
+        users.append(("student", index, UserRole.student))
+    user_rows = [
+        {
+            "id": user_id,
+            "tg_id": bench_tg_id(kind, index),
+            "email": bench_email(kind, index),
+            "email_key": normalize_key(bench_email(kind, index)),
+            "username": f"{kind}_{index}",
+            "full_name": f"{kind.title()} {index}",
+            "role": role,
+            "bot_intro_seen": True,
+            "created_at": now,
+        }
+        for user_id, (kind, index, role) in enumerate(users, start=1)
+    ]
+    _bulk_insert(db, User, user_rows)
+    admin_ids = [row["id"] for row in user_rows if row["role"] == UserRole.admin]
+    leader_ids = [row["id"] for row in user_rows if row["role"] == UserRole.club_leader]
+    student_ids = [row["id"] for row in user_rows if row["role"] == UserRole.student]
+
+    room_codes = [f"{BUILDINGS[index % len(BUILDINGS)]}{100 + index // len(BUILDINGS)}" for index in range(sizes["rooms"])]
+    room_rows = [
+        {
+            "id": index + 1,
+            "code": room_codes[index],
+            "code_key": normalize_key(room_codes[index]),
+            "building": BUILDINGS[index % len(BUILDINGS)],
+            "floor": str(1 + (index // len(BUILDINGS)) % 5),
+            "room_type": ROOM_TYPES[index % len(ROOM_TYPES)],
+            "capacity": rng.choice([20, 30, 40, 60, 120, 200]),
+            "is_active": index % 25 != 0,
+        }
+        for index in range(sizes["rooms"])
+    ]
+    _bulk_insert(db, Room, room_rows)
+    room_ids = [row["id"] for row in room_rows]
+
+    club_rows = [
+        {
+            "id": index + 1,
+            "name": f"Club {index}",
+            "name_key": normalize_key(f"Club {index}"),
+            "owner_user_id": leader_ids[index],
+            "created_at": now,
+        }
+        for index in range(sizes["clubs"])
+    ]
+    _bulk_insert(db, Club, club_rows)
+
+    member_rows = [
+        {"club_id": club["id"], "user_id": club["owner_user_id"], "role": ClubMemberRole.leader}
+        for club in club_rows
+    ]
+    for student_id in student_ids:
+        for club_index in rng.sample(range(len(club_rows)), k=min(rng.choice([0, 1, 1, 2, 3]), len(club_rows))):
+            member_rows.append({"club_id": club_index + 1, "user_id": student_id, "role": ClubMemberRole.member})
+    _bulk_insert(db, ClubMember, member_rows)
+
+    event_rows = []
+    for index in range(sizes["series"]):
+        hour, minute = rng.choice(LESSON_SLOTS)
+        days = rng.choice(WEEKDAY_PAIRS)
+        first_day = SEMESTER_START + timedelta(days=rng.randrange(7))
+        starts_at = first_day.replace(hour=hour, minute=minute)
+        event_rows.append(
+            {
+                "id": index + 1,
+                "title": f"{SUBJECTS[index % len(SUBJECTS)]} {index // len(SUBJECTS) + 1}",
+                "description": f"Weekly {SUBJECTS[index % len(SUBJECTS)].lower()} lecture and practice session",
+                "event_type": EventType.lesson,
+                "status": EventStatus.approved,
+                "room_id": rng.choice(room_ids),
+                "club_id": None,
+                "starts_at": starts_at,
+                "ends_at": starts_at + timedelta(minutes=80),
+                "rrule": f"FREQ=WEEKLY;BYDAY={days};UNTIL={SEMESTER_UNTIL}",
+                "duration_minutes": 80,
+                "timezone": APP_TZ,
+                "created_by": admin_ids[0],
+                "created_at": now,
+            }
+        )
+
+    statuses = [EventStatus.approved, EventStatus.approved, EventStatus.pending, EventStatus.rejected]
+    for club in club_rows:
+        for _ in range(sizes["club_events"]):
+            starts_at = SEMESTER_START + timedelta(days=rng.randrange(110), hours=rng.randrange(12, 20))
+            event_rows.append(
+                {
+                    "id": len(event_rows) + 1,
+                    "title": f"{club['name']} meetup",
+                    "description": "Open meeting for members and guests",
+                    "event_type": EventType.event,
+                    "status": rng.choice(statuses),
+                    "room_id": rng.choice(room_ids),
+                    "club_id": club["id"],
+                    "starts_at": starts_at,
+                    "ends_at": starts_at + timedelta(hours=2),
+                    "rrule": None,
+                    "duration_minutes": None,
+                    "timezone": APP_TZ,
+                    "created_by": club["owner_user_id"],
+                    "created_at": now,
+                }
+            )
+    _bulk_insert(db, CalendarEvent, event_rows)
+
+    participant_rows = []
+    per_series = min(sizes["participants_per_series"], len(student_ids))
+    for event in event_rows[: sizes["series"]]:
+        for student_id in rng.sample(student_ids, k=per_series):
+            participant_rows.append({"event_id": event["id"], "user_id": student_id})
+    _bulk_insert(db, EventParticipant, participant_rows)
+
+    sync_sequences(db)
+    db.commit()
+    return {
+        "users": len(user_rows),
+        "students": len(student_ids),
+        "club_leaders": len(leader_ids),
+        "admins": len(admin_ids),
+        "rooms": len(room_rows),
+        "clubs": len(club_rows),
+        "club_members": len(member_rows),
+        "events": len(event_rows),
+        "lesson_series": sizes["series"],
+        "participants": len(participant_rows),
+    }
+
+
+def dataset_counts(db: Session) -> Dict[str, int]:
+    return {
+        "users": db.scalar(select(func.count()).select_from(User)),
+        "rooms": db.scalar(select(func.count()).select_from(Room)),
+        "clubs": db.scalar(select(func.count()).select_from(Club)),
+        "club_members": db.scalar(select(func.count()).select_from(ClubMember)),
+        "events": db.scalar(select(func.count()).select_from(CalendarEvent)),
+        "participants": db.scalar(select(func.count()).select_from(EventParticipant)),
+    }
+
+
+def scaled_sizes(scale: float) -> Dict[str, int]:
+    sizes = {}
+    for key, value in DEFAULT_SIZES.items():
+        if key in ("admins", "participants_per_series", "club_events"):
+            sizes[key] = value
+        else:
+            sizes[key] = max(1, int(value * scale))
+    return sizes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic university dataset for benchmarks.")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for students, rooms, clubs and series")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args(argv)
+
+    if args.reset:
+        Base.metadata.drop_all(engine)
+    init_db.main()
+
+    db = SessionLocal()
+    try:
+        if db.scalar(select(func.count()).select_from(User)):
+            print(f"{engine.url.render_as_string()} already has users; pass --reset to rebuild it", file=sys.stderr)
+            return 1
+        counts = generate(db, scaled_sizes(args.scale), args.seed)
+    finally:
+        db.close()
+
+    for key, value in counts.items():
+        print(f"{key:<16}{value:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+
+class FakeTelegram:
+    def __init__(self, flood_every: int = 0, retry_after: int = 1, blocked: Tuple[str, ...] = ()):
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.blocked = set(blocked)
+        self.messages: List[Tuple[float, str, str]] = []
+        self.requests = 0
+        self.floods = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def respond(self, method: str, payload: dict) -> Tuple[int, dict]:
+        if method != "sendMessage":
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        chat_id = str(payload.get("chat_id"))
+        with self.lock:
+            self.requests += 1
+            if self.flood_every and self.requests % self.flood_every == 0:
+                self.floods += 1
+                return 429, {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                }
+            if chat_id in self.blocked:
+                return 403, {"ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user"}
+            self.messages.append((time.monotonic(), chat_id, payload.get("text", "")))
+            message_id = len(self.messages)
+        return 200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": chat_id}}}
+
+    def peak_rate(self, window: float = 1.0) -> int:
+        stamps = sorted(stamp for stamp, _, _ in self.messages)
+        peak = 0
+        low = 0
+        for high, stamp in enumerate(stamps):
+            while stamp - stamps[low] >= window:
+                low += 1
+            peak = max(peak, high - low + 1)
+        return peak
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                status, body = fake.respond(self.path.rsplit("/", 1)[-1], payload)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeTelegram":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
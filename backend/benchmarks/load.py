@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmarks/roomly-bench.db")
+os.environ.setdefault("BOT_TOKEN", "benchmark-bot-token")
+
+from sqlalchemy import select  # noqa: E402
+
+from app.config import BOT_TOKEN  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Club, Room, User, UserRole  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+
+from .asgi import call  # noqa: E402
+from .dataset import dataset_counts  # noqa: E402
+from .stats import compare, summarize, write_results  # noqa: E402
+
+SAMPLE_USERS = 200
+RANGE_START = datetime(2026, 9, 28)
+RANGE_DAYS = 42
+SEARCH_QUERIES = ("s", "stu", "student1", "student42", "leader", "club 1", "a1", "bench.roomly", "zzz")
+EVENT_SEARCH_QUERIES = ("linear", "calc 1", "lecture practice", "club 12 meetup", "networks", "guests", "zzz")
+
+Request = Tuple[str, str, str, Dict[str, str], bytes]
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[random.Random], Request]
+    expected: Sequence[int] = (200,)
+
+
+@dataclass
+class Fixtures:
+    admins: List[Tuple[int, str]]
+    leaders: List[Tuple[int, int]]
+    students: List[Tuple[int, str]]
+    rooms: List[int]
+
+
+def _auth(user_id: int, role: UserRole) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(user_id, role.value)}"}
+
+
+def _init_data(tg_id: str) -> str:
+    data = {
+        "auth_date": str(int(time.time())),
+        "query_id": "benchmark",
+        "user": json.dumps({"id": tg_id, "first_name": "Bench", "username": f"u{tg_id}"}),
+    }
+    check = "\n".join(f"{key}={value}" for key, value in sorted(data.items()))
+    secret = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest()
+    data["hash"] = hmac.new(secret, check.encode(), hashlib.sha256).hexdigest()
+    return urlencode(data)
+
+
+def load_fixtures(rng: random.Random) -> Fixtures:
+    db = SessionLocal()
+    try:
+        def sample(rows):
+            rows = list(rows)
+            return rng.sample(rows, k=min(SAMPLE_USERS, len(rows)))
+
+        admins = sample(db.execute(select(User.id, User.tg_id).where(User.role == UserRole.admin)))
+        students = sample(db.execute(select(User.id, User.tg_id).where(User.role == UserRole.student)))
+        leaders = sample(
+            db.execute(
+                select(User.id, Club.id).join(Club, Club.owner_user_id == User.id).where(
+                    User.role == UserRole.club_leader
+                )
+            )
+        )
+        rooms = list(db.scalars(select(Room.id).where(Room.is_active.is_(True))))
+    finally:
+        db.close()
+
+    if not (admins and leaders and students and rooms):
+        raise SystemExit("dataset is empty; run python -m benchmarks.dataset first")
+    return Fixtures(admins=admins, leaders=leaders, students=students, rooms=rooms)
+
+
+def build_scenarios(fixtures: Fixtures) -> List[Scenario]:
+    range_query = urlencode(
+        {
+            "start": RANGE_START.isoformat(),
+            "end": (RANGE_START + timedelta(days=RANGE_DAYS)).isoformat(),
+        }
+    )
+
+    def admin_headers(rng):
+        return _auth(rng.choice(fixtures.admins)[0], UserRole.admin)
+
+    def get(path, headers_for, query=""):
+        return lambda rng: ("GET", path, query, headers_for(rng), b"")
+
+    def list_events_for(user_ids, role):
+        return get("/api/calendar/events", lambda rng: _auth(rng.choice(user_ids), role), range_query)
+
+    def create_event(rng):
+        leader_id, club_id = rng.choice(fixtures.leaders)
+        starts_at = RANGE_START + timedelta(days=rng.randrange(RANGE_DAYS), hours=rng.randrange(12, 20))
+        payload = {
+            "title": "Benchmark meetup",
+            "event_type": "event",
+            "starts_at": starts_at.isoformat(),
+            "ends_at": (starts_at + timedelta(hours=2)).isoformat(),
+            "room_id": rng.choice(fixtures.rooms),
+            "club_id": club_id,
+        }
+        headers = {**_auth(leader_id, UserRole.club_leader), "Content-Type": "application/json"}
+        return "POST", "/api/calendar/events", "", headers, json.dumps(payload).encode()
+
+    def auth_telegram(rng):
+        body = json.dumps({"init_data": _init_data(rng.choice(fixtures.students)[1])}).encode()
+        return "POST", "/api/auth/telegram", "", {"Content-Type": "application/json"}, body
+
+    def search(rng):
+        query = urlencode({"q": rng.choice(SEARCH_QUERIES)})
+        return "GET", "/api/search", query, admin_headers(rng), b""
+
+    def event_search_for(user_ids, role):
+        def build(rng):
+            query = urlencode({"q": rng.choice(EVENT_SEARCH_QUERIES)})
+            return "GET", "/api/calendar/search", query, _auth(rng.choice(user_ids), role), b""
+
+        return build
+
+    return [
+        Scenario("list_events[admin]", list_events_for([user_id for user_id, _ in fixtures.admins], UserRole.admin)),
+        Scenario(
+            "list_events[club_leader]",
+            list_events_for([user_id for user_id, _ in fixtures.leaders], UserRole.club_leader),
+        ),
+        Scenario(
+            "list_events[student]",
+            list_events_for([user_id for user_id, _ in fixtures.students], UserRole.student),
+        ),
+        Scenario("create_event", create_event),
+        Scenario("auth_telegram", auth_telegram),
+        Scenario(
+            "list_available_rooms",
+            get("/api/rooms/available", lambda rng: _auth(rng.choice(fixtures.students)[0], UserRole.student)),
+        ),
+        Scenario("admin_users", get("/api/admin/users", admin_headers)),
+        Scenario("admin_clubs", get("/api/admin/clubs", admin_headers)),
+        Scenario("admin_events", get("/api/admin/events", admin_headers)),
+        Scenario("admin_rooms", get("/api/admin/rooms", admin_headers)),
+        Scenario("search", search),
+        Scenario(
+            "calendar_search[admin]",
+            event_search_for([user_id for user_id, _ in fixtures.admins], UserRole.admin),
+        ),
+        Scenario(
+            "calendar_search[student]",
+            event_search_for([user_id for user_id, _ in fixtures.students], UserRole.student),
+        ),
+    ]
+
+
+async def run_scenario(scenario: Scenario, requests: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    prepared = [scenario.build(rng) for _ in range(requests)]
+    for method, path, query, headers, body in prepared[: min(3, requests)]:
+        await call(app, method, path, query, headers, body)
+
+    latencies: List[float] = []
+    errors: Dict[int, int] = {}
+    response_bytes = 0
+    queue = iter(prepared)
+
+    async def worker():
+        nonlocal response_bytes
+        for method, path, query, headers, body in queue:
+            started = time.perf_counter()
+            status, content = await call(app, method, path, query, headers, body)
+            latencies.append(time.perf_counter() - started)
+            response_bytes += len(content)
+            if status not in scenario.expected:
+                errors[status] = errors.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(latencies, elapsed)
+    stats["errors"] = errors
+    stats["avg_bytes"] = response_bytes // max(len(latencies), 1)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Drive the FastAPI app in-process against the benchmark dataset.")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", action="append", help="run only scenarios whose name starts with this")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 regression before failing")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    scenarios = build_scenarios(load_fixtures(rng))
+    if args.only:
+        scenarios = [scenario for scenario in scenarios if any(scenario.name.startswith(p) for p in args.only)]
+
+    db = SessionLocal()
+    try:
+        counts = dataset_counts(db)
+    finally:
+        db.close()
+
+    results = {
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": engine.dialect.name,
+        "dataset": counts,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scenarios": {},
+    }
+
+    print(f"{'scenario':<28}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'rps':>9}{'errors':>8}")
+    for index, scenario in enumerate(scenarios):
+        stats = asyncio.run(run_scenario(scenario, args.requests, args.concurrency, args.seed + index))
+        results["scenarios"][scenario.name] = stats
+        print(
+            f"{scenario.name:<28}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+            f"{stats['throughput_rps']:>9}{sum(stats['errors'].values()):>8}"
+        )
+
+    print(f"\nresults written to {write_results(results, args.output, 'load')}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"p95 regressed more than {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
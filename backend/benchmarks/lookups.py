@@ -0,0 +1,140 @@
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmarks/roomly-bench.db")
+
+from sqlalchemy import func, insert, select, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import init_db  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.models import Club, Room, User, UserRole, normalize_key  # noqa: E402
+
+from .dataset import bench_email, bench_tg_id, generate, scaled_sizes, sync_sequences  # noqa: E402
+from .stats import summarize, write_results  # noqa: E402
+
+TOP_UP_BATCH = 5000
+
+Lookup = Tuple[str, Callable[[str], object], Callable[[str], object]]
+
+
+def top_up_users(db: Session, target: int, scale: float) -> int:
+    count = db.scalar(select(func.count()).select_from(User))
+    if not count:
+        print(f"seeding dataset (scale {scale})")
+        generate(db, scaled_sizes(scale))
+        count = db.scalar(select(func.count()).select_from(User))
+    if count >= target:
+        return count
+    start = (db.scalar(select(func.max(User.id))) or 0) + 1
+    now = datetime.utcnow()
+    missing = target - count
+    print(f"adding {missing} users to reach {target}")
+    for offset in range(0, missing, TOP_UP_BATCH):
+        rows = []
+        for index in range(start + offset, start + min(offset + TOP_UP_BATCH, missing)):
+            email = bench_email("extra", index)
+            rows.append(
+                {
+                    "id": index,
+                    "tg_id": bench_tg_id("extra", index),
+                    "email": email,
+                    "email_key": normalize_key(email),
+                    "username": f"extra_{index}",
+                    "role": UserRole.student,
+                    "bot_intro_seen": True,
+                    "created_at": now,
+                }
+            )
+        db.execute(insert(User), rows)
+    sync_sequences(db)
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return target
+
+
+LOOKUPS: List[Lookup] = [
+    (
+        "user_by_email",
+        lambda value: select(User.id).where(User.email.ilike(value)),
+        lambda value: select(User.id).where(User.email_key == normalize_key(value)),
+    ),
+    (
+        "club_by_name",
+        lambda value: select(Club.id).where(Club.name.ilike(value)),
+        lambda value: select(Club.id).where(Club.name_key == normalize_key(value)),
+    ),
+    (
+        "room_by_code",
+        lambda value: select(Room.id).where(Room.code.ilike(value)),
+        lambda value: select(Room.id).where(Room.code_key == normalize_key(value)),
+    ),
+]
+
+
+def _values(db: Session, name: str, rng: random.Random, count: int) -> List[str]:
+    column = {"user_by_email": User.email, "club_by_name": Club.name, "room_by_code": Room.code}[name]
+    values = [value for value in db.scalars(select(column).where(column.is_not(None))) if value]
+    if not values:
+        return []
+    picked = rng.choices(values, k=count)
+    return [value.upper() if index % 2 else f" {value} " for index, value in enumerate(picked)]
+
+
+def _time(db: Session, build: Callable[[str], object], values: List[str]) -> Tuple[dict, int]:
+    latencies = []
+    found = 0
+    started = time.perf_counter()
+    for value in values:
+        began = time.perf_counter()
+        found += db.execute(build(value)).first() is not None
+        latencies.append(time.perf_counter() - began)
+    return summarize(latencies, time.perf_counter() - started), found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare ILIKE lookups with normalized key lookups.")
+    parser.add_argument("--users", type=int, default=100_000, help="top up the users table to this many rows")
+    parser.add_argument("--scale", type=float, default=0.2, help="dataset scale used when the database is empty")
+    parser.add_argument("--lookups", type=int, default=500, help="lookups per query shape")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/lookups-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    init_db.main()
+    rng = random.Random(args.seed)
+    results = {
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": engine.dialect.name,
+        "lookups": args.lookups,
+        "scenarios": {},
+    }
+
+    db = SessionLocal()
+    try:
+        results["users"] = top_up_users(db, args.users, args.scale)
+        print(f"{'lookup':<28}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}{'found':>8}")
+        for name, by_ilike, by_key in LOOKUPS:
+            values = _values(db, name, rng, args.lookups)
+            if not values:
+                continue
+            for variant, build in (("ilike", by_ilike), ("key", by_key)):
+                stats, found = _time(db, build, [value.strip() if variant == "ilike" else value for value in values])
+                stats["found"] = found
+                label = f"{name}[{variant}]"
+                results["scenarios"][label] = stats
+                print(f"{label:<28}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['mean_ms']:>9}{found:>8}")
+    finally:
+        db.close()
+
+    print(f"\nresults written to {write_results(results, args.output, 'lookups')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
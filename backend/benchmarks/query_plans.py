@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Sequence, Tuple
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmarks/roomly-bench.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import Table, func, inspect, select, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import cascade, init_db, jobs  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.instrumentation import capture_queries  # noqa: E402
+from app.models import Base, CalendarEvent, Club, ClubMember, ClubMemberRole, Room, User, UserRole  # noqa: E402
+from app.security import create_access_token, create_feed_token  # noqa: E402
+
+from .dataset import generate, scaled_sizes  # noqa: E402
+
+RANGE_START = datetime(2026, 9, 28)
+RANGE_END = RANGE_START + timedelta(days=42)
+RANGE = {"start": RANGE_START.isoformat(), "end": RANGE_END.isoformat()}
+
+
+@dataclass
+class Sample:
+    admin: User
+    student: User
+    leader: User
+    club_id: int
+    club_name: str
+    room_id: int
+    room_code: str
+
+
+@dataclass
+class Harness:
+    db: Session
+    client: TestClient
+
+    def get(self, path: str, user: Optional[User] = None, **params) -> None:
+        headers = {"Authorization": f"Bearer {create_access_token(user.id, user.role.value)}"} if user else {}
+        response = self.client.get(f"/api{path}", headers=headers, params=params)
+        if response.status_code >= 400:
+            raise RuntimeError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+
+    def post(self, path: str, user: User, payload: dict) -> None:
+        headers = {"Authorization": f"Bearer {create_access_token(user.id, user.role.value)}"}
+        response = self.client.post(f"/api{path}", headers=headers, json=payload)
+        if response.status_code >= 400:
+            raise RuntimeError(f"POST {path} returned {response.status_code}: {response.text[:200]}")
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    tables: Sequence[str]
+    run: Callable[[Harness, Sample], object]
+
+
+@dataclass
+class PlanResult:
+    name: str
+    plan: List[str]
+    scans: List[str]
+
+
+CHECKS: List[PlanCheck] = [
+    PlanCheck(
+        "calendar.list_events[student]",
+        ["calendar_events", "event_participants"],
+        lambda h, s: h.get("/calendar/events", s.student, **RANGE),
+    ),
+    PlanCheck(
+        "calendar.list_events[club_leader]",
+        ["calendar_events", "club_members"],
+        lambda h, s: h.get("/calendar/events", s.leader, **RANGE),
+    ),
+    PlanCheck(
+        "clubs.memberships",
+        ["clubs", "club_members"],
+        lambda h, s: h.get("/clubs/memberships", s.student),
+    ),
+    PlanCheck(
+        "clubs.members",
+        ["clubs", "club_members"],
+        lambda h, s: h.get("/clubs/members", s.leader, club_name=s.club_name),
+    ),
+    PlanCheck(
+        "admin.pending_events",
+        ["calendar_events", "clubs", "rooms", "users"],
+        lambda h, s: h.get("/admin/events/pending", s.admin),
+    ),
+    PlanCheck(
+        "feeds.room",
+        ["calendar_events", "rooms"],
+        lambda h, s: h.get(f"/ics/room/{create_feed_token('room', s.room_id)}.ics"),
+    ),
+    PlanCheck(
+        "lookup.room_by_code",
+        ["rooms"],
+        lambda h, s: h.get(f"/ics/links/rooms/{s.room_code.lower()}", s.student),
+    ),
+    PlanCheck(
+        "lookup.user_by_email",
+        ["users"],
+        lambda h, s: h.post("/admin/users/role", s.admin, {"email": s.student.email.upper(), "role": "student"}),
+    ),
+    PlanCheck(
+        "cascade.is_large[user]",
+        ["calendar_events"],
+        lambda h, s: cascade.is_large(h.db, User, [s.leader.id]),
+    ),
+    PlanCheck(
+        "cascade.is_large[club]",
+        ["calendar_events"],
+        lambda h, s: cascade.is_large(h.db, Club, [s.club_id]),
+    ),
+    PlanCheck(
+        "jobs.claim",
+        ["jobs"],
+        lambda h, s: h.db.execute(jobs.next_job(RANGE_START)).all(),
+    ),
+]
+
+
+def _explainable(statement: str) -> bool:
+    return statement.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+def _sqlite_scans(db: Session, statement: str, parameters, tables: Sequence[str]) -> Tuple[List[str], List[str]]:
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+    plan = [row[-1] for row in rows]
+    scans = [line for line in plan if any(line.startswith(f"SCAN {table}") for table in tables)]
+    return plan, scans
+
+
+def _postgres_scans(db: Session, statement: str, parameters, tables: Sequence[str]) -> Tuple[List[str], List[str]]:
+    raw = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters or ()).scalar()
+    root = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    plan, scans = [], []
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        relation = node.get("Relation Name")
+        line = "  " * depth + node["Node Type"] + (f" on {relation}" if relation else "")
+        plan.append(line)
+        if node["Node Type"] == "Seq Scan" and relation in tables:
+            scans.append(line.strip())
+        stack.extend((child, depth + 1) for child in reversed(node.get("Plans", [])))
+    return plan, scans
+
+
+def _ensure_dataset(db: Session, scale: float) -> None:
+    if not db.scalar(select(func.count()).select_from(User)):
+        print(f"seeding dataset (scale {scale})")
+        generate(db, scaled_sizes(scale))
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+
+def _sample(db: Session) -> Sample:
+    admin = db.scalars(select(User).where(User.role == UserRole.admin).order_by(User.id).limit(1)).first()
+    student = db.scalars(select(User).where(User.role == UserRole.student).order_by(User.id).limit(1)).first()
+    leader, club_id, club_name = db.execute(
+        select(User, Club.id, Club.name)
+        .join(ClubMember, ClubMember.user_id == User.id)
+        .join(Club, Club.id == ClubMember.club_id)
+        .where(User.role == UserRole.club_leader, ClubMember.role == ClubMemberRole.leader)
+        .limit(1)
+    ).first()
+    room_id, room_code = db.execute(
+        select(Room.id, Room.code).join(CalendarEvent, CalendarEvent.room_id == Room.id).limit(1)
+    ).first()
+    return Sample(admin, student, leader, club_id, club_name, room_id, room_code)
+
+
+def _index_prefixes(db: Session, table: Table) -> List[Tuple[str, ...]]:
+    inspector = inspect(db.connection())
+    prefixes = [tuple(column.name for column in table.primary_key.columns)]
+    prefixes.extend(tuple(index["column_names"]) for index in inspector.get_indexes(table.name))
+    prefixes.extend(tuple(unique["column_names"]) for unique in inspector.get_unique_constraints(table.name))
+    return prefixes
+
+
+def _foreign_key_results(db: Session) -> List[PlanResult]:
+    results = []
+    for table in Base.metadata.sorted_tables:
+        prefixes = _index_prefixes(db, table)
+        for constraint in table.foreign_key_constraints:
+            if not constraint.ondelete:
+                continue
+            columns = tuple(column.name for column in constraint.columns)
+            covered = any(prefix[: len(columns)] == columns for prefix in prefixes)
+            line = f"{constraint.ondelete} from {constraint.referred_table.name}"
+            results.append(
+                PlanResult(f"foreign_keys.{table.name}({', '.join(columns)})", [line], [] if covered else [line])
+            )
+    return results
+
+
+def run_checks(db: Session) -> List[PlanResult]:
+    from app.main import app
+
+    explain = _postgres_scans if engine.dialect.name == "postgresql" else _sqlite_scans
+    harness = Harness(db, TestClient(app))
+    sample = _sample(db)
+    db.expunge_all()
+    results = []
+    for check in CHECKS:
+        with capture_queries() as queries:
+            check.run(harness, sample)
+        db.rollback()
+        plan, scans = [], []
+        for statement, parameters in zip(queries.statements, queries.parameters):
+            if not _explainable(statement):
+                continue
+            lines, found = explain(db, statement, parameters, check.tables)
+            plan.append(" ".join(statement.split())[:160])
+            plan.extend(f"  {line}" for line in lines)
+            scans.extend(found)
+        if not plan:
+            raise RuntimeError(f"{check.name} issued no queries")
+        results.append(PlanResult(check.name, plan, scans))
+    db.rollback()
+    return results + _foreign_key_results(db)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fail when hot queries fall back to sequential scans.")
+    parser.add_argument("--scale", type=float, default=0.2, help="dataset scale used when the database is empty")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args(argv)
+
+    init_db.main()
+    db = SessionLocal()
+    try:
+        _ensure_dataset(db, args.scale)
+        results = run_checks(db)
+    finally:
+        db.close()
+
+    for result in results:
+        print(f"{'FAIL' if result.scans else 'ok':<6}{result.name}")
+        if result.scans or args.verbose:
+            for line in result.plan:
+                print(f"        {line}")
+    failures = sum(1 for result in results if result.scans)
+    if failures:
+        print(f"{failures} check{'' if failures == 1 else 's'} fell back to sequential scans", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
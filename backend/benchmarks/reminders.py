@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmarks/roomly-bench.db")
+
+from dateutil.rrule import rrulestr  # noqa: E402
+from sqlalchemy import exists, func, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import init_db  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.models import CalendarEvent, EventParticipant, EventStatus  # noqa: E402
+from app.recurrence import local_now  # noqa: E402
+from app.reminders import Occurrence, ReminderQueue  # noqa: E402
+from app.telegram import TelegramClient  # noqa: E402
+
+from .dataset import generate, scaled_sizes  # noqa: E402
+from .fake_telegram import FakeTelegram  # noqa: E402
+from .stats import summarize, write_results  # noqa: E402
+
+
+def naive_due(db: Session, previous: datetime, now: datetime, lead: timedelta) -> List[Occurrence]:
+    has_participants = exists().where(EventParticipant.event_id == CalendarEvent.id)
+    events = db.scalars(
+        select(CalendarEvent).where(CalendarEvent.status == EventStatus.approved, has_participants)
+    )
+    found = []
+    for event in events:
+        if event.rrule:
+            starts = rrulestr(event.rrule, dtstart=event.starts_at).between(previous + lead, now + lead, inc=True)
+        else:
+            starts = [event.starts_at]
+        found.extend(
+            (event.id, start) for start in starts if previous < start - lead <= now and start > now
+        )
+    return found
+
+
+def simulate(db: Session, start: datetime, ticks: int, step: timedelta, lead: timedelta) -> dict:
+    queue = ReminderQueue(lead)
+    queue_latencies: List[float] = []
+    naive_latencies: List[float] = []
+    queued: Set[Occurrence] = set()
+    expanded: Set[Occurrence] = set()
+    now = start
+    for _ in range(ticks):
+        previous, now = now, now + step
+        began = time.perf_counter()
+        queue.refill(db, now)
+        queued.update(queue.due(now))
+        queue_latencies.append(time.perf_counter() - began)
+
+        began = time.perf_counter()
+        expanded.update(naive_due(db, previous, now, lead))
+        naive_latencies.append(time.perf_counter() - began)
+    elapsed = step.total_seconds() * ticks
+    return {
+        "queue": {**summarize(queue_latencies, sum(queue_latencies)), "occurrences": len(queued)},
+        "full_expansion": {**summarize(naive_latencies, sum(naive_latencies)), "occurrences": len(expanded)},
+        "missing_from_queue": len(expanded - queued),
+        "simulated_seconds": elapsed,
+    }
+
+
+async def deliver(url: str, chats: int, rate: float) -> dict:
+    started = time.perf_counter()
+    async with TelegramClient(token="123:bench", base_url=url, rate=rate) as client:
+        results = await asyncio.gather(
+            *(client.send_message(str(100_000 + index), "Starting soon:\n• bench") for index in range(chats))
+        )
+    return {
+        "sent": sum(result.ok for result in results),
+        "failed": sum(not result.ok for result in results),
+        "elapsed_s": round(time.perf_counter() - started, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the reminder queue with expanding every series per tick.")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="simulated start time (default: now)")
+    parser.add_argument("--hours", type=float, default=6, help="simulated time span")
+    parser.add_argument("--tick", type=float, default=30, help="simulated seconds between ticks")
+    parser.add_argument("--lead", type=int, default=15, help="reminder lead time in minutes")
+    parser.add_argument("--scale", type=float, default=0.2, help="dataset scale used when the database is empty")
+    parser.add_argument("--chats", type=int, default=200, help="messages pushed through the fake Telegram API")
+    parser.add_argument("--rate", type=float, default=25, help="global sendMessage rate limit per second")
+    parser.add_argument("--flood-every", type=int, default=50, help="answer every Nth request with 429")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/reminders-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    init_db.main()
+    db = SessionLocal()
+    try:
+        if not db.scalar(select(func.count()).select_from(CalendarEvent)):
+            print(f"seeding dataset (scale {args.scale})")
+            generate(db, scaled_sizes(args.scale))
+        ticks = int(args.hours * 3600 / args.tick)
+        start = args.start or local_now()
+        scheduling = simulate(db, start, ticks, timedelta(seconds=args.tick), timedelta(minutes=args.lead))
+    finally:
+        db.close()
+
+    fake = FakeTelegram(flood_every=args.flood_every).start()
+    try:
+        delivery = asyncio.run(deliver(fake.url, args.chats, args.rate))
+        delivery.update(peak_per_second=fake.peak_rate(), flood_responses=fake.floods)
+    finally:
+        fake.stop()
+
+    print(f"{'strategy':<18}{'ticks':>7}{'p50 ms':>9}{'p95 ms':>9}{'total s':>9}{'found':>8}")
+    for name in ("queue", "full_expansion"):
+        stats = scheduling[name]
+        total = round(stats["mean_ms"] * stats["requests"] / 1000, 2)
+        print(f"{name:<18}{stats['requests']:>7}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{total:>9}{stats['occurrences']:>8}")
+    print(f"missing from queue: {scheduling['missing_from_queue']}")
+    print(
+        f"delivery: {delivery['sent']} sent, {delivery['failed']} failed in {delivery['elapsed_s']}s, "
+        f"peak {delivery['peak_per_second']}/s (limit {args.rate:g}), {delivery['flood_responses']} x 429"
+    )
+
+    results = {
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": engine.dialect.name,
+        "scenarios": {"queue": scheduling["queue"], "full_expansion": scheduling["full_expansion"]},
+        "missing_from_queue": scheduling["missing_from_queue"],
+        "delivery": delivery,
+    }
+    print(f"\nresults written to {write_results(results, args.output, 'reminders')}")
+    return 0 if scheduling["missing_from_queue"] == 0 and delivery["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from dateutil.rrule import rrulestr  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.models import CalendarEvent, EventStatus, EventType, Room  # noqa: E402
+from app.recurrence import event_duration  # noqa: E402
+from app.routers.calendar import _expand_recurring_rows  # noqa: E402
+from app.schemas import EventOut  # noqa: E402
+
+
+def build_series(count: int) -> List[CalendarEvent]:
+    start = datetime(2026, 9, 1, 8, 0)
+    events = []
+    for index in range(count):
+        room = Room(id=index % 50 + 1, code=f"R{index % 50 + 1:03d}")
+        events.append(
+            CalendarEvent(
+                id=index + 1,
+                title=f"Lesson {index}",
+                event_type=EventType.lesson,
+                status=EventStatus.approved,
+                room_id=room.id,
+                room=room,
+                club_id=None,
+                starts_at=start + timedelta(minutes=30 * (index % 20)),
+                rrule="FREQ=DAILY",
+                duration_minutes=90,
+            )
+        )
+    return events
+
+
+def legacy_models(events, start, end) -> List[EventOut]:
+    results = []
+    for event in events:
+        rule = rrulestr(event.rrule, dtstart=event.starts_at)
+        duration = event_duration(event)
+        for occ_start in rule.between(start, end, inc=True):
+            results.append(
+                EventOut(
+                    id=f"{event.id}:{occ_start.isoformat()}",
+                    title=event.title,
+                    start=occ_start,
+                    end=occ_start + duration,
+                    rrule=None,
+                    duration=None,
+                    event_type=event.event_type.value,
+                    status=event.status.value,
+                    room_id=event.room_id,
+                    room_code=event.room.code if event.room else None,
+                    club_id=event.club_id,
+                )
+            )
+    return results
+
+
+def legacy_path(events, start, end) -> bytes:
+    field = create_response_field(name="Response_list_events", type_=List[EventOut])
+    content = asyncio.run(
+        serialize_response(field=field, response_content=legacy_models(events, start, end), is_coroutine=True)
+    )
+    return JSONResponse(content).body
+
+
+def row_path(events, start, end) -> bytes:
+    rows = []
+    for event in events:
+        rows.extend(_expand_recurring_rows(event, event.room.code, start, end))
+    return ORJSONResponse(rows).body
+
+
+def measure(func: Callable[[], bytes], repeat: int) -> dict:
+    body = func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+
+    timings.sort()
+    return {
+        "bytes": len(body),
+        "best_ms": round(timings[0] * 1000, 2),
+        "median_ms": round(timings[len(timings) // 2] * 1000, 2),
+        "peak_kib": round(peak / 1024, 1),
+        "live_blocks": blocks,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare list_events serialization paths.")
+    parser.add_argument("--series", type=int, default=100, help="recurring series in the range")
+    parser.add_argument("--days", type=int, default=31, help="length of the requested range")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    events = build_series(args.series)
+    start = datetime(2026, 10, 1)
+    end = start + timedelta(days=args.days)
+
+    results = {
+        "occurrences": sum(
+            len(rrulestr(event.rrule, dtstart=event.starts_at).between(start, end, inc=True)) for event in events
+        ),
+        "pydantic+json": measure(lambda: legacy_path(events, start, end), args.repeat),
+        "rows+orjson": measure(lambda: row_path(events, start, end), args.repeat),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['occurrences']} occurrences, {args.repeat} runs")
+    print(f"{'path':<16}{'best ms':>10}{'median ms':>12}{'peak KiB':>11}{'blocks':>9}{'bytes':>10}")
+    for name in ("pydantic+json", "rows+orjson"):
+        stats = results[name]
+        print(
+            f"{name:<16}{stats['best_ms']:>10}{stats['median_ms']:>12}"
+            f"{stats['peak_kib']:>11}{stats['live_blocks']:>9}{stats['bytes']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
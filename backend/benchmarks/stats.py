@@ -0,0 +1,55 @@
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"requests": 0, "throughput_rps": 0.0}
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def write_results(results: dict, output: Optional[str], prefix: str) -> Path:
+    path = Path(output) if output else RESULTS_DIR / f"{prefix}-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+    return path
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> List[str]:
+    baseline = json.loads(Path(baseline_path).read_text())
+    regressions = []
+    print(f"\n{'scenario':<28}{'p95 ms':>10}{'base':>10}{'delta':>9}{'rps':>10}{'base':>10}{'delta':>9}")
+    for name, stats in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base or not base.get("requests"):
+            continue
+        p95_delta = (stats["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        rps_delta = (stats["throughput_rps"] - base["throughput_rps"]) / base["throughput_rps"]
+        print(
+            f"{name:<28}{stats['p95_ms']:>10}{base['p95_ms']:>10}{p95_delta:>+9.0%}"
+            f"{stats['throughput_rps']:>10}{base['throughput_rps']:>10}{rps_delta:>+9.0%}"
+        )
+        if p95_delta > tolerance:
+            regressions.append(name)
+    return regressions
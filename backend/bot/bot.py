@@ -1,4 +1,5 @@
 import os
+from datetime import date, datetime
 from pathlib import Path
 from typing import List
 
@@ -8,7 +9,7 @@ import urllib3
 
 load_dotenv(Path(__file__).resolve().parents[2] / ".env")
 from telegram import Update
-from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
+from telegram.ext import Application, ApplicationBuilder, CommandHandler, ContextTypes
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN") or os.getenv("BOT_TOKEN")
@@ -107,7 +108,10 @@ async def send_help(update: Update) -> None:
         "/setroletg <tg_id> <role>\n"
         "/setleader <club name> | <email>\n"
         "/setleadertg <club name> | <tg_id>\n"
-        "/createclub <club name>\n\n"
+        "/createclub <club name>\n"
+        "/broadcast <club name> | <message>\n"
+        "/broadcaststatus <id>\n"
+        "/today, /week\n\n"
         "/setemail <tg_id> <email>\n"
         "/email <email>\n\n"
         "Roles: student, club_leader, admin"
@@ -318,16 +322,82 @@ async def set_email_self(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     )
 
 
-def main() -> None:
-    if not BOT_TOKEN:
-        raise RuntimeError("TELEGRAM_BOT_TOKEN is required")
-    if not BOT_ADMIN_TOKEN:
-        raise RuntimeError("BOT_ADMIN_TOKEN is required")
-    if not ADMIN_IDS:
-        raise RuntimeError("BOT_ADMIN_IDS is required")
+def format_broadcast(data: dict) -> str:
+    return (
+        f"Broadcast #{data['id']} {data['status']}: "
+        f"{data['sent']} sent, {data['failed']} failed of {data['total']} members."
+    )
+
+
+async def broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    ensure_user(update)
+    pipe_args = parse_pipe_args(update)
+    if not pipe_args:
+        await update.message.reply_text("Usage: /broadcast <club name> | <message>")
+        return
+    club_name, text = pipe_args
+    res = api_post(
+        "/api/bot/broadcast",
+        {"tg_id": str(update.effective_user.id), "club_name": club_name, "text": text},
+    )
+    await update.message.reply_text(
+        format_api_response(
+            res,
+            lambda data: f"Broadcast #{data['id']} queued for {data['total']} members. "
+            f"Check it with /broadcaststatus {data['id']}.",
+        )
+    )
+
+
+async def broadcast_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    ensure_user(update)
+    if len(context.args) < 1 or not context.args[0].isdigit():
+        await update.message.reply_text("Usage: /broadcaststatus <id>")
+        return
+    res = api_post(
+        "/api/bot/broadcast-status",
+        {"tg_id": str(update.effective_user.id), "broadcast_id": int(context.args[0])},
+    )
+    await update.message.reply_text(format_api_response(res, format_broadcast))
+
+
+def format_agenda(data: dict) -> str:
+    items = data.get("items") or []
+    if not items:
+        return "Nothing scheduled today." if data.get("days") == 1 else "Nothing scheduled this week."
+    lines = []
+    current_day = None
+    for item in items:
+        starts_at = datetime.fromisoformat(item["starts_at"])
+        ends_at = datetime.fromisoformat(item["ends_at"])
+        if starts_at.date() != current_day:
+            current_day = starts_at.date()
+            if lines:
+                lines.append("")
+            label = "Today" if current_day == date.fromisoformat(data["day"]) else current_day.strftime("%A")
+            lines.append(f"{label}, {current_day:%d %b}:")
+        line = f"{starts_at:%H:%M}-{ends_at:%H:%M} {item['title']}"
+        if item.get("room_code"):
+            line += f" ({item['room_code']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+async def send_agenda(update: Update, days: int) -> None:
+    ensure_user(update)
+    res = api_post("/api/bot/agenda", {"tg_id": str(update.effective_user.id), "days": days})
+    await update.message.reply_text(format_api_response(res, format_agenda))
 
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
 
+async def today(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    await send_agenda(update, 1)
+
+
+async def week(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    await send_agenda(update, 7)
+
+
+def register_handlers(app: Application) -> None:
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("help", help_cmd))
     app.add_handler(CommandHandler("setrole", set_role))
@@ -337,7 +407,22 @@ def main() -> None:
     app.add_handler(CommandHandler("createclub", create_club))
     app.add_handler(CommandHandler("setemail", set_email))
     app.add_handler(CommandHandler("email", set_email_self))
+    app.add_handler(CommandHandler("broadcast", broadcast))
+    app.add_handler(CommandHandler("broadcaststatus", broadcast_status))
+    app.add_handler(CommandHandler("today", today))
+    app.add_handler(CommandHandler("week", week))
+
 
+def main() -> None:
+    if not BOT_TOKEN:
+        raise RuntimeError("TELEGRAM_BOT_TOKEN is required")
+    if not BOT_ADMIN_TOKEN:
+        raise RuntimeError("BOT_ADMIN_TOKEN is required")
+    if not ADMIN_IDS:
+        raise RuntimeError("BOT_ADMIN_IDS is required")
+
+    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    register_handlers(app)
     app.run_polling()
 
 
@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+DB_PATH = Path(tempfile.mkdtemp(prefix="roomly-tests-")) / "roomly.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("BOT_ADMIN_TOKEN", "bot-secret")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest  # noqa: E402
+
+from app import cache, init_db  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture()
+def db():
+    engine.dispose()
+    DB_PATH.unlink(missing_ok=True)
+    init_db.main()
+    cache.invalidate(cache.CALENDAR, cache.CLUBS, cache.ROOMS, cache.USERS)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture()
+def client(db):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def auth(user) -> dict:
+    from app.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token(user.id, user.role.value)}"}
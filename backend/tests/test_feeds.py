@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from app import cache
+from app.models import CalendarEvent, EventStatus, EventType, Room, User, UserRole
+from app.routers.feeds import feed_cache
+from app.security import create_feed_token
+
+
+def test_first_feed_response_can_be_revalidated(client, db):
+    admin = User(tg_id="1", email="admin@x.edu", role=UserRole.admin)
+    room = Room(code="A101")
+    db.add_all([admin, room])
+    db.flush()
+    db.add(
+        CalendarEvent(
+            title="Algebra",
+            event_type=EventType.lesson,
+            status=EventStatus.approved,
+            room_id=room.id,
+            created_by=admin.id,
+            starts_at=datetime(2026, 9, 7, 9, 0),
+            ends_at=datetime(2026, 9, 7, 10, 30),
+        )
+    )
+    db.commit()
+    url = f"/api/ics/room/{create_feed_token('room', room.id)}.ics"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert "SUMMARY:Algebra" in first.text
+    etag = first.headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    cache.invalidate(cache.CALENDAR)
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_expired_feed_cache_still_revalidates(client, db):
+    room = Room(code="B202")
+    db.add(room)
+    db.commit()
+    url = f"/api/ics/room/{create_feed_token('room', room.id)}.ics"
+
+    etag = client.get(url).headers["ETag"]
+    feed_cache.clear()
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    feed_cache.clear()
+    assert client.get(url, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    feed_cache.clear()
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
@@ -0,0 +1,14 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Room
+
+
+def test_integrity_error_propagates_through_listeners(db):
+    db.add(Room(code="A101"))
+    db.commit()
+    db.add(Room(code="A101"))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+    assert db.query(Room).count() == 1
@@ -0,0 +1,16 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+
+def _job_workers():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("job-worker-")]
+
+
+def test_background_threads_follow_the_lifespan(db):
+    from app.main import app
+
+    assert not _job_workers()
+    with TestClient(app):
+        assert _job_workers()
+    assert not _job_workers()
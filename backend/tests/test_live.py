@@ -0,0 +1,69 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app import cache, live
+from app.models import User, UserRole
+
+from .conftest import auth
+
+
+class FakeDriver:
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.probes = 0
+
+    def notifies(self, timeout=None):
+        if not self.payloads:
+            time.sleep(timeout)
+        while self.payloads:
+            yield SimpleNamespace(payload=self.payloads.pop(0))
+
+    def execute(self, query):
+        self.probes += 1
+        raise ConnectionError("server closed the connection")
+
+
+def test_listener_probes_and_stops(monkeypatch):
+    monkeypatch.setattr(live, "HEARTBEAT_SECONDS", 0.0)
+    received = []
+    monkeypatch.setattr(live.broker, "dispatch", received.append)
+    driver = FakeDriver(['{"op": "reset"}', "not json"])
+    listener = live.Listener(None)
+
+    try:
+        listener._consume(driver)
+    except ConnectionError:
+        pass
+    assert driver.probes == 1
+    assert received == [{"op": "reset"}]
+
+    listener = live.Listener(None)
+    monkeypatch.setattr(live, "HEARTBEAT_SECONDS", 60.0)
+    thread = threading.Thread(target=listener._consume, args=(FakeDriver([]),))
+    thread.start()
+    listener.stopping.set()
+    thread.join(live.LISTEN_POLL_SECONDS * 2)
+    assert not thread.is_alive()
+
+
+def test_directory_writes_are_published(client, db, monkeypatch):
+    admin = User(tg_id="1", email="admin@x.edu", role=UserRole.admin)
+    student = User(tg_id="2", email="student@x.edu", role=UserRole.student)
+    db.add_all([admin, student])
+    db.commit()
+    headers = auth(admin)
+    published = []
+    monkeypatch.setattr(live.broker, "dispatch", published.append)
+
+    client.post("/api/admin/rooms", headers=headers, json={"code": "A101"})
+    client.post("/api/admin/clubs", headers=headers, json={"name": "Chess"})
+    client.post("/api/admin/users/role", headers=headers, json={"email": "student@x.edu", "role": "club_leader"})
+    client.post("/api/clubs/members", headers=headers, json={"club_name": "Chess", "user_email": "student@x.edu"})
+
+    assert [change["scopes"] for change in published] == [
+        [cache.ROOMS],
+        [cache.CLUBS],
+        [cache.CALENDAR],
+        [cache.CLUBS],
+    ]
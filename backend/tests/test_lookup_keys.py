@@ -0,0 +1,32 @@
+import pytest
+
+from app.models import Club, Room, User, UserRole
+
+from .conftest import auth
+
+
+@pytest.fixture()
+def users(db):
+    admin = User(tg_id="1", email="admin@x.edu", role=UserRole.admin)
+    anonymous = User(tg_id="2", role=UserRole.student)
+    db.add_all([admin, anonymous])
+    db.commit()
+    return admin, anonymous
+
+
+@pytest.mark.parametrize("email", ["", "   "])
+def test_blank_email_does_not_match_users_without_email(client, db, users, email):
+    admin, anonymous = users
+    response = client.post("/api/admin/users/role", headers=auth(admin), json={"email": email, "role": "admin"})
+    assert response.status_code == 404
+    db.refresh(anonymous)
+    assert anonymous.role == UserRole.student
+
+
+def test_blank_names_are_rejected(client, db, users):
+    admin, _ = users
+    assert client.post("/api/admin/clubs", headers=auth(admin), json={"name": "  "}).status_code == 400
+    assert client.post("/api/admin/rooms", headers=auth(admin), json={"code": " "}).status_code == 400
+    assert db.query(Club).count() == 0 and db.query(Room).count() == 0
+    headers = {"X-Admin-Token": "bot-secret"}
+    assert client.post("/api/bot/set-email", headers=headers, json={"tg_id": "2", "email": " "}).status_code == 400
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from app.database import engine
+from app.migrations import _sqlite_rebuild_table
+from app.models import Base, Room
+
+
+def _autocommit():
+    return engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+
+def test_rebuild_replaces_a_leftover_copy(db):
+    with _autocommit() as conn:
+        conn.execute(text("CREATE TABLE club_members_rebuild (id INTEGER)"))
+        _sqlite_rebuild_table(conn, Base.metadata.tables["club_members"])
+        tables = inspect(conn).get_table_names()
+    assert "club_members" in tables
+    assert "club_members_rebuild" not in tables
+
+
+def test_failed_rebuild_keeps_the_original_table(db):
+    db.add(Room(code="A101"))
+    db.commit()
+    broken = Base.metadata.tables["rooms"].to_metadata(MetaData())
+    broken.append_column(Column("required", Integer, nullable=False))
+
+    with _autocommit() as conn:
+        with pytest.raises(IntegrityError):
+            _sqlite_rebuild_table(conn, broken)
+        tables = inspect(conn).get_table_names()
+        codes = conn.execute(text("SELECT code FROM rooms")).scalars().all()
+    assert "rooms_rebuild" not in tables
+    assert codes == ["A101"]
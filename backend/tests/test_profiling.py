@@ -0,0 +1,64 @@
+import asyncio
+import sys
+import threading
+import time
+
+import anyio
+from starlette.concurrency import run_in_threadpool
+
+from app.profiling import ProfiledRoute, RequestSampler, _active_request, profiled_thread
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def request_work(seconds: float) -> None:
+    profiled_thread()
+    _spin(seconds)
+
+
+def unrelated_work(stop: threading.Event) -> None:
+    while not stop.is_set():
+        _spin(0.001)
+
+
+async def _profile_request() -> str:
+    sampler = RequestSampler(1, sys._getframe())
+    token = _active_request.set(sampler)
+    sampler.start()
+    try:
+        await run_in_threadpool(request_work, 0.2)
+        _spin(0.05)
+    finally:
+        samples = sampler.stop()
+        _active_request.reset(token)
+    return "\n".join(samples)
+
+
+def test_request_profile_only_samples_the_request():
+    stop = threading.Event()
+    noise = threading.Thread(target=unrelated_work, args=(stop,))
+    noise.start()
+    try:
+        stacks = anyio.run(_profile_request)
+    finally:
+        stop.set()
+        noise.join()
+    assert "request_work" in stacks
+    assert "_profile_request" in stacks
+    assert "unrelated_work" not in stacks
+
+
+def test_sync_routes_register_their_thread():
+    from fastapi.routing import APIRoute
+
+    from app.main import app
+
+    routes = [route for route in app.routes if isinstance(route, APIRoute) and route.path.startswith("/api/")]
+    assert routes
+    for route in routes:
+        assert isinstance(route, ProfiledRoute)
+        assert getattr(route.endpoint, "registers_thread", False) != asyncio.iscoroutinefunction(route.endpoint)
@@ -0,0 +1,76 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.instrumentation import capture_queries
+from app.models import CalendarEvent, EventParticipant, EventStatus, EventType, Room, User, UserRole
+
+from .conftest import auth
+
+
+def _seed(db, count):
+    admin = User(tg_id="1", email="admin@x.edu", role=UserRole.admin)
+    student = User(tg_id="2", email="student@x.edu", role=UserRole.student)
+    db.add_all([admin, student])
+    db.flush()
+    start = datetime(2026, 9, 7, 9, 0)
+    for number in range(count):
+        room = Room(code=f"R{number}")
+        db.add(room)
+        db.flush()
+        event = CalendarEvent(
+            title=f"Lesson {number}",
+            event_type=EventType.lesson,
+            status=EventStatus.approved,
+            room_id=room.id,
+            starts_at=start + timedelta(hours=number),
+            rrule="FREQ=WEEKLY;COUNT=10" if number % 2 else None,
+            duration_minutes=60,
+            ends_at=None if number % 2 else start + timedelta(hours=number, minutes=60),
+            created_by=admin.id,
+        )
+        db.add(event)
+        db.flush()
+        db.add(EventParticipant(event_id=event.id, user_id=student.id))
+    db.commit()
+    return admin, student
+
+
+def _calendar_queries(client, user):
+    headers = auth(user)
+    with capture_queries() as queries:
+        response = client.get(
+            "/api/calendar/events",
+            headers=headers,
+            params={"start": "2026-09-01T00:00:00", "end": "2026-10-01T00:00:00"},
+        )
+    assert response.status_code == 200
+    return queries
+
+
+@pytest.mark.parametrize("count", [2, 30])
+def test_calendar_events_query_count_does_not_grow_with_events(client, db, count):
+    admin, student = _seed(db, count)
+    for user in (student, admin):
+        queries = _calendar_queries(client, user)
+        assert not queries.repeated(), queries.statements
+        queries.assert_at_most(2)
+
+
+def test_capture_ignores_other_threads(db):
+    def query_elsewhere():
+        session = SessionLocal()
+        try:
+            session.execute(text("SELECT 1"))
+        finally:
+            session.close()
+
+    with capture_queries() as queries:
+        worker = threading.Thread(target=query_elsewhere)
+        worker.start()
+        worker.join()
+        db.execute(text("SELECT 2"))
+    assert queries.statements == ["SELECT 2"]
@@ -0,0 +1,12 @@
+from sqlalchemy import text
+
+from benchmarks.dataset import generate, scaled_sizes
+from benchmarks.query_plans import run_checks
+
+
+def test_hot_queries_use_indexes(db):
+    generate(db, scaled_sizes(0.02))
+    db.execute(text("ANALYZE"))
+    db.commit()
+    failures = {result.name: result.plan for result in run_checks(db) if result.scans}
+    assert not failures
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from app.models import CalendarEvent, EventParticipant, EventStatus, EventType, User, UserRole
+from app.reminders import REMINDER_LOCK_KEY, AdvisoryLock, ReminderQueue
+
+
+def test_sqlite_scheduler_lock_is_exclusive(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'roomly.db'}")
+    first = AdvisoryLock(REMINDER_LOCK_KEY, engine)
+    second = AdvisoryLock(REMINDER_LOCK_KEY, engine)
+
+    assert not first.held()
+    assert first.acquire()
+    assert first.held()
+    assert first.lease_path().parent == tmp_path
+    assert not second.acquire()
+    assert not second.held()
+
+    first.release()
+    assert not first.held()
+    assert second.acquire()
+    second.release()
+
+
+def test_cold_queue_skips_reminders_already_due(db):
+    user = User(tg_id="1", role=UserRole.admin)
+    db.add(user)
+    db.flush()
+    now = datetime(2026, 10, 19, 9, 0)
+    for minutes in (5, 14, 15, 20):
+        event = CalendarEvent(
+            title=f"in {minutes}",
+            event_type=EventType.lesson,
+            status=EventStatus.approved,
+            created_by=user.id,
+            starts_at=now + timedelta(minutes=minutes),
+            ends_at=now + timedelta(minutes=minutes + 45),
+        )
+        db.add(event)
+        db.flush()
+        db.add(EventParticipant(event_id=event.id, user_id=user.id))
+    db.commit()
+
+    queue = ReminderQueue(timedelta(minutes=15))
+    queue.refill(db, now)
+    assert [starts_at for _, starts_at in queue.due(now)] == [now + timedelta(minutes=15)]
+    later = now + timedelta(minutes=5)
+    queue.refill(db, later)
+    assert [starts_at for _, starts_at in queue.due(later)] == [now + timedelta(minutes=20)]
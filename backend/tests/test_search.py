@@ -0,0 +1,54 @@
+import random
+
+from app.search import EXACT, FIELD_PREFIX, SUBSTRING, WORD_PREFIX, KindIndex, _document
+
+
+def test_exact_match_survives_earlier_prefix_matches():
+    documents = [_document("room", number, f"B{number}", None, (f"B{number}",)) for number in range(100, 200)]
+    documents.append(_document("room", 1, "B1", None, ("B1",)))
+    hits = KindIndex(documents).search("b1", 10)
+    assert hits[0] == (EXACT, documents[-1])
+    assert len(hits) == 10
+    assert all(rank == FIELD_PREFIX for rank, _ in hits[1:])
+
+
+def test_prefix_matches_rank_before_later_substrings():
+    names = [f"Club {number} chess" for number in range(50)]
+    documents = [_document("club", number, name, None, (name,)) for number, name in enumerate(names)]
+    documents.append(_document("club", 99, "Chess", None, ("Chess",)))
+    hits = KindIndex(documents).search("chess", 5)
+    assert hits[0][1].id == 99
+
+
+def _brute_force(documents, query, limit):
+    ranked = []
+    for document in documents:
+        ranks = []
+        for field in document.fields:
+            starts = [start for start in range(1, len(field)) if field.startswith(query, start)]
+            if field == query:
+                ranks.append(EXACT)
+            elif field.startswith(query):
+                ranks.append(FIELD_PREFIX)
+            elif any(not field[start - 1].isalnum() for start in starts):
+                ranks.append(WORD_PREFIX)
+            elif query in field:
+                ranks.append(SUBSTRING)
+        if ranks:
+            ranked.append((min(ranks), len(document.title), document.title.lower()))
+    return sorted(ranked)[:limit]
+
+
+def test_matches_brute_force_ranking():
+    generator = random.Random(7)
+    words = ["ab", "abc", "b", "ba", "cab", "a-b", "b.ab", "x"]
+    documents = []
+    for number in range(400):
+        values = tuple(" ".join(generator.choices(words, k=generator.randint(1, 3))) for _ in range(2))
+        documents.append(_document("user", number, values[0], None, values))
+    index = KindIndex(documents)
+    for query in ("a", "ab", "b", "ba", "b a", "x", "c", "zz"):
+        for limit in (1, 5, 20):
+            hits = index.search(query, limit)
+            keys = [(rank, len(document.title), document.title.lower()) for rank, document in hits]
+            assert keys == _brute_force(documents, query, limit), (query, limit)
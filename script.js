@@ -14,6 +14,7 @@ const calendarInstances = new Map();
 const calendarTimeZone = "Asia/Almaty";
 
 let currentUser = null;
+let bootstrapData = null;
 let authBlocked = false;
 let debugEnabled = false;
 const debugLines = [];
@@ -256,6 +257,10 @@ async function bootstrapAuth() {
     }
   }
 
+  if (!authBlocked) {
+    await loadBootstrap();
+  }
+
   const stored = localStorage.getItem("roomly_user");
   if (stored) {
     try {
@@ -285,6 +290,8 @@ async function bootstrapAuth() {
     showSelectRole();
   }
 
+  if (localStorage.getItem("roomly_token")) connectLiveUpdates();
+
   setTimeout(ensureVisibleUI, 500);
   if (bootBanner) bootBanner.classList.add("hidden");
   updateDebugSnapshot();
@@ -295,6 +302,28 @@ function getAuthHeaders() {
   return token ? { Authorization: `Bearer ${token}` } : {};
 }
 
+async function loadBootstrap() {
+  if (!localStorage.getItem("roomly_token")) return;
+  try {
+    const res = await fetch("/api/bootstrap", { headers: getAuthHeaders() });
+    if (!res.ok) throw new Error("bootstrap fetch failed");
+    bootstrapData = await res.json();
+    if (bootstrapData.user) {
+      localStorage.setItem("roomly_user", JSON.stringify(bootstrapData.user));
+    }
+  } catch (err) {
+    bootstrapData = null;
+    addDebugLine(`bootstrap failed: ${err ? String(err) : "unknown"}`);
+  }
+}
+
+function takeBootstrap(key) {
+  if (!bootstrapData || !(key in bootstrapData)) return null;
+  const value = bootstrapData[key];
+  delete bootstrapData[key];
+  return value;
+}
+
 // --------- role switching ----------
 roleButtons.forEach((btn) => {
   btn.addEventListener("click", () => {
@@ -317,17 +346,18 @@ document.querySelectorAll(".student-tabs").forEach((tabsContainer) => {
 
   if (tabs.length === 0 || contents.length === 0) return;
 
-  function activateTab(index) {
+  function activateTab(index, refresh = true) {
     tabs.forEach((t, i) => t.classList.toggle("active", i === index));
     contents.forEach((c, i) => {
       if (i === index) c.classList.remove("hidden");
       else c.classList.add("hidden");
     });
+    if (!refresh) return;
     activateCalendars(portalRoot);
     refreshPortalData(portalRoot);
   }
 
-  activateTab(0);
+  activateTab(0, false);
   tabs.forEach((tab, index) => {
     tab.addEventListener("click", () => activateTab(index));
   });
@@ -393,9 +423,12 @@ async function loadClubOptions() {
   menu.innerHTML = "";
 
   try {
-    const res = await fetch("/api/clubs/my", { headers: getAuthHeaders() });
-    if (!res.ok) throw new Error("clubs fetch failed");
-    const clubs = await res.json();
+    let clubs = takeBootstrap("clubs");
+    if (!clubs) {
+      const res = await fetch("/api/clubs/my", { headers: getAuthHeaders() });
+      if (!res.ok) throw new Error("clubs fetch failed");
+      clubs = await res.json();
+    }
 
     if (!clubs.length) {
       setClubToggleLabel("No clubs assigned");
@@ -440,6 +473,39 @@ function getCalendarRole(el) {
   return "student";
 }
 
+const COLUMNAR_MEDIA_TYPE = "application/vnd.roomly.columnar+json";
+
+function formatColumnarTime(ms) {
+  return new Date(ms).toISOString().slice(0, 19);
+}
+
+function decodeColumnarEvents(payload) {
+  const series = payload.series;
+  const occurrences = payload.occurrences;
+  const baseMs = Date.parse(`${payload.base}Z`);
+  const unitMs = payload.unit * 1000;
+  const events = new Array(occurrences.series.length);
+
+  for (let i = 0; i < events.length; i += 1) {
+    const s = occurrences.series[i];
+    const startMs = baseMs + occurrences.start[i] * unitMs;
+    const start = formatColumnarTime(startMs);
+    const duration = series.duration[s];
+    events[i] = {
+      id: series.recurring[s] ? `${series.id[s]}:${start}` : String(series.id[s]),
+      title: series.title[s],
+      start,
+      end: duration === null ? null : formatColumnarTime(startMs + duration * unitMs),
+      event_type: series.event_type[s],
+      status: series.status[s],
+      room_id: series.room_id[s],
+      room_code: series.room_code[s],
+      club_id: series.club_id[s]
+    };
+  }
+  return events;
+}
+
 function fetchCalendarEvents(info, successCallback, failureCallback) {
   const params = new URLSearchParams({
     start: info.startStr,
@@ -447,9 +513,14 @@ function fetchCalendarEvents(info, successCallback, failureCallback) {
   });
 
   fetch(`/api/calendar/events?${params.toString()}`, {
-    headers: getAuthHeaders()
+    headers: { ...getAuthHeaders(), Accept: `${COLUMNAR_MEDIA_TYPE}, application/json;q=0.9` }
   })
-    .then((res) => (res.ok ? res.json() : Promise.reject(res)))
+    .then((res) => (res.ok ? res : Promise.reject(res)))
+    .then(async (res) => {
+      const data = await res.json();
+      const contentType = res.headers.get("Content-Type") || "";
+      return contentType.startsWith(COLUMNAR_MEDIA_TYPE) ? decodeColumnarEvents(data) : data;
+    })
     .then((data) => successCallback(data))
     .catch((err) => {
       console.warn("Calendar events failed", err);
@@ -503,6 +574,109 @@ function activateCalendars(portal) {
   });
 }
 
+// --------- Live updates ----------
+const LIVE_MAX_BACKOFF_MS = 30000;
+let liveController = null;
+
+function removeCalendarEvents(calendar, ids) {
+  const prefixes = ids.map((id) => `${id}:`);
+  const keys = new Set(ids.map(String));
+  calendar.getEvents().forEach((event) => {
+    if (keys.has(event.id) || prefixes.some((prefix) => event.id.startsWith(prefix))) {
+      event.remove();
+    }
+  });
+}
+
+async function upsertCalendarEvent(calendar, id) {
+  const view = calendar.view;
+  const params = new URLSearchParams({
+    start: view.activeStart.toISOString(),
+    end: view.activeEnd.toISOString(),
+    event_id: String(id)
+  });
+  const res = await fetch(`/api/calendar/events?${params.toString()}`, {
+    headers: { ...getAuthHeaders(), Accept: `${COLUMNAR_MEDIA_TYPE}, application/json;q=0.9` }
+  });
+  if (!res.ok) return;
+  const data = await res.json();
+  const contentType = res.headers.get("Content-Type") || "";
+  const events = contentType.startsWith(COLUMNAR_MEDIA_TYPE) ? decodeColumnarEvents(data) : data;
+  removeCalendarEvents(calendar, [id]);
+  events.forEach((event) => calendar.addEvent(event));
+}
+
+function applyLiveChange(change) {
+  calendarInstances.forEach((calendar, el) => {
+    if (!isVisible(el)) return;
+    if (change.op === "reset") {
+      calendar.refetchEvents();
+    } else if (change.op === "remove") {
+      removeCalendarEvents(calendar, change.ids);
+    } else if (change.op === "upsert") {
+      change.ids.forEach((id) => {
+        upsertCalendarEvent(calendar, id).catch((err) => addDebugLine(`live upsert failed: ${err.message}`));
+      });
+    }
+  });
+}
+
+function handleLiveFrame(frame) {
+  const data = frame
+    .split("\n")
+    .filter((line) => line.startsWith("data:"))
+    .map((line) => line.slice(5).trim())
+    .join("\n");
+  if (!data) return;
+  try {
+    applyLiveChange(JSON.parse(data));
+  } catch (err) {
+    addDebugLine(`live frame ignored: ${err.message}`);
+  }
+}
+
+async function connectLiveUpdates() {
+  if (liveController) liveController.abort();
+  const controller = new AbortController();
+  liveController = controller;
+  let backoff = 1000;
+  let connected = false;
+
+  while (!controller.signal.aborted) {
+    try {
+      const res = await fetch("/api/calendar/stream", {
+        headers: { ...getAuthHeaders(), Accept: "text/event-stream" },
+        signal: controller.signal
+      });
+      if (res.status === 401 || res.status === 403) return;
+      if (!res.ok || !res.body) throw new Error(`stream status ${res.status}`);
+      if (connected) applyLiveChange({ op: "reset" });
+      connected = true;
+      backoff = 1000;
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary = buffer.indexOf("\n\n");
+        while (boundary !== -1) {
+          handleLiveFrame(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf("\n\n");
+        }
+      }
+    } catch (err) {
+      if (controller.signal.aborted) return;
+      addDebugLine(`live stream dropped: ${err.message}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, backoff));
+    backoff = Math.min(backoff * 2, LIVE_MAX_BACKOFF_MS);
+  }
+}
+
 // --------- Lists ----------
 async function fetchEvents(params = {}) {
   const url = new URL("/api/calendar/events", window.location.origin);
@@ -560,17 +734,14 @@ async function loadStudentUpcoming() {
   const container = document.getElementById("student-upcoming");
   if (!container) return;
 
-  const start = new Date();
-  const end = new Date();
-  end.setDate(end.getDate() + 30);
-
   try {
-    const events = await fetchEvents({
-      start: start.toISOString(),
-      end: end.toISOString()
-    });
-    events.sort((a, b) => new Date(a.start) - new Date(b.start));
-    renderEventList(container, events.slice(0, 8));
+    let events = takeBootstrap("upcoming");
+    if (!events) {
+      const res = await fetch("/api/calendar/upcoming?limit=8", { headers: getAuthHeaders() });
+      if (!res.ok) throw new Error("upcoming fetch failed");
+      events = await res.json();
+    }
+    renderEventList(container, events);
   } catch (err) {
     renderEventList(container, []);
   }
@@ -641,9 +812,12 @@ async function loadAvailableRooms(targetId, options = {}) {
   if (!container) return;
 
   try {
-    const res = await fetch("/api/rooms/available", { headers: getAuthHeaders() });
-    if (!res.ok) throw new Error("rooms fetch failed");
-    const rooms = await res.json();
+    let rooms = takeBootstrap("rooms");
+    if (!rooms) {
+      const res = await fetch("/api/rooms/available", { headers: getAuthHeaders() });
+      if (!res.ok) throw new Error("rooms fetch failed");
+      rooms = await res.json();
+    }
     renderRoomCards(container, rooms, options);
     updateRoomsTime();
   } catch (err) {
@@ -676,9 +850,12 @@ async function loadStudentClubs() {
   const container = document.getElementById("student-clubs");
   if (!container) return;
   try {
-    const res = await fetch("/api/clubs/memberships", { headers: getAuthHeaders() });
-    if (!res.ok) throw new Error("clubs fetch failed");
-    const clubs = await res.json();
+    let clubs = takeBootstrap("memberships");
+    if (!clubs) {
+      const res = await fetch("/api/clubs/memberships", { headers: getAuthHeaders() });
+      if (!res.ok) throw new Error("clubs fetch failed");
+      clubs = await res.json();
+    }
     renderClubList(container, clubs);
   } catch (err) {
     renderClubList(container, []);
@@ -745,11 +922,13 @@ async function loadAdminApprovals() {
   if (!container) return;
 
   try {
-    const events = await fetchEvents();
-    const pending = events.filter((event) => event.status === "pending");
-    renderEventList(container, pending, {
+    const res = await fetch("/api/admin/events/pending?limit=200", { headers: getAuthHeaders() });
+    if (!res.ok) throw new Error("pending queue failed");
+    const queue = await res.json();
+    renderEventList(container, queue.items, {
       actions: (event) => `
-        <span class="status-chip">${event.status}</span>
+        ${event.conflicts.length ? `<span class="status-chip">conflicts with #${event.conflicts.join(", #")}</span>` : ""}
+        <input type="checkbox" data-batch-id="${event.id}" aria-label="Select event" />
         <button class="btn-secondary" data-action="approve" data-id="${event.id}">Approve</button>
         <button class="btn-danger" data-action="reject" data-id="${event.id}">Reject</button>
       `
@@ -769,6 +948,41 @@ function renderDataList(container, items, emptyMessage) {
   items.forEach((item) => container.appendChild(item));
 }
 
+function statsItem(title, counts) {
+  const el = document.createElement("div");
+  el.className = "data-item";
+  const meta = Object.entries(counts)
+    .map(([key, value]) => `<span>${key} ${value}</span>`)
+    .join("");
+  el.innerHTML = `
+    <div>
+      <div class="data-item-title">${title}</div>
+      <div class="data-item-meta">${meta || "<span>none</span>"}</div>
+    </div>
+  `;
+  return el;
+}
+
+async function loadAdminStats() {
+  const container = document.getElementById("admin-stats-list");
+  if (!container) return;
+  try {
+    const res = await fetch("/api/admin/stats", { headers: getAuthHeaders() });
+    if (!res.ok) throw new Error("stats fetch failed");
+    const stats = await res.json();
+    const items = [
+      statsItem(`Pending events: ${stats.pending_events}`, stats.events_by_status),
+      statsItem("Users by role", stats.users_by_role),
+      ...stats.clubs.map((club) =>
+        statsItem(club.name, { events: club.events, members: club.members })
+      ),
+    ];
+    renderDataList(container, items, "No stats.");
+  } catch (err) {
+    renderDataList(container, [], "No stats.");
+  }
+}
+
 async function loadAdminUsers() {
   const container = document.getElementById("admin-users-list");
   if (!container) return;
@@ -927,6 +1141,7 @@ async function loadAdminEventParticipants() {
 }
 
 function loadAdminData() {
+  loadAdminStats();
   loadAdminUsers();
   loadAdminClubs();
   loadAdminClubMembers();
@@ -1029,6 +1244,34 @@ if (adminApprovalsList) {
   });
 }
 
+document.querySelectorAll("button[data-batch-action]").forEach((btn) => {
+  btn.addEventListener("click", async () => {
+    const statusEl = document.getElementById("admin-approvals-status");
+    const ids = Array.from(document.querySelectorAll("#admin-approvals-list input[data-batch-id]:checked")).map(
+      (input) => Number(input.dataset.batchId)
+    );
+    if (!ids.length) {
+      showStatus(statusEl, "Select events first.", "error");
+      return;
+    }
+    try {
+      const res = await fetch("/api/admin/events/batch", {
+        method: "POST",
+        headers: { ...getAuthHeaders(), "Content-Type": "application/json" },
+        body: JSON.stringify({ ids, action: btn.dataset.batchAction })
+      });
+      if (!res.ok) throw new Error("batch failed");
+      const result = await res.json();
+      const blocked = result.conflicts.length ? `, ${result.conflicts.length} blocked by room conflicts` : "";
+      const verb = result.action === "approve" ? "approved" : "rejected";
+      showStatus(statusEl, `${result.updated.length} ${verb}${blocked}.`, result.conflicts.length ? "error" : "success");
+      await loadAdminApprovals();
+    } catch (err) {
+      showStatus(statusEl, "Batch action failed.", "error");
+    }
+  });
+});
+
 // --------- Forms ----------
 const clubEventForm = document.getElementById("club-event-form");
 if (clubEventForm) {
@@ -1205,6 +1448,65 @@ if (adminEventForm) {
   });
 }
 
+const JOB_POLL_MS = 1500;
+
+async function waitForJob(jobId) {
+  while (true) {
+    const res = await fetch(`/api/admin/jobs/${jobId}`, { headers: getAuthHeaders() });
+    if (!res.ok) throw new Error("job status failed");
+    const job = await res.json();
+    if (job.status === "succeeded" || job.status === "failed") return job;
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS));
+  }
+}
+
+const adminImportForm = document.getElementById("admin-import-form");
+if (adminImportForm) {
+  adminImportForm.addEventListener("submit", async (event) => {
+    event.preventDefault();
+    const statusEl = document.getElementById("admin-import-status");
+    const file = adminImportForm.querySelector('input[name="timetable"]').files[0];
+
+    if (!file) {
+      showStatus(statusEl, "Choose an .ics file.", "error");
+      return;
+    }
+
+    showStatus(statusEl, "Importing...", "");
+    try {
+      const res = await fetch("/api/admin/lessons/import", {
+        method: "POST",
+        headers: {
+          "Content-Type": "text/calendar",
+          ...getAuthHeaders()
+        },
+        body: file
+      });
+      if (!res.ok) throw new Error("import failed");
+      let report = await res.json();
+      if (res.status === 202) {
+        showStatus(statusEl, "Import queued...", "");
+        const job = await waitForJob(report.job_id);
+        if (job.status !== "succeeded") throw new Error(job.error || "import failed");
+        report = job.result;
+      }
+      const unknownRooms = Object.keys(report.unknown_rooms || {});
+      const parts = [
+        `Created ${report.created} lessons`,
+        `${report.duplicates.length} duplicates`,
+        `${report.errors.length} errors`
+      ];
+      if (unknownRooms.length) parts.push(`unknown rooms: ${unknownRooms.join(", ")}`);
+      showStatus(statusEl, `${parts.join(", ")}.`, "success");
+      adminImportForm.reset();
+      const adminPortal = document.querySelector('[data-portal="administration"]');
+      if (adminPortal) activateCalendars(adminPortal);
+    } catch (err) {
+      showStatus(statusEl, "Import failed.", "error");
+    }
+  });
+}
+
 const adminRoleForm = document.getElementById("admin-role-form");
 if (adminRoleForm) {
   adminRoleForm.addEventListener("submit", async (event) => {
@@ -1575,6 +1877,54 @@ document.addEventListener("click", (event) => {
   }
 });
 
+// --------- Typeahead ----------
+const SEARCH_DEBOUNCE_MS = 150;
+let typeaheadCount = 0;
+
+function attachTypeahead(input) {
+  const list = document.createElement("datalist");
+  typeaheadCount += 1;
+  list.id = `typeahead-${typeaheadCount}`;
+  input.after(list);
+  input.setAttribute("list", list.id);
+  input.setAttribute("autocomplete", "off");
+
+  let timer = null;
+  let controller = null;
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    const query = input.value.trim();
+    if (!query) {
+      list.innerHTML = "";
+      return;
+    }
+    timer = setTimeout(async () => {
+      if (controller) controller.abort();
+      controller = new AbortController();
+      const params = new URLSearchParams({ q: query, kind: input.dataset.searchKind, limit: "8" });
+      try {
+        const res = await fetch(`/api/search?${params.toString()}`, {
+          headers: getAuthHeaders(),
+          signal: controller.signal,
+        });
+        if (!res.ok) return;
+        const hits = await res.json();
+        list.innerHTML = "";
+        hits.forEach((hit) => {
+          const option = document.createElement("option");
+          option.value = hit.title;
+          if (hit.subtitle) option.label = hit.subtitle;
+          list.appendChild(option);
+        });
+      } catch (err) {
+        if (err.name !== "AbortError") addDebugLine(`search failed: ${err.message}`);
+      }
+    }, SEARCH_DEBOUNCE_MS);
+  });
+}
+
+document.querySelectorAll("input[data-search-kind]").forEach(attachTypeahead);
+
 if (document.readyState === "loading") {
   document.addEventListener("DOMContentLoaded", bootstrapAuth);
 } else {